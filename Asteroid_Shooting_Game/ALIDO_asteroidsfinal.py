@@ -4,830 +4,878 @@ Original Author: Br. Burton
 Designed to be completed by others
 This program implements the asteroids game.
 """
-from abc import ABC, abstractmethod
-import math
-import random
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 import arcade
+import numpy as np
+from asteroid_world import (SCREEN_WIDTH, SCREEN_HEIGHT, TURN_LEFT, TURN_RIGHT,
+                            THRUST_UP, THRUST_DOWN, FIRE, VICTORY, GAME_OVER,
+                            Inputs, Array_Field, World, Normal_World, Hard_World,
+                            Endurance_World)
+from asteroid_replay import Replay_Recorder
+from asteroid_snapshot import save_snapshot, load_snapshot
+from asteroid_stress import add_stress_arguments, scenario_from_args, report
+from asteroid_profiler import Frame_Profiler
+from asteroid_audio import Pcm_Sound, Audio_Mixer
+from asteroid_particles import Particle_System, PARTICLE_VERTEX
+from asteroid_net import Coop_Client, Remote_World, make_socket
+#game_capture.py and game_telemetry.py are shared by all the games and sit in the folder above
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from game_capture import Frame_Capture
+from game_telemetry import NO_TELEMETRY, add_telemetry_arguments, telemetry_from_args
 
-# These are Global constants to use throughout the game
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
+#Keyboard keys and the action they make the ship take
+KEY_ACTIONS = {
+    arcade.key.LEFT: TURN_LEFT,
+    arcade.key.RIGHT: TURN_RIGHT,
+    arcade.key.UP: THRUST_UP,
+    arcade.key.DOWN: THRUST_DOWN,
+    arcade.key.SPACE: FIRE,
+}
 
-BULLET_RADIUS = 30
-BULLET_SPEED = 10
-BULLET_LIFE = 60
+#Longest time in seconds a single update can catch up on, so a long
+#hitch doesn't make the game run hundreds of steps at once
+MAX_FRAME_TIME = 0.25
 
-SHIP_TURN_AMOUNT = 3
-SHIP_THRUST_AMOUNT = 0.25
-SHIP_RADIUS = 30
+#Folder holding all the images and sounds, relative to this file
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = "asteroid_file"
 
-INITIAL_ROCK_COUNT = 5
+#With --record every game is recorded and saved in this folder so it can
+#be replayed later with asteroid_replay.py. Only the newest REPLAY_KEEP
+#replays are kept
+RECORD_REPLAYS = False
+REPLAY_DIR = "replays"
+REPLAY_KEEP = 20
 
-BIG_ROCK_SPIN = 1
-BIG_ROCK_SPEED = 1.5
-BIG_ROCK_RADIUS = 15
+#F5 saves the game in SAVE_DIR and F9 loads it again. The game is also
+#saved every AUTOSAVE_INTERVAL seconds so it can be continued after a crash
+SAVE_DIR = "saves"
+QUICKSAVE_FILE = "quicksave.snap"
+AUTOSAVE_FILE = "autosave.snap"
+AUTOSAVE_INTERVAL = 10
 
-MEDIUM_ROCK_SPIN = -2
-MEDIUM_ROCK_RADIUS = 5
+#Threads used to decode the images and sounds while the start screen shows
+ASSET_WORKERS = 4
 
-SMALL_ROCK_SPIN = 5
-SMALL_ROCK_RADIUS = 2
-
-class Start_Screen(arcade.View):
-    """
-    Class for the main menu or starting screen
-    """  
-    def on_show(self):
-        arcade.set_background_color(arcade.color.WHITE)
-        
-    def on_draw(self):
-        """
-        This will show the title and instructions for the game
-        """
-        # clear the screen to begin drawing
-        arcade.start_render()
-        
-        # displays title of game on top of screen
-        arcade.draw_text("Asteroid Shooting Game", SCREEN_WIDTH/2, SCREEN_HEIGHT-80,
-                         arcade.color.BLACK, font_size=30, anchor_x="center")
-        
-        #Text for instructions
-        arcade.draw_text("Instructions: Shoot all the asteroids on the screen with the SPACEBAR.", SCREEN_WIDTH/2, SCREEN_HEIGHT-110,
-                         arcade.color.BLACK, font_size=15, anchor_x="center")
-        #Text for game modes
-        arcade.draw_text("Press 'e' for easy mode", SCREEN_WIDTH/2, SCREEN_HEIGHT-250,
-                         arcade.color.RED, font_size=20, anchor_x="center")
-        arcade.draw_text("Press 'n' for normal mode", SCREEN_WIDTH/2, SCREEN_HEIGHT-300,
-                         arcade.color.RED, font_size=20, anchor_x="center")
-        arcade.draw_text("Press 'h' for hard mode", SCREEN_WIDTH/2, SCREEN_HEIGHT-350,
-                         arcade.color.RED, font_size=20, anchor_x="center")
-        
-    def on_key_press(self, key: int, modifiers: int):
-        """
-        The player can either choose easy mode, normal mode, and hard mode
-        depending on which keyboard key they press.
-        """      
-        if key == arcade.key.E:
-            game = Easy()
-            self.window.show_view(game)
-        elif key == arcade.key.N:
-            game = Normal()
-            self.window.show_view(game)
-        elif key == arcade.key.H:
-            game = Hard()
-            self.window.show_view(game)
-
-class Point:
-    """
-    Class responsible for x and y coordinates for positions of objects
-    """
-    def __init__(self):
-        self.x = random.uniform(0, SCREEN_WIDTH)
-        self.y = random.uniform(0, SCREEN_HEIGHT)
-        
-class Velocity:
+class Texture_Registry:
     """
-    Class responsible for velocity of moving objects
+    Class that loads every texture only once and hands out the same
+    arcade.Texture to every flying object that asks for it.
+    Textures are keyed by their asset path, e.g. "asteroid_file/heart.png"
     """
     def __init__(self):
-        self.dx = 0.0
-        self.dy = 0.0
+        self.textures = {}
+        #asset path -> Future of a texture still being loaded by the Asset_Preloader
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
 
-class FlyingObjects(ABC):
-    """
-    This is the parent class for these flying objects:
-    Ship
-    Bullets
-    Asteroid
-    """
-    def __init__(self, img, radius):
-        self.center = Point()
-        self.velocity = Velocity()
-        self.alive = True
-        self.radius = radius
-        self.alpha = 255
-        self.image = img
-        self.texture = arcade.load_texture(self.image)
-        self.width = self.texture.width
-        self.height = self.texture.height
-        self.direction = 1
-        self.angle = 0.0
-        self.speed = 0.0
-        
-    def advance(self):
+    def load(self, path):
         """
-        Function responsible to move objects forward and move.
+        Loads a single texture from disk
         """
-        #when objects are advancing, self.wrap() is called to
-        #check if the advancing objects are off the screen's boundaries
-        #to wrap correctly
-        self.wrap()
-        self.center.x += self.velocity.dx
-        self.center.y += self.velocity.dy
+        return arcade.load_texture(os.path.join(GAME_DIR, path))
 
-    def is_alive(self):
+    def get(self, path):
+        """
+        Returns the shared texture for the asset path, loading it on a miss
+        """
+        texture = self.textures.get(path)
+        if texture is None:
+            self.misses += 1
+            #only waits for this one texture if it is still being loaded
+            future = self.pending.pop(path, None)
+            texture = future.result() if future is not None else self.load(path)
+            self.textures[path] = texture
+        else:
+            self.hits += 1
+        return texture
+
+    def size(self, path):
         """
-        Returns condition of flying object (whether if it's alive or not).
+        Returns the width and height of the texture for the asset path
         """
-        return self.alive
-    
-    @abstractmethod
-    def draw(self):
+        texture = self.get(path)
+        return texture.width, texture.height
+
+    def stats(self):
         """
-        Draws all images for each flying object
-        Draw should be an abstract method in base classes and overridden 
+        Returns the hit and miss counts of the registry
         """
-        pass
-    
-    def wrap(self):
-        """
-        If an object goes off the right edge of the screen,
-        it should appear on the left edge.
-        """
-        if self.center.x > SCREEN_WIDTH:
-            self.center.x -= SCREEN_WIDTH
-        elif self.center.x < 0:
-            self.center.x += SCREEN_WIDTH
-        elif self.center.y > SCREEN_HEIGHT:
-            self.center.y -= SCREEN_HEIGHT
-        elif self.center.y < 0:
-            self.center.y += SCREEN_HEIGHT
-    
-class Asteroid(FlyingObjects, ABC):
+        return {"loaded": len(self.textures), "hits": self.hits, "misses": self.misses}
+
+#Only one registry is used for the whole game
+TEXTURES = Texture_Registry()
+
+class Sound_Registry:
     """
-    Parent class for different types of asteroids
+    Class that decodes every sound only once into PCM for the mixer, so
+    starting a new game doesn't decode the same WAV files again.
+    Sounds are keyed by their asset path
     """
-    def __init__(self, img, radius):
+    def __init__(self):
+        self.sounds = {}
+        #asset path -> Future of a sound still being loaded by the Asset_Preloader
+        self.pending = {}
+
+    def load(self, path):
         """
-        Calls parent class and asks for img and radius to be passed as parameters
+        Loads and decodes a single sound from disk
         """
-        super().__init__(img, radius)
-    
-    @abstractmethod
-    def advance(self):
+        return Pcm_Sound.load(os.path.join(GAME_DIR, path))
+
+    def get(self, path):
         """
-        Needs to be overridden by subclasses
-        and each differs by amount of degrees for rotation
+        Returns the shared sound for the asset path, loading it the first time
         """
-        pass
-        
-class Large_Asteroids(Asteroid):
+        sound = self.sounds.get(path)
+        if sound is None:
+            future = self.pending.pop(path, None)
+            sound = future.result() if future is not None else self.load(path)
+            self.sounds[path] = sound
+        return sound
+
+SOUNDS = Sound_Registry()
+#Every sound is played through one mixer running on pyglet's audio thread
+MIXER = Audio_Mixer()
+
+class Asset_Preloader:
     """
-    Class for large asteroids
+    Class that decodes every image and sound in the asset folder on a pool
+    of worker threads. Each one is handed to its registry as a Future, so
+    the game only waits for an asset that isn't loaded yet when it needs it
     """
-    def __init__(self):
+    def __init__(self, workers=ASSET_WORKERS):
+        self.workers = workers
+        self.futures = []
+        self.executor = None
+
+    def start(self):
+        """
+        Starts loading everything that isn't loaded yet
+        """
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        for name in sorted(os.listdir(os.path.join(GAME_DIR, ASSET_DIR))):
+            path = ASSET_DIR + "/" + name
+            if name.lower().endswith(".png"):
+                registry, loaded = TEXTURES, TEXTURES.textures
+            elif name.lower().endswith(".wav"):
+                registry, loaded = SOUNDS, SOUNDS.sounds
+            else:
+                continue
+            if path not in loaded and path not in registry.pending:
+                future = self.executor.submit(registry.load, path)
+                registry.pending[path] = future
+                self.futures.append(future)
+        #the threads exit once the queue is empty
+        self.executor.shutdown(wait=False)
+
+    def progress(self):
         """
-        Calls parent class and passes the image path and radius to parameters
+        Returns how many assets are done and how many there are
         """
-        super().__init__("asteroid_file/meteorGrey_big1.png", BIG_ROCK_RADIUS)
-        #Moves at 1.5 pixels per frame, at a random initial direction.
-        self.speed = BIG_ROCK_SPEED
-        self.velocity.dx = math.cos(math.radians(self.direction)) * self.speed
-        self.velocity.dy = math.sin(math.radians(self.direction)) * self.speed
-        
-    def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
-        
-    def advance(self):
+        done = sum(1 for future in self.futures if future.done())
+        return done, len(self.futures)
+
+    def finished(self):
+        done, total = self.progress()
+        return done == total
+
+    def wait(self):
         """
-        Rotates at 1 degree per frame.
+        Blocks until every asset is loaded
         """
-        self.angle += BIG_ROCK_SPIN
-        self.wrap()
-        self.center.x += self.velocity.dx
-        self.center.y += self.velocity.dy
-        
-    def split(self, asteroids):
-        """
-        If a large asteroid gets hit, it breaks apart and becomes two medium asteroids and one small one.
-        """
-        #calls Medium_Asteroids() object to spawn medium asteroid
-        medium1 = Medium_Asteroids()
-        #will have same coordinates as large rock
-        medium1.center.x = self.center.x
-        medium1.center.y = self.center.y
-        #The first medium asteroid has the same velocity as the original
-        #large one plus 2 pixel/frame in the up direction.
-        medium1.velocity.dy = self.velocity.dy + 2
-        
-        medium2 = Medium_Asteroids()
-        medium2.center.x = self.center.x
-        medium2.center.y = self.center.y
-        #The second medium asteroid has the same velocity as the original
-        #large one plus 2 pixel/frame in the down direction.
-        medium2.velocity.dy = self.velocity.dy - 2
-        
-        small = Small_Asteroids()
-        small.center.x = self.center.x
-        small.center.y = self.center.y
-        #The small asteroid has the original velocity plus 5 pixels/frame to the right.
-        small.velocity.dx = self.velocity.dx + 5
-        
-        #asteroids = self.asteroids list
-        asteroids.append(medium1)
-        asteroids.append(medium2)
-        asteroids.append(small)
-        self.alive = False
-        
-class Medium_Asteroids(Asteroid):
+        for future in self.futures:
+            future.result()
+
+ASSETS = Asset_Preloader()
+
+def interpolate(previous, current, blend, size):
     """
-    Class for medium asteroids
+    Returns the position between the previous and the current step to draw
+    at. Objects that wrapped around the screen are drawn where they are now
     """
-    def __init__(self):
-        super().__init__("asteroid_file/meteorGrey_med1.png", MEDIUM_ROCK_RADIUS)
-        
-    def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
-        
-    def advance(self):
-        """
-        Rotates at -2 degrees per frame.
-        """
-        self.angle += MEDIUM_ROCK_SPIN
-        self.wrap()
-        self.center.x += self.velocity.dx
-        self.center.y += self.velocity.dy
-        
-    def split(self, asteroids):
-        """
-        If hit, it breaks apart and becomes two small asteroids.
-        """
-        small1 = Small_Asteroids()
-        #will have same coordinates as medium rock
-        small1.center.x = self.center.x
-        small1.center.y = self.center.y
-        #The small asteroid has the same velocity as the original medium one
-        #plus 1.5 pixels/frame up and 1.5 pixels/frame to the right.
-        small1.velocity.dx = self.velocity.dx + 1.5
-        small1.velocity.dy = self.velocity.dy + 1.5
-        
-        small2 = Small_Asteroids()
-        small2.center.x = self.center.x
-        small2.center.y = self.center.y
-        #The second, 1.5 pixels/frame down and 1.5 to the left.
-        small2.velocity.dx = self.velocity.dx - 1.5
-        small2.velocity.dy = self.velocity.dy - 1.5
-        
-        asteroids.append(small1)
-        asteroids.append(small2)
-        self.alive = False
-        
-class Small_Asteroids(Asteroid):
+    if previous is None or abs(current - previous) > size / 2:
+        return current
+    return previous + (current - previous) * blend
+
+#Game entities are drawn with batched sprite lists unless this is False,
+#then every object is drawn by itself with draw_flying_object()
+USE_SPRITE_LISTS = True
+
+#Times every phase of the game, F3 shows the times on screen
+PROFILER = Frame_Profiler()
+#The overlay text is only remade every this many drawn frames
+OVERLAY_REFRESH = 15
+#Counts objects, collision tests and frame times, see game_telemetry.py
+TELEMETRY = NO_TELEMETRY
+
+class Sprite_Layers:
     """
-    Class for small asteroids
+    Class that keeps one arcade.SpriteList per layer of flying objects
+    so each layer is drawn with a single batched draw call
     """
-    def __init__(self):
-        super().__init__("asteroid_file/meteorGrey_small1.png", SMALL_ROCK_RADIUS)
-        
+    def __init__(self, names):
+        self.names = names
+        self.sprite_lists = {}
+        #for each layer, id of the flying object -> (flying object, sprite)
+        self.sprites = {}
+        #for each field layer, the buffer slot of the sprite of every row
+        #and the size class its texture is for
+        self.field_slots = {}
+        self.field_sizes = {}
+        for name in names:
+            self.sprite_lists[name] = arcade.SpriteList()
+            self.sprites[name] = {}
+            self.field_slots[name] = np.zeros(0, dtype=np.intp)
+            self.field_sizes[name] = np.zeros(0, dtype=np.int8)
+
+    def sync(self, name, objects, blend=1.0):
+        """
+        Moves the sprites of a layer to where their flying objects are,
+        adding sprites for new objects and removing the ones for objects
+        that are gone. blend is how far along between the previous and the
+        current step the objects are drawn
+        """
+        sprite_list = self.sprite_lists[name]
+        sprites = self.sprites[name]
+        seen = set()
+        for flying_object in objects:
+            key = id(flying_object)
+            entry = sprites.get(key)
+            if entry is None:
+                sprite = arcade.Sprite(texture=TEXTURES.get(flying_object.image))
+                sprites[key] = (flying_object, sprite)
+                sprite_list.append(sprite)
+            else:
+                sprite = entry[1]
+            sprite.center_x = interpolate(flying_object.prev_x, flying_object.center.x, blend, SCREEN_WIDTH)
+            sprite.center_y = interpolate(flying_object.prev_y, flying_object.center.y, blend, SCREEN_HEIGHT)
+            sprite.angle = flying_object.angle
+            sprite.alpha = flying_object.alpha
+            seen.add(key)
+
+        #objects that were removed from the game lose their sprite
+        if len(seen) != len(sprites):
+            for key in [key for key in sprites if key not in seen]:
+                sprite_list.remove(sprites.pop(key)[1])
+
+    def sync_field(self, name, field, blend=1.0):
+        """
+        Same as sync() but for an Array_Field like the asteroids or the
+        aliens. Rows of the field are not objects, so the layer keeps one
+        sprite per row in use and gives each sprite the texture of its
+        row's size class. Only sprites whose size class changed get a new
+        texture, and the positions and angles of every row are written
+        into the sprite list's buffers with a few array operations
+        """
+        sprite_list = self.sprite_lists[name]
+        count = field.count
+        textures = [TEXTURES.get(image) for image in field.images]
+        slots = self.field_slots[name]
+        sizes = self.field_sizes[name]
+        if len(sprite_list) != count:
+            while len(sprite_list) > count:
+                sprite_list.pop()
+            added = []
+            while len(sprite_list) < count:
+                sprite = arcade.Sprite(texture=textures[0])
+                sprite_list.append(sprite)
+                added.append(sprite_list.sprite_slot[sprite])
+            slots = self.field_slots[name] = np.concatenate([slots[:count], np.array(added, dtype=np.intp)])
+            sizes = self.field_sizes[name] = np.concatenate([sizes[:count], np.zeros(len(added), dtype=np.int8)])
+
+        current = field.size[:count]
+        for row in np.flatnonzero(current != sizes).tolist():
+            sprite_list[row].texture = textures[current[row]]
+        sizes[:] = current
+
+        #arcade 2.6 keeps the position and angle of every sprite in flat
+        #float arrays indexed by the sprite's slot, and sends them to the
+        #GPU when they are marked as changed. The sprites' own center and
+        #angle are not kept up to date, nothing reads them for a field
+        positions = np.frombuffer(sprite_list._sprite_pos_data, dtype=np.float32).reshape(-1, 2)
+        positions[slots, 0] = interpolate_field(field.prev_x[:count], field.x[:count], blend, SCREEN_WIDTH)
+        positions[slots, 1] = interpolate_field(field.prev_y[:count], field.y[:count], blend, SCREEN_HEIGHT)
+        angles = np.frombuffer(sprite_list._sprite_angle_data, dtype=np.float32)
+        angles[slots] = field.angle[:count]
+        sprite_list._sprite_pos_changed = True
+        sprite_list._sprite_angle_changed = True
+
     def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
-        
-    def advance(self):
-        """
-        Rotates at 5 degrees per frame.
-        """
-        self.angle += SMALL_ROCK_SPIN
-        self.wrap()
-        self.center.x += self.velocity.dx
-        self.center.y += self.velocity.dy
-        
-    def split(self, asteroids):
         """
-        If a small asteroid is hit, it is destroyed and removed from the game.
+        Draws every layer in order, one draw call per layer
         """
-        self.alive = False 
-        
-class Ship(FlyingObjects):
+        for name in self.names:
+            self.sprite_lists[name].draw()
+
+def interpolate_field(previous, current, blend, size):
     """
-    Class for the ship which user can control with keyboard
+    Same as interpolate() for whole arrays of positions
     """
-    def __init__(self):
-        super().__init__("asteroid_file/playerShip1_green.png", SHIP_RADIUS)
-        #Ship needs an angle or orientation
-        self.angle = 1
-        self.center.x = SCREEN_WIDTH/2
-        self.center.y = SCREEN_HEIGHT/2
-        
-    def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
-        
-    def turn_left(self):
-        """
-        The left arrow rotates the ship 3 degrees to the left.
-        """
-        self.angle += SHIP_TURN_AMOUNT
-    
-    def turn_right(self):
-        """
-        The right arrow rotates the ship 3 degrees to the right.
-        """
-        self.angle -= SHIP_TURN_AMOUNT
-    
-    def up_thrust(self):
-        """
-        The up arrow will increase the velocity in the direction the ship is pointed by 0.25 pixels/frame.
-        """
-        self.velocity.dx -= math.sin(math.radians(self.angle)) * SHIP_THRUST_AMOUNT
-        self.velocity.dy += math.cos(math.radians(self.angle)) * SHIP_THRUST_AMOUNT
-        
-    def down_thrust(self):
-        """
-        The down arrow will decrease the velocity in the direction the ship is pointed by 0.25 pixels/frame.
-        """
-        self.velocity.dx += math.sin(math.radians(self.angle)) * SHIP_THRUST_AMOUNT
-        self.velocity.dy -= math.cos(math.radians(self.angle)) * SHIP_THRUST_AMOUNT
-        
- 
-class Heart(FlyingObjects):
+    moved = current - previous
+    return np.where(np.abs(moved) > size / 2, current, previous + moved * blend)
+
+def draw_field(field, blend=1.0):
     """
-    Class for the ship's lives
+    Draws every row of an Array_Field with its own draw call. Used
+    when sprite lists are turned off
     """
-    def __init__(self):
-        super().__init__("asteroid_file/heart.png", None)
-        
-    def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
-        
-    def split(self, hearts):
-        self.alive = False
+    xs = interpolate_field(field.prev_x[:field.count], field.x[:field.count], blend, SCREEN_WIDTH)
+    ys = interpolate_field(field.prev_y[:field.count], field.y[:field.count], blend, SCREEN_HEIGHT)
+    for row in range(field.count):
+        texture = TEXTURES.get(field.images[field.size[row]])
+        arcade.draw_texture_rectangle(xs[row], ys[row], texture.width, texture.height,
+                                      texture, field.angle[row], 255)
 
-class Heart_List:
+def draw_flying_object(flying_object, blend=1.0):
     """
-    This class will create 3 lives for the player's ship
+    Draws a single flying object with its own draw call. Used when
+    sprite lists are turned off
     """
-    def __init__(self, hearts):
-        heart1 = Heart()
-        heart1.center.x = SCREEN_WIDTH/1.3
-        heart1.center.y = SCREEN_HEIGHT-30
-        heart2 = Heart()
-        heart2.center.x = SCREEN_WIDTH/1.2
-        heart2.center.y = SCREEN_HEIGHT-30
-        heart3 = Heart()
-        heart3.center.x = SCREEN_WIDTH/1.1
-        heart3.center.y = SCREEN_HEIGHT-30
-        hearts.append(heart1)
-        hearts.append(heart2)
-        hearts.append(heart3)
-        
-class Bullet(FlyingObjects):
+    texture = TEXTURES.get(flying_object.image)
+    x = interpolate(flying_object.prev_x, flying_object.center.x, blend, SCREEN_WIDTH)
+    y = interpolate(flying_object.prev_y, flying_object.center.y, blend, SCREEN_HEIGHT)
+    arcade.draw_texture_rectangle(x, y, texture.width, texture.height,
+                                  texture, flying_object.angle, flying_object.alpha)
+
+#Size in pixels of every particle
+PARTICLE_SIZE = 3
+
+PARTICLE_VERTEX_SHADER = """
+#version 330
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
+uniform float point_size;
+in vec2 in_vert;
+in vec4 in_color;
+out vec4 v_color;
+void main() {
+    gl_Position = proj.matrix * vec4(in_vert, 0.0, 1.0);
+    gl_PointSize = point_size;
+    v_color = in_color;
+}
+"""
+
+PARTICLE_FRAGMENT_SHADER = """
+#version 330
+in vec4 v_color;
+out vec4 f_color;
+void main() {
+    f_color = v_color;
+}
+"""
+
+class Particle_Renderer:
     """
-    Class for bullets that comes out of ship when user presses space bar
+    Draws every particle of a Particle_System as points with one draw call.
+    The particle arrays are copied into one GPU buffer as they are, so
+    there is no Python work per particle
     """
-        #Bullet class will take ship's angle and coordinates to determine where to shoot
-    def __init__(self, ship_angle, ship_x, ship_y):
-        super().__init__("asteroid_file/laserBlue01.png", BULLET_RADIUS)
-        #Bullets only live for 60 frames, after which they should "die"
-        #and be removed from the game.
-        self.lives = BULLET_LIFE
-        #Bullets should start with the same velocity of the ship (speed and direction)
-        #plus 10 pixels per frame in the direction the ship is pointed. 
-        self.speed = BULLET_SPEED
-        #rotates bullet image by 90 degrees counter clockwise
-        self.angle = ship_angle-90
-        self.center.x = ship_x
-        self.center.y = ship_y
-        
+    def __init__(self, ctx, capacity):
+        self.ctx = ctx
+        self.program = ctx.program(vertex_shader=PARTICLE_VERTEX_SHADER,
+                                   fragment_shader=PARTICLE_FRAGMENT_SHADER)
+        self.program["point_size"] = PARTICLE_SIZE
+        self.buffer = ctx.buffer(reserve=capacity * PARTICLE_VERTEX.itemsize, usage="stream")
+        self.geometry = ctx.geometry([arcade.gl.BufferDescription(
+            self.buffer, "2f 4f1", ["in_vert", "in_color"], normalized=["in_color"])])
+
+    def draw(self, particles):
+        vertices = particles.vertex_data()
+        if len(vertices) == 0:
+            return
+        self.buffer.write(vertices.tobytes())
+        with self.ctx.enabled(self.ctx.BLEND, self.ctx.PROGRAM_POINT_SIZE):
+            self.geometry.render(self.program, mode=self.ctx.POINTS, vertices=len(vertices))
+
+class Profiler_Overlay:
+    """
+    Text in the corner of the screen with the rolling mean, p95 and p99
+    of each phase of the profiler, how many objects each list has and
+    how the texture registry is doing
+    """
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.frames = 0
+        self.lines = []
+
+    def refresh(self):
+        """
+        Makes the text again from the profiler's latest times
+        """
+        texts = ["{:20s} {:>7s} {:>7s} {:>7s}".format("phase (ms)", "mean", "p95", "p99")]
+        for phase, mean, p95, p99 in self.profiler.stats():
+            texts.append("{:20s} {:7.3f} {:7.3f} {:7.3f}".format(phase, mean, p95, p99))
+        for name, count in self.profiler.counts.items():
+            texts.append("{:20s} {:7d}".format(name, count))
+        for name, count in TEXTURES.stats().items():
+            texts.append("{:20s} {:7d}".format("textures " + name, count))
+
+        #arcade.Text objects are reused, only their text changes
+        while len(self.lines) < len(texts):
+            y = SCREEN_HEIGHT - 70 - 14 * len(self.lines)
+            self.lines.append(arcade.Text("", 10, y, arcade.color.YELLOW,
+                                          font_size=10, font_name="Courier New"))
+        for line, text in zip(self.lines, texts):
+            line.text = text
+        del self.lines[len(texts):]
+
     def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
-    
-    def advance(self):
+        if self.frames % OVERLAY_REFRESH == 0:
+            self.refresh()
+        self.frames += 1
+        for line in self.lines:
+            line.draw()
+
+def centered_text(text, y, color, font_size):
+    """
+    Makes an arcade.Text centered across the screen, it is laid out once
+    and can then be drawn every frame for almost nothing
+    """
+    return arcade.Text(text, SCREEN_WIDTH/2, y, color, font_size=font_size, anchor_x="center")
+
+class Menu_Screen(arcade.View):
+    """
+    Base class for screens that don't change while they are shown.
+    Their text is made by make_texts() the first time the screen is drawn
+    and then drawn again from the cache until refresh() is called
+    """
+    def __init__(self):
+        super().__init__()
+        self.texts = None
+
+    def make_texts(self):
         """
-        Overrides advance() from parent
+        Returns the arcade.Text objects of the screen
         """
-        super().advance()
-        #self.lives decrements as it moves
-        self.lives -= 1
-        #if there are no more self.lives(equal or greater to 0), bullet is no longer alive
-        if self.lives <= 0:
-            self.alive = False
-    
-    def fire(self):
+        return []
+
+    def refresh(self):
         """
-        Bullets are should start with the same velocity of the ship (speed and direction)
-        plus 10 pixels per frame in the direction the ship is pointed.
+        Makes the text again on the next draw, for when something changed
         """
-        #+90 is added to angle to make sure bullet's direction is positioned correctly from ship's direction
-        self.velocity.dx -= math.sin(math.radians(self.angle+90)) * BULLET_SPEED
-        self.velocity.dy += math.cos(math.radians(self.angle+90)) * BULLET_SPEED
+        self.texts = None
 
-class Alien(FlyingObjects):
-    """
-    Class for enemy alien ship that will shoot asteroids at the player
+    def on_draw(self):
+        arcade.start_render()
+        if self.texts is None:
+            self.texts = self.make_texts()
+        for text in self.texts:
+            text.draw()
+
+class Start_Screen(Menu_Screen):
     """
+    Class for the main menu or starting screen
+    """  
     def __init__(self):
-        super().__init__("asteroid_file/ufo.png", None)
+        super().__init__()
+        #made the first time the loading progress is drawn
+        self.progress_text = None
+
+    def on_show(self):
+        arcade.set_background_color(arcade.color.WHITE)
         
-    def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
+    def make_texts(self):
+        """
+        This will show the title and instructions for the game
+        """
+        return [
+            # displays title of game on top of screen
+            centered_text("Asteroid Shooting Game", SCREEN_HEIGHT-80, arcade.color.BLACK, 30),
+            #Text for instructions
+            centered_text("Instructions: Shoot all the asteroids on the screen with the SPACEBAR.",
+                          SCREEN_HEIGHT-110, arcade.color.BLACK, 15),
+            #Text for game modes
+            centered_text("Press 'e' for easy mode", SCREEN_HEIGHT-250, arcade.color.RED, 20),
+            centered_text("Press 'n' for normal mode", SCREEN_HEIGHT-300, arcade.color.RED, 20),
+            centered_text("Press 'h' for hard mode", SCREEN_HEIGHT-350, arcade.color.RED, 20),
+            centered_text("Press 'w' for endurance mode", SCREEN_HEIGHT-400, arcade.color.RED, 20),
+            centered_text("Press 'c' to continue the last saved game", SCREEN_HEIGHT-450,
+                          arcade.color.GRAY, 15),
+        ]
+
+    def on_draw(self):
+        super().on_draw()
+        self.draw_progress()
+
+    def draw_progress(self):
+        """
+        Shows a bar with how many of the assets are loaded while they load
+        """
+        done, total = ASSETS.progress()
+        if done == total:
+            return
+        if self.progress_text is None:
+            self.progress_text = centered_text("", 60, arcade.color.GRAY, 12)
+        text = "Loading assets {}/{}".format(done, total)
+        #the text is only laid out again when it changes
+        if self.progress_text.text != text:
+            self.progress_text.text = text
+        self.progress_text.draw()
+
+        left = SCREEN_WIDTH/4
+        width = SCREEN_WIDTH/2
+        arcade.draw_lrtb_rectangle_outline(left, left + width, 50, 40, arcade.color.GRAY)
+        arcade.draw_lrtb_rectangle_filled(left, left + width * done / total, 50, 40, arcade.color.GRAY)
         
-class Enemy_Bullets(FlyingObjects):
-    """
-    Class for enemy's projectiles or asteroids
-    """
-    def __init__(self, alien_angle, alien_x, alien_y):
-        super().__init__("asteroid_file/asteroid.png", BULLET_RADIUS)
-        self.speed = BULLET_SPEED
-        self.angle = alien_angle
-        self.center.x = alien_x
-        self.center.y = alien_y
-      
-    def draw(self):
-        arcade.draw_texture_rectangle(self.center.x, self.center.y, self.width, self.height, self.texture, self.angle, self.alpha)
-    
-    def advance(self):
-        """
-        Overrides advance() from parent class. Enemy asteroids will
-        only be "dead" or removed from the list once it is out of
-        the screen's boundaries
-        """
-        super().advance()
-        if self.center.x > SCREEN_WIDTH:
-            self.alive = False
-        elif self.center.y > SCREEN_HEIGHT:
-            self.alive = False
-        elif self.center.x < 0:
-            self.alive = False
-        elif self.center.y < 0:
-            self.alive = False
-            
-    def fire(self):
-        self.velocity.dx -= math.sin(math.radians(self.angle+270)) * BULLET_SPEED
-        self.velocity.dy += math.cos(math.radians(self.angle+270)) * BULLET_SPEED
-  
+    def on_key_press(self, key: int, modifiers: int):
+        """
+        The player can either choose easy mode, normal mode, and hard mode
+        depending on which keyboard key they press.
+        """      
+        if key == arcade.key.E:
+            game = Easy()
+            self.window.show_view(game)
+        elif key == arcade.key.N:
+            game = Normal()
+            self.window.show_view(game)
+        elif key == arcade.key.H:
+            game = Hard()
+            self.window.show_view(game)
+        elif key == arcade.key.W:
+            game = Endurance()
+            self.window.show_view(game)
+        elif key == arcade.key.C:
+            #the newest of the quick save and the autosave
+            paths = [save_path(name) for name in (QUICKSAVE_FILE, AUTOSAVE_FILE)]
+            paths = [path for path in paths if os.path.exists(path)]
+            if paths:
+                game = load_game(max(paths, key=os.path.getmtime))
+                self.window.show_view(game)
+
 class Easy(arcade.View):
     """
     This class handles all the game callbacks and interaction
-    This class will then call the appropriate functions of
-    each of the above classes.
+    The rules of the game live in a World from asteroid_world.py,
+    this class turns key presses into Inputs for it and draws it.
     You are welcome to modify anything in this class.
     """
+    #the World class with the rules of this game mode
+    world_class = World
+    #the world is stepped here, so it can be recorded, saved and loaded
+    local = True
 
-    def __init__(self):
+    def __init__(self, world=None):
         """
-        Sets up the initial conditions of the game
-        :param width: Screen width
-        :param height: Screen height
+        Sets up the initial conditions of the game, or carries on
+        playing world if one is given
         """
         super().__init__()
 
         self.held_keys = set()
+        #keys pressed and released since the last update
+        self.pressed_keys = set()
+        self.released_keys = set()
 
-        # TODO: declare anything here you need the game class to track
-        self.asteroids = []
-        self.bullets = []
-        self.ships = []
+        self.world = world if world is not None else self.world_class()
+        self.world.profiler = PROFILER
+        self.recorder = None
+        if RECORD_REPLAYS and self.local:
+            self.recorder = Replay_Recorder(self.world, KEY_ACTIONS)
+        #sparks are kept by the view and made by the world
+        self.particles = Particle_System()
+        self.world.particles = self.particles
+        #made the first time the particles are drawn
+        self.particle_renderer = None
+        #the game is saved every AUTOSAVE_INTERVAL seconds of play
+        self.autosave = True
+        #time not yet simulated, and how far the screen is between two steps
+        self.time_accumulator = 0.0
+        self.blend = 1.0
 
-        #5 Large Asteroids to be appended to asteroids list
-        for i in range(INITIAL_ROCK_COUNT):
-            Large = Large_Asteroids()
-            self.asteroids.append(Large)
-            
-        self.ships.append(Ship())
-        
         #Sounds for the game
         #All sound resources are from the arcade library
-        self.shoot_sound = arcade.sound.load_sound("asteroid_file/hurt5.wav")
-        self.collide_sound = arcade.sound.load_sound("asteroid_file/laser3.wav")
-        self.victory_sound = arcade.sound.load_sound("asteroid_file/coin1.wav")
-              
+        self.shoot_sound = SOUNDS.get("asteroid_file/hurt5.wav")
+        self.collide_sound = SOUNDS.get("asteroid_file/laser3.wav")
+        self.victory_sound = SOUNDS.get("asteroid_file/coin1.wav")
+
+        #F2 switches between batched sprite lists and drawing each object by itself
+        self.use_sprite_lists = USE_SPRITE_LISTS
+        self.sprite_layers = None
+        #F3 shows how long each phase of the game takes
+        self.profiler_overlay = None
+        #Instruction on how to pause the game
+        self.pause_text = centered_text("Press Esc. to pause the game", SCREEN_HEIGHT-40,
+                                        arcade.color.WHITE, 15)
+
     def on_show(self):
         arcade.set_background_color(arcade.color.SMOKY_BLACK)
-        
+
     def on_draw(self):
         """
         Called automatically by the arcade framework.
         Handles the responsibility of drawing all elements.
         """
 
+        start = time.perf_counter()
         # clear the screen to begin drawing
         arcade.start_render()
 
-        # TODO: draw each object
-        for asteroid in self.asteroids:
-            asteroid.draw()
-            
-        for bullet in self.bullets:
-            bullet.draw()
-            
-        for ship in self.ships:
-            ship.draw()
-            
-        #Instruction on how to pause the game 
-        arcade.draw_text("Press Esc. to pause the game", SCREEN_WIDTH/2, SCREEN_HEIGHT-40,
-                         arcade.color.WHITE, font_size=15, anchor_x="center")
-                      
-    def remove_deadObjects(self):
-        """
-        Removes dead objects from screen
-        """
-        for bullet in self.bullets:
-            #if bullet is dead, remove it from the list
-            if not bullet.alive:
-                self.bullets.remove(bullet)
-                
-        for asteroid in self.asteroids:
-            if not asteroid.alive:
-                self.asteroids.remove(asteroid)
-         
-        for ship in self.ships:
-            if not ship.alive:
-                self.ships.remove(ship)
-    
-    def check_asteroids(self):
-        """
-        This will check how many asteroids are left in the screen to show victory screen
-        """
-        if len(self.asteroids) <= 0:
-            victory = Victory(Normal())
-            self.victory_sound.play()
-            self.window.show_view(victory)
-                                      
-    def check_collisions(self):
-        """
-        Checks when flying objects collide
-        """
-        for bullet in self.bullets:
-            for asteroid in self.asteroids:
-                #bullet and asteroid both need to be alive for collision detection  
-                if bullet.alive and asteroid.alive:
-                    #max distance between the two flying objects
-                    too_close = asteroid.radius + bullet.radius
-                    #if the positions of asteroid and bullet are within close proximity,
-                    #check if the proximity is below the max distance and detect collision
-                    if abs(asteroid.center.x - bullet.center.x) < too_close and abs(asteroid.center.y - bullet.center.y) < too_close:
-                        bullet.alive = False
-                        asteroid.split(self.asteroids)
-           
-        
-       #same logic but with asteroids and the ship
-        for asteroid in self.asteroids:
-                for ship in self.ships:
-                    if asteroid.alive and ship.alive:
-                        too_close = ship.radius + asteroid.radius
-                        if abs(ship.center.x - asteroid.center.x) < too_close and abs(ship.center.y - asteroid.center.y) < too_close:
-                            #once ship gets hit by asteroid, it disappears from screen
-                            #along with the asteroid that caused the impact
-                            #a sound is also played for every collision
-                            self.collide_sound.play()
-                            ship.alive = False
-                            asteroid.alive = False
-                            #A new ship is made after every collision
-                            self.ships.append(Ship())
-        
-        #Move to victory screen once all asteroids are destroyed 
-        self.check_asteroids()                   
-                            
+        layers = self.world.get_layers()
+        if self.use_sprite_lists:
+            #sprite lists are made the first time they are needed
+            if self.sprite_layers is None:
+                self.sprite_layers = Sprite_Layers([name for name, objects in layers])
+            for name, objects in layers:
+                if isinstance(objects, Array_Field):
+                    self.sprite_layers.sync_field(name, objects, self.blend)
+                else:
+                    self.sprite_layers.sync(name, objects, self.blend)
+            self.sprite_layers.draw()
+        else:
+            # TODO: draw each object
+            for name, objects in layers:
+                if isinstance(objects, Array_Field):
+                    draw_field(objects, self.blend)
+                else:
+                    for flying_object in objects:
+                        draw_flying_object(flying_object, self.blend)
+
+        if self.particle_renderer is None:
+            self.particle_renderer = Particle_Renderer(self.window.ctx, self.particles.capacity)
+        self.particle_renderer.draw(self.particles)
+
+        self.pause_text.draw()
+        PROFILER.record("on_draw", time.perf_counter() - start)
+
+        if self.profiler_overlay is not None:
+            self.profiler_overlay.draw()
+
     def update(self, delta_time):
         """
         Update each object in the game.
+        The world is stepped at a fixed tick rate no matter how often
+        this is called, as many times as delta_time has room for.
         :param delta_time: tells us how much time has actually elapsed
         """
-        self.check_keys()
+        #what the steps of the last frame did
+        if TELEMETRY.enabled and self.local:
+            self.world.report_telemetry(TELEMETRY)
+        TELEMETRY.end_frame(delta_time)
+        tick = 1 / self.world.tick_rate
+        self.time_accumulator += min(delta_time, MAX_FRAME_TIME)
+        while self.time_accumulator >= tick:
+            self.time_accumulator -= tick
+            self.step_world()
+            if self.world.outcome is not None:
+                self.check_outcome()
+                MIXER.flush()
+                return
+        #sounds from every step of this frame are started together
+        MIXER.flush()
+        #the screen is drawn between the last two steps
+        self.blend = self.time_accumulator / tick
 
-        # TODO: Tell everything to advance or move forward one step in time
-        for asteroid in self.asteroids:
-            asteroid.advance()
-            
-        for bullet in self.bullets:
-            bullet.advance()
-            
-        for ship in self.ships:
-            ship.advance()
-            
-        #calls remove_deadObjects() as objects advance
-        self.remove_deadObjects()
-        
-        # TODO: Check for collisions
-        self.check_collisions()
-        
+    def step_world(self):
+        """
+        Moves the world forward one tick with the keys being held
+        """
+        inputs = Inputs.from_keys(self.held_keys, self.pressed_keys, KEY_ACTIONS)
+        if self.recorder is not None:
+            self.recorder.record(self.world, self.held_keys, self.pressed_keys, self.released_keys)
+        self.pressed_keys = set()
+        self.released_keys = set()
+
+        self.world.step(inputs)
+        self.play_sounds(self.world.events)
+        if self.autosave and self.world.frame_count % (AUTOSAVE_INTERVAL * self.world.tick_rate) == 0:
+            self.save_game(AUTOSAVE_FILE)
 
-    def check_keys(self):
+    def play_sounds(self, events):
         """
-        This function checks for keys that are being held down.
-        You will need to put your own method calls in here.
+        Plays the sounds for what happened in the world during the last step.
+        The mixer merges the same sound played many times in one frame
         """
-        for ship in self.ships:
-            
-            if arcade.key.LEFT in self.held_keys:
-                ship.turn_left()
-                
-            if arcade.key.RIGHT in self.held_keys:
-                ship.turn_right()
-                
-            if arcade.key.UP in self.held_keys:
-                ship.up_thrust()
+        for name, x, y in events:
+            if name == "shoot":
+                MIXER.trigger(self.shoot_sound)
+            elif name == "collide":
+                MIXER.trigger(self.collide_sound)
 
-            if arcade.key.DOWN in self.held_keys:
-                ship.down_thrust()
+    def save_replay(self):
+        """
+        Writes the recorded game to REPLAY_DIR, only the first time it's
+        called, and deletes the oldest replays past REPLAY_KEEP
+        """
+        if self.recorder is None:
+            return None
+        folder = os.path.join(GAME_DIR, REPLAY_DIR)
+        os.makedirs(folder, exist_ok=True)
+        name = "{}-{}.json.gz".format(self.world.mode, time.strftime("%Y%m%d-%H%M%S"))
+        path = self.recorder.save(os.path.join(folder, name), self.world)
+        self.recorder = None
+        replays = sorted((os.path.join(folder, entry) for entry in os.listdir(folder) if entry.endswith(".json.gz")),
+                         key=os.path.getmtime)
+        for old_path in replays[:-REPLAY_KEEP]:
+            os.remove(old_path)
+        return path
 
-            # Machine gun mode...
-            #if arcade.key.SPACE in self.held_keys:
-            #    pass
+    def save_game(self, name):
+        """
+        Writes a snapshot of the world to the file name in SAVE_DIR
+        """
+        os.makedirs(os.path.join(GAME_DIR, SAVE_DIR), exist_ok=True)
+        return save_snapshot(save_path(name), self.world)
 
+    def check_outcome(self):
+        """
+        Shows the victory or game over screen once the world is won or lost
+        """
+        self.save_replay()
+        #a finished game can't be continued
+        if self.autosave and os.path.exists(save_path(AUTOSAVE_FILE)):
+            os.remove(save_path(AUTOSAVE_FILE))
+        if self.world.outcome == VICTORY:
+            MIXER.trigger(self.victory_sound)
+            self.window.show_view(self.victory_view())
+        elif self.world.outcome == GAME_OVER:
+            self.window.show_view(self.game_over_view())
+
+    def victory_view(self):
+        """
+        Screen shown once all asteroids are destroyed. The next game is
+        only made if the player chooses to continue
+        """
+        return Victory(Normal)
+
+    def game_over_view(self):
+        """
+        Screen shown once the ship runs out of lives
+        """
+        return Game_Over(type(self))
 
     def on_key_press(self, key: int, modifiers: int):
         """
         Puts the current key in the set of keys that are being held.
-        You will need to add things here to handle firing the bullet.
+        Pressing the spacebar fires a bullet on the next update.
         """
-        for ship in self.ships:
+        for ship in self.world.ships:
             if ship.alive:
                 self.held_keys.add(key)
-                
-                if key == arcade.key.SPACE:
-                    # TODO: Fire the bullet here!
-                    #Passes ship's angle, x coordinate, and the y coordinate
-                    #to the bullet as parameters
-                    bullet = Bullet(ship.angle, ship.center.x, ship.center.y)
-                    self.bullets.append(bullet)
-                    bullet.fire()
-                    self.shoot_sound.play()
-        
+                self.pressed_keys.add(key)
+                break
+
         if key == arcade.key.ESCAPE:
             #Pause() class takes parameter game_view and current game mode is passed to preserve view's state
             pause = Pause(self)
             #shows pause screen
             self.window.show_view(pause)
 
+        if key == arcade.key.F5 and self.local:
+            self.save_game(QUICKSAVE_FILE)
+
+        if key == arcade.key.F9 and self.local and os.path.exists(save_path(QUICKSAVE_FILE)):
+            #the game being left is saved as a replay of its own
+            self.save_replay()
+            self.window.show_view(load_game(save_path(QUICKSAVE_FILE)))
+
+        if key == arcade.key.F2:
+            #the sprite lists are made again from scratch when switching back
+            self.use_sprite_lists = not self.use_sprite_lists
+            self.sprite_layers = None
+
+        if key == arcade.key.F3:
+            if self.profiler_overlay is None:
+                self.profiler_overlay = Profiler_Overlay(PROFILER)
+            else:
+                self.profiler_overlay = None
+
     def on_key_release(self, key: int, modifiers: int):
         """
         Removes the current key from the set of held keys.
         """
         if key in self.held_keys:
             self.held_keys.remove(key)
+            self.released_keys.add(key)
 
 class Normal(Easy):
     """
-    Normal mode class will inherit from Easy() and override certain methods
-    to include a "lives" system for the ship
+    Normal mode class will inherit from Easy() and use the
+    Normal_World rules, which include a "lives" system for the ship
     """
-    def __init__(self):
-        """
-        self.hearts represents the list of lives for the player's ship
-        """
-        super().__init__()
-        self.hearts = []
-        Heart_List(self.hearts)
-        
-    def on_draw(self):
-        """
-        Draws the hearts for the ship
-        """
-        super().on_draw()
-        for heart in self.hearts:
-            heart.draw()
-        
-    def remove_deadObjects(self):
-        super().remove_deadObjects()
-        for heart in self.hearts:
-            if not heart.alive:
-                self.hearts.remove(heart)
-                
-    def check_asteroids(self):
+    world_class = Normal_World
+
+    def victory_view(self):
         """
         Overrides victory screen
         """
-        super().check_asteroids()
-        if len(self.asteroids) <= 0:
-            victory = Victory(Hard())
-            self.victory_sound.play()
-            self.window.show_view(victory)
-                
-    def check_collisions(self):
-        """
-        Overriden to include ship's lives
-        """
-        for bullet in self.bullets:
-            for asteroid in self.asteroids: 
-                if bullet.alive and asteroid.alive:
-                    too_close = asteroid.radius + bullet.radius
-                    if abs(asteroid.center.x - bullet.center.x) < too_close and abs(asteroid.center.y - bullet.center.y) < too_close:
-                        bullet.alive = False
-                        asteroid.split(self.asteroids)
-           
-        #A ship only has 3 lives/hearts, and it will show a "game over" screen
-        #once all hearts are lost from collisions
-        if len(self.hearts) > 0:
-            for asteroid in self.asteroids:
-                for ship in self.ships:
-                    for heart in self.hearts:
-                        if asteroid.alive and ship.alive and heart.alive:
-                            too_close = ship.radius + asteroid.radius
-                            if abs(ship.center.x - asteroid.center.x) < too_close and abs(ship.center.y - asteroid.center.y) < too_close:
-                                self.collide_sound.play()
-                                ship.alive = False
-                                asteroid.alive = False
-                                heart.split(self.hearts)
-                                self.ships.append(Ship())
-        
-        self.check_asteroids()
-                            
-        if len(self.hearts) <= 0:
-            game_over = Game_Over(Normal())
-            self.window.show_view(game_over)
-            
+        return Victory(Hard)
+
 class Hard(Normal):
     """
     This class is the hard mode for the game which includes
     an enemy alien ship shooting asteroids at the player
     """
-    def __init__(self):
+    world_class = Hard_World
+
+    def victory_view(self):
         """
-        Overrides Normal's __init__ method to include
-        the enemy, enemy bullet list, and a frame count
+        Overrides victory screen
         """
-        super().__init__()
-        self.enemy_bullets = []
-        self.frame_count = 0
-        self.alien = Alien()
-        
+        return Final_Victory(Easy)
+
+class Endurance(Normal):
+    """
+    Endurance mode keeps sending bigger waves of asteroids until the
+    ship runs out of lives, so there is no victory screen
+    """
+    world_class = Endurance_World
+
+    def __init__(self, world=None):
+        super().__init__(world)
+        self.wave_text = arcade.Text("", 10, SCREEN_HEIGHT-30, arcade.color.WHITE, 15)
+
     def on_draw(self):
         super().on_draw()
-        self.alien.draw()
-        for enemy in self.enemy_bullets:
-            enemy.draw()
-            
-    def remove_deadObjects(self):
-        super().remove_deadObjects()
-        for enemy in self.enemy_bullets:
-            if not enemy.alive:
-                self.enemy_bullets.remove(enemy)
-                
-    def check_asteroids(self):
-        """
-        Overrides victory screen
-        """
-        super().check_asteroids()
-        if len(self.asteroids) <= 0:
-            victory = Final_Victory(Easy())
-            self.victory_sound.play()
-            self.window.show_view(victory)
-    
-    def check_collisions(self):
-        """
-        This overrides original check_collisions() method to include logic with the 
-        enemy alien's asteroids colliding with the ship
-        """
-        super().check_collisions()
-        for bullet in self.bullets:
-            for enemy in self.enemy_bullets:  
-                if bullet.alive and enemy.alive:
-                    too_close = enemy.radius + bullet.radius
-                    if abs(enemy.center.x - bullet.center.x) < too_close and abs(enemy.center.y - bullet.center.y) < too_close:
-                        bullet.alive = False
-                        enemy.alive = False
-                                
-        if len(self.hearts) > 0:
-            for enemy in self.enemy_bullets:
-                for ship in self.ships:
-                    for heart in self.hearts:
-                        if enemy.alive and ship.alive and heart.alive:
-                            too_close = ship.radius + enemy.radius
-                            if abs(ship.center.x - enemy.center.x) < too_close and abs(ship.center.y - enemy.center.y) < too_close:
-                                self.collide_sound.play()
-                                ship.alive = False
-                                enemy.alive = False
-                                heart.split(self.hearts)
-                                self.ships.append(Ship())
-        
-        self.check_asteroids()                     
-        
-        if len(self.hearts) <= 0:
-            game_over = Game_Over(Hard())
-            self.window.show_view(game_over)
-    
+        text = "Wave {}".format(self.world.waves.wave)
+        #the text is only laid out again when the wave changes
+        if self.wave_text.text != text:
+            self.wave_text.text = text
+        self.wave_text.draw()
+
+    def play_sounds(self, events):
+        super().play_sounds(events)
+        for name, x, y in events:
+            if name == "wave":
+                MIXER.trigger(self.victory_sound)
+
+class Coop_Client_View(Normal):
+    """
+    A co-op game played on a server, see asteroid_net.py. The view only
+    sends the keys being held and draws what the server's snapshots show
+    """
+    #the game is run by the server, there is nothing to record or save here
+    local = False
+
+    def __init__(self, server_address):
+        self.client = Coop_Client(make_socket(), server_address)
+        super().__init__(Remote_World(self.client))
+        self.autosave = False
+
     def update(self, delta_time):
-        """
-        update() function is overriden to include enemy shooting projectiles every 60 frames
-        """
-        super().update(delta_time)
-        self.frame_count +=1
-        
-        for enemy in self.enemy_bullets:
-            enemy.advance()
-       
-        #starting initial positions for the enemy alien
-        self.alien.center.x = SCREEN_WIDTH/8
-        self.alien.center.y = SCREEN_HEIGHT-80
-            
-        for ship in self.ships:
-            #calculate where the enemy will face
-            x_destination = ship.center.x
-            y_destination = ship.center.y
-                
-            x_diff = x_destination - self.alien.center.x
-            y_diff = y_destination - self.alien.center.y
-            angle = math.atan2(y_diff, x_diff)
-            
-            #This will make enemy face the current direction of the player
-            self.alien.angle = math.degrees(angle)- 270 
-            if self.frame_count % 60 == 0:
-                #The enemy will fire asteroids after every 60 frames
-                enemy_bullet = Enemy_Bullets(math.degrees(angle), self.alien.center.x, self.alien.center.y)
-                self.enemy_bullets.append(enemy_bullet)
-                enemy_bullet.fire()
-                
-class Pause(arcade.View):
+        client = self.client
+        client.poll()
+        held = [KEY_ACTIONS[key] for key in self.held_keys if key in KEY_ACTIONS]
+        client.send_inputs(held, arcade.key.SPACE in self.pressed_keys)
+        self.pressed_keys = set()
+        self.released_keys = set()
+        self.world.update()
+        if self.world.outcome is not None:
+            self.check_outcome()
+
+    def victory_view(self):
+        return Victory(Start_Screen)
+
+    def game_over_view(self):
+        return Game_Over(Start_Screen)
+
+class Pause(Menu_Screen):
     """
     This class is responsible for pausing the game
     """
@@ -840,28 +888,17 @@ class Pause(arcade.View):
     def on_show(self):
         arcade.set_background_color(arcade.color.ARSENIC)
 
-    def on_draw(self):
+    def make_texts(self):
         """
-        Called to draw things needed for pause screen
+        Called to make the text needed for pause screen
         """
-        arcade.start_render()
-
-        arcade.draw_text("Paused", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
-                         arcade.color.WHITE, font_size=50, anchor_x="center")
-
-        #Instructions displayed for resuming and going back to the main menu
-        arcade.draw_text("Press Esc. to return",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2,
-                         arcade.color.WHITE,
-                         font_size=15,
-                         anchor_x="center")        
-        arcade.draw_text("Press Enter to go back to starting screen",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2-30,
-                         arcade.color.WHITE,
-                         font_size=15,
-                         anchor_x="center")
+        return [
+            centered_text("Paused", SCREEN_HEIGHT/2+50, arcade.color.WHITE, 50),
+            #Instructions displayed for resuming and going back to the main menu
+            centered_text("Press Esc. to return", SCREEN_HEIGHT/2, arcade.color.WHITE, 15),
+            centered_text("Press Enter to go back to starting screen", SCREEN_HEIGHT/2-30,
+                          arcade.color.WHITE, 15),
+        ]
 
     def on_key_press(self, key, _modifiers):
         """
@@ -872,41 +909,31 @@ class Pause(arcade.View):
             self.window.show_view(self.game_view)
             
         elif key == arcade.key.ENTER: #go back to starting screen or main menu
+            self.game_view.save_replay()
             start = Start_Screen()
             self.window.show_view(start)
             
-class Game_Over(arcade.View):
+class Game_Over(Menu_Screen):
     """
     This class is responsible for the Game Over Screen which will appear
     once the player loses all the ship's lives
     """
-    def __init__(self, game_view):
+    def __init__(self, make_game):
         super().__init__()
-        self.game_view = game_view
+        #called to make a new game only when the player restarts
+        self.make_game = make_game
         
     def on_show(self):
         arcade.set_background_color(arcade.color.BLACK)
 
-    def on_draw(self):
-        arcade.start_render()
-        
-        arcade.draw_text("Game Over", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
-                         arcade.color.WHITE, font_size=50, anchor_x="center")
-
-        #Instructions for restarting game and going back to main menu
-        arcade.draw_text("Press r to restart game",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2,
-                         arcade.color.WHITE,
-                         font_size=15,
-                         anchor_x="center")
-        
-        arcade.draw_text("Press Enter to go back to the main menu",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2-30,
-                         arcade.color.WHITE,
-                         font_size=15,
-                         anchor_x="center")
+    def make_texts(self):
+        return [
+            centered_text("Game Over", SCREEN_HEIGHT/2+50, arcade.color.WHITE, 50),
+            #Instructions for restarting game and going back to main menu
+            centered_text("Press r to restart game", SCREEN_HEIGHT/2, arcade.color.WHITE, 15),
+            centered_text("Press Enter to go back to the main menu", SCREEN_HEIGHT/2-30,
+                          arcade.color.WHITE, 15),
+        ]
         
     def on_key_press(self, key, _modifiers):
         """
@@ -915,42 +942,33 @@ class Game_Over(arcade.View):
         to main menu
         """
         if key == arcade.key.R:
-            self.window.show_view(self.game_view)
+            self.window.show_view(self.make_game())
         elif key == arcade.key.ENTER:
             main_menu = Start_Screen()
             self.window.show_view(main_menu)
             
-class Victory(arcade.View):
+class Victory(Menu_Screen):
     """
     This class is responsible for the victory screen that will appear
     once the player shoots all the asteroids on the screen
     """
-    def __init__(self, game_view):
+    def __init__(self, make_game):
         super().__init__()
-        self.game_view = game_view
+        #called to make the next game only when the player continues
+        self.make_game = make_game
         
     def on_show(self):
         arcade.set_background_color(arcade.color.WHITE)
 
-    def on_draw(self):
-        arcade.start_render()
-        
-        arcade.draw_text("Congratulations! You have won!", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
-                         arcade.color.BLACK, font_size=25, anchor_x="center")
-
-        #Instructions for continuing to next level and going back to main menu        
-        arcade.draw_text("Press Enter to go back to the main menu",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2,
-                         arcade.color.BLACK,
-                         font_size=15,
-                         anchor_x="center")
-        arcade.draw_text("Click your mouse if you want to continue to the next game mode",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2-30,
-                         arcade.color.BLACK,
-                         font_size=15,
-                         anchor_x="center")
+    def make_texts(self):
+        return [
+            centered_text("Congratulations! You have won!", SCREEN_HEIGHT/2+50, arcade.color.BLACK, 25),
+            #Instructions for continuing to next level and going back to main menu
+            centered_text("Press Enter to go back to the main menu", SCREEN_HEIGHT/2,
+                          arcade.color.BLACK, 15),
+            centered_text("Click your mouse if you want to continue to the next game mode",
+                          SCREEN_HEIGHT/2-30, arcade.color.BLACK, 15),
+        ]
         
     def on_key_press(self, key, _modifiers):
         """
@@ -964,7 +982,7 @@ class Victory(arcade.View):
         """
         When player clicks mouse/trackpad, it will move on to the next game mode.
         """
-        game = self.game_view
+        game = self.make_game()
         self.window.show_view(game)
         
 class Final_Victory(Victory):
@@ -972,35 +990,25 @@ class Final_Victory(Victory):
     This class will show the final victory screen once the
     player completes all game modes or only the hard mode
     """   
+    def make_texts(self):
+        return [
+            centered_text("Congratulations! You've completed hard mode!", SCREEN_HEIGHT/2+50,
+                          arcade.color.BLACK, 25),
+            #Instructions for restarting on easy mode and going back to main menu
+            centered_text("Press Enter to go back to the main menu", SCREEN_HEIGHT/2-100,
+                          arcade.color.BLACK, 15),
+            centered_text("Press r to restart game on easy mode", SCREEN_HEIGHT/2-130,
+                          arcade.color.BLACK, 15),
+        ]
+
     def on_draw(self):
         super().on_draw()
-        arcade.start_render()
-        #attributes needed for the trophy image
-        alpha = 255
-        image = "asteroid_file/award.png"
-        texture = arcade.load_texture(image)
-        width = texture.width
-        height = texture.height
+        #the trophy comes from the texture registry instead of being loaded every frame
+        texture = TEXTURES.get("asteroid_file/award.png")
         angle = 1
-        
-        arcade.draw_text("Congratulations! You've completed hard mode!", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
-                         arcade.color.BLACK, font_size=25, anchor_x="center")
-        
-        arcade.draw_texture_rectangle(SCREEN_WIDTH/2, SCREEN_HEIGHT/2, width, height, texture, angle, alpha)
-
-        #Instructions for restarting on easy mode and going back to main menu       
-        arcade.draw_text("Press Enter to go back to the main menu",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2-100,
-                         arcade.color.BLACK,
-                         font_size=15,
-                         anchor_x="center")
-        arcade.draw_text("Press r to restart game on easy mode",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2-130,
-                         arcade.color.BLACK,
-                         font_size=15,
-                         anchor_x="center")
+        alpha = 255
+        arcade.draw_texture_rectangle(SCREEN_WIDTH/2, SCREEN_HEIGHT/2, texture.width, texture.height,
+                                      texture, angle, alpha)
         
     def on_key_press(self, key, _modifiers):
         """
@@ -1013,7 +1021,7 @@ class Final_Victory(Victory):
             main_menu = Start_Screen()
             self.window.show_view(main_menu)
         if key == arcade.key.R:
-            restart = self.game_view
+            restart = self.make_game()
             self.window.show_view(restart)
             
     def on_mouse_press(self, _x, _y, _button, _modifiers):
@@ -1022,6 +1030,70 @@ class Final_Victory(Victory):
         """
         pass
                   
+class Stress_View(arcade.View):
+    """
+    Runs a game view filled by a Stress_Scenario for a fixed number of
+    frames, timing its updates and drawing, then closes the window.
+    The world is stepped exactly once per frame so every run is the same
+    """
+    def __init__(self, scenario, frames):
+        super().__init__()
+        self.scenario = scenario
+        self.frames = frames
+        self.game_view = VIEW_MODES[scenario.mode](scenario.build())
+        #stress runs are not real games and are not recorded or saved
+        self.game_view.recorder = None
+        self.game_view.autosave = False
+        self.update_times = []
+        self.draw_times = []
+
+    def on_show(self):
+        self.game_view.on_show()
+
+    def on_draw(self):
+        start = time.perf_counter()
+        self.game_view.on_draw()
+        self.draw_times.append(time.perf_counter() - start)
+
+    def on_update(self, delta_time):
+        if len(self.update_times) >= self.frames:
+            self.finish()
+            return
+        start = time.perf_counter()
+        self.scenario.refill(self.game_view.world)
+        self.game_view.step_world()
+        MIXER.flush()
+        self.update_times.append(time.perf_counter() - start)
+
+    def finish(self):
+        """
+        Prints the timings and closes the window
+        """
+        print(self.scenario.describe())
+        #pieces split off on the last frame are not part of the load
+        self.scenario.trim(self.game_view.world)
+        print("{} frames, {} asteroids left".format(self.frames, len(self.game_view.world.asteroids)))
+        report("update", self.update_times)
+        report("draw", self.draw_times)
+        self.window.close()
+
+#Every game view by mode name
+VIEW_MODES = {World.mode: Easy, Normal_World.mode: Normal, Hard_World.mode: Hard,
+              Endurance_World.mode: Endurance}
+
+def save_path(name):
+    """
+    Returns the path of a save file in SAVE_DIR
+    """
+    return os.path.join(GAME_DIR, SAVE_DIR, name)
+
+def load_game(path):
+    """
+    Returns a game view of the right mode playing the snapshot at path
+    """
+    world = load_snapshot(path)
+    return VIEW_MODES[world.mode](world)
+
 """
 Credits and authors for the alien, hearts, purple asteroid, and trophy icons:
 https://www.flaticon.com/authors/pixel-buddha
@@ -1030,10 +1102,56 @@ https://www.flaticon.com/authors/good-ware
 https://www.flaticon.com/authors/freepik
 """
 
-# Creates the game and starts it going
-window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT)
-start = Start_Screen()
-window.show_view(start)
-arcade.run()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asteroids game")
+    parser.add_argument("--stress", action="store_true", help="run a stress scenario instead of the game")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write the time of every phase of every frame to PATH.csv and PATH.json on exit")
+    parser.add_argument("--join", metavar="HOST:PORT", help="play co-op on a server from asteroid_net.py")
+    parser.add_argument("--record", action="store_true",
+                        help="save every game to {}/ to play it again with asteroid_replay.py".format(REPLAY_DIR))
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record the game to a video file (needs ffmpeg) or a folder of PNG images")
+    add_stress_arguments(parser)
+    add_telemetry_arguments(parser)
+    args = parser.parse_args()
+    PROFILER.keep_history = args.profile is not None
+    RECORD_REPLAYS = args.record
+    TELEMETRY = telemetry_from_args("asteroids", args)
+
+    # Creates the game and starts it going
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT)
+    capture = Frame_Capture(window, args.capture) if args.capture else None
+    #the assets load in the background while the start screen is showing
+    ASSETS.start()
+    MIXER.start()
+    if args.stress:
+        #no frame rate limit, so the times show how fast the game can go
+        window.set_update_rate(1 / 1000)
+        window.set_vsync(False)
+        ASSETS.wait()
+        try:
+            start = Stress_View(scenario_from_args(args), args.frames)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.join:
+        host, _, port = args.join.rpartition(":")
+        ASSETS.wait()
+        start = Coop_Client_View((host, int(port)))
+    else:
+        start = Start_Screen()
+    window.show_view(start)
+    arcade.run()
+    if capture is not None:
+        capture.close()
+    TELEMETRY.close()
 
+    #a game still going when the window is closed is saved too
+    view = window.current_view
+    if isinstance(view, Pause):
+        view = view.game_view
+    if isinstance(view, Easy):
+        view.save_replay()
 
+    if args.profile:
+        PROFILER.dump(args.profile)
@@ -0,0 +1,154 @@
+"""
+File: asteroid_audio.py
+A small software mixer for the game's sound effects. Every WAV file is
+decoded once into PCM samples kept in memory. The game asks for sounds
+with trigger(), triggers of the same sound in one frame are merged into
+one voice, and each sound can only have a few voices playing at once.
+The samples are mixed on pyglet's audio thread, so the game thread only
+appends to a queue.
+"""
+import wave
+from collections import deque
+import numpy as np
+
+MIXER_RATE = 44100
+#Volume of a sound triggered once in a frame
+SOUND_VOLUME = 0.6
+#Most voices of the same sound that can play at once, the oldest is cut off
+VOICES_PER_SOUND = 4
+#Every extra trigger of a sound merged into one voice makes it this much louder
+MERGED_VOLUME_STEP = 0.25
+
+
+class Pcm_Sound:
+    """
+    A sound decoded into mono float samples at MIXER_RATE
+    """
+    def __init__(self, samples, max_voices=VOICES_PER_SOUND):
+        self.samples = samples
+        self.max_voices = max_voices
+
+    @staticmethod
+    def load(path, max_voices=VOICES_PER_SOUND):
+        """
+        Decodes a 8 or 16 bit PCM WAV file
+        """
+        with wave.open(path, "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            data = wav.readframes(wav.getnframes())
+
+        if width == 1:
+            samples = (np.frombuffer(data, np.uint8).astype(np.float32) - 128) / 128
+        elif width == 2:
+            samples = np.frombuffer(data, "<i2").astype(np.float32) / 32768
+        else:
+            raise ValueError("Only 8 and 16 bit WAV files can be played: " + path)
+
+        #stereo files are mixed down to mono
+        samples = samples.reshape(-1, channels).mean(axis=1)
+        if rate != MIXER_RATE:
+            length = int(len(samples) * MIXER_RATE / rate)
+            samples = np.interp(np.arange(length) * rate / MIXER_RATE,
+                                np.arange(len(samples)), samples).astype(np.float32)
+        return Pcm_Sound(samples, max_voices)
+
+
+class Audio_Mixer:
+    """
+    Mixes the playing sounds into one stream. trigger() and flush() are
+    called by the game, mix() is called by the audio thread
+    """
+    def __init__(self):
+        #sound -> number of triggers since the last flush
+        self.triggers = {}
+        #(sound, volume) waiting for the audio thread, deque is thread safe
+        self.queue = deque()
+        #[sound, position, volume] of every voice playing, only used by the audio thread
+        self.voices = []
+        self.player = None
+        self.dropped = 0
+
+    def trigger(self, sound):
+        """
+        Asks for a sound to play at the end of this frame
+        """
+        self.triggers[sound] = self.triggers.get(sound, 0) + 1
+
+    def flush(self):
+        """
+        Sends this frame's sounds to the audio thread, a sound triggered
+        several times in one frame is started once and a little louder
+        """
+        if self.player is not None:
+            for sound, count in self.triggers.items():
+                volume = SOUND_VOLUME * (1 + MERGED_VOLUME_STEP * (count - 1))
+                self.queue.append((sound, min(1.0, volume)))
+        self.triggers.clear()
+
+    def start_voices(self):
+        while self.queue:
+            sound, volume = self.queue.popleft()
+            playing = [voice for voice in self.voices if voice[0] is sound]
+            if len(playing) >= sound.max_voices:
+                #the oldest voice of the sound makes room for the new one
+                self.voices.remove(playing[0])
+                self.dropped += 1
+            self.voices.append([sound, 0, volume])
+
+    def mix(self, length):
+        """
+        Returns the next length samples of all the voices as 16 bit PCM
+        """
+        self.start_voices()
+        buffer = np.zeros(length, np.float32)
+        playing = []
+        for voice in self.voices:
+            sound, position, volume = voice
+            part = sound.samples[position:position + length]
+            buffer[:len(part)] += part * volume
+            voice[1] = position + length
+            if voice[1] < len(sound.samples):
+                playing.append(voice)
+        self.voices = playing
+        np.clip(buffer, -1.0, 1.0, out=buffer)
+        return (buffer * 32767).astype("<i2").tobytes()
+
+    def start(self):
+        """
+        Starts playing the mixed stream through pyglet. Without a working
+        audio device the mixer stays off and sounds are skipped
+        """
+        try:
+            import pyglet.media
+            player = pyglet.media.Player()
+            player.queue(make_mixer_source(self, pyglet.media))
+            player.play()
+        except Exception as error:
+            print("Sound is off:", error)
+            return False
+        self.player = player
+        return True
+
+
+def make_mixer_source(mixer, media):
+    """
+    Makes a never ending pyglet source that pulls its audio from the mixer.
+    pyglet is only imported once a mixer is started, so the class is made here
+    """
+    class Mixer_Source(media.StreamingSource):
+        def __init__(self):
+            self.audio_format = media.codecs.AudioFormat(channels=1, sample_size=16, sample_rate=MIXER_RATE)
+            self.timestamp = 0.0
+
+        def get_audio_data(self, num_bytes, compensation_time=0.0):
+            #two bytes per 16 bit sample
+            length = max(1, num_bytes // 2)
+            data = mixer.mix(length)
+            duration = length / MIXER_RATE
+            audio_data = media.codecs.AudioData(data, len(data), self.timestamp, duration, [])
+            self.timestamp += duration
+            return audio_data
+
+    return Mixer_Source()
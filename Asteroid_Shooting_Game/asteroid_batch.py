@@ -0,0 +1,264 @@
+"""
+File: asteroid_batch.py
+Plays thousands of headless asteroids games to tune the difficulty.
+Every combination of the constants given with --param is played with
+each input policy and many seeds, spread over a pool of processes, and
+the win rate, time to clear and lives lost of each combination are
+written to a CSV or JSON file.
+
+    python asteroid_batch.py --mode normal --policy aim random --games 200 \
+        --param SHIP_THRUST_AMOUNT=0.15,0.25,0.35 --param ALIEN_FIRE_INTERVAL=40,60 \
+        --out results.csv
+"""
+import argparse
+import csv
+import inspect
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import time
+import numpy as np
+import asteroid_world
+from asteroid_world import (TURN_LEFT, TURN_RIGHT, THRUST_UP, FIRE, VICTORY, GAME_OVER,
+                            SCREEN_WIDTH, SCREEN_HEIGHT, Inputs, WORLD_MODES)
+
+#Longest a single game can last before it counts as a timeout, in seconds
+BATCH_TIME_LIMIT = 180
+#The aim policy only turns when the ship is this many degrees off target
+AIM_TOLERANCE = 4
+
+#Constants of asteroid_world that --param can sweep. These are read from
+#the module every time they are used, so they are set for each game
+TUNABLE_CONSTANTS = ("BULLET_SPEED", "BULLET_LIFE", "MACHINE_GUN_DELAY",
+                     "SHIP_TURN_AMOUNT", "SHIP_THRUST_AMOUNT", "INITIAL_ROCK_COUNT",
+                     "BIG_ROCK_SPEED", "BIG_ROCK_SPIN", "MEDIUM_ROCK_SPIN", "SMALL_ROCK_SPIN",
+                     "WAVE_ROCK_GROWTH", "WAVE_SMALL_ROCK_STEP", "WAVE_SPEED_STEP",
+                     "WAVE_MAX_SPEEDUP", "WAVE_MEDIUM_ROCK_SPEED", "WAVE_SMALL_ROCK_SPEED",
+                     "WAVE_DELAY")
+#These are bound when the World is made, so they are given to the modes
+#that take them as the argument named here instead
+WORLD_ARGUMENTS = {"TICK_RATE": "tick_rate",
+                   "ALIEN_FIRE_INTERVAL": "alien_layout",
+                   "WAVE_SPAWN_BUDGET": "spawn_budget",
+                   "WAVE_MAX_ROCKS": "max_rocks",
+                   "COOP_PLAYERS": "players"}
+
+
+#An input policy is made with a random number generator and returns a
+#function that gives the Inputs for each step of a world
+
+def idle_policy(rng):
+    """
+    Never presses anything
+    """
+    def inputs(world):
+        return Inputs()
+    return inputs
+
+def random_policy(rng):
+    """
+    Holds a random set of keys, changing them every quarter of a second
+    """
+    held = []
+    def inputs(world):
+        if world.frame_count % (world.tick_rate // 4 or 1) == 0:
+            held[:] = [action for action in (TURN_LEFT, TURN_RIGHT, THRUST_UP, FIRE)
+                       if rng.random() < 0.4]
+        return Inputs(held)
+    return inputs
+
+def spin_fire_policy(rng):
+    """
+    Turns left while holding the spacebar
+    """
+    def inputs(world):
+        return Inputs((TURN_LEFT, FIRE))
+    return inputs
+
+def aim_policy(rng):
+    """
+    Turns toward the nearest asteroid and fires while holding the spacebar
+    """
+    return aim_inputs
+
+def aim_inputs(world):
+    """
+    Inputs of the aim policy, it doesn't need random numbers
+    """
+    field = world.asteroids
+    ship = next((ship for ship in world.ships if ship.alive), None)
+    if ship is None or field.count == 0:
+        return Inputs()
+    n = field.count
+    dx = asteroid_world.wrapped_offset(field.x[:n] - ship.center.x, SCREEN_WIDTH)
+    dy = asteroid_world.wrapped_offset(field.y[:n] - ship.center.y, SCREEN_HEIGHT)
+    nearest = int(np.argmin(dx * dx + dy * dy))
+    #the ship points at (-sin(angle), cos(angle))
+    target = math.degrees(math.atan2(-dx[nearest], dy[nearest]))
+    turn = (target - ship.angle + 180) % 360 - 180
+    if turn > AIM_TOLERANCE:
+        return Inputs((TURN_LEFT, FIRE))
+    if turn < -AIM_TOLERANCE:
+        return Inputs((TURN_RIGHT, FIRE))
+    return Inputs((FIRE,))
+
+#Every input policy by name
+POLICIES = {"idle": idle_policy, "random": random_policy,
+            "spin_fire": spin_fire_policy, "aim": aim_policy}
+
+
+def set_constants(params):
+    """
+    Overrides the TUNABLE_CONSTANTS in params and returns their old values
+    """
+    old = {}
+    for name, value in params.items():
+        if name in TUNABLE_CONSTANTS:
+            old[name] = getattr(asteroid_world, name)
+            setattr(asteroid_world, name, value)
+    return old
+
+def make_world(mode, params, seed):
+    """
+    Returns a World of mode, given the WORLD_ARGUMENTS in params it takes
+    """
+    world_class = WORLD_MODES[mode]
+    accepted = inspect.signature(world_class).parameters
+    arguments = {}
+    for name, value in params.items():
+        argument = WORLD_ARGUMENTS.get(name)
+        if argument not in accepted:
+            continue
+        if argument == "alien_layout":
+            value = [(x, y, value, delay) for x, y, interval, delay in asteroid_world.ALIEN_LAYOUT]
+        arguments[argument] = value
+    return world_class(seed, **arguments)
+
+def play_game(task):
+    """
+    Plays one game with no window. task is (mode, params, policy, seed)
+    and the result is a dictionary about how the game went
+    """
+    mode, params, policy_name, seed = task
+    old = set_constants(params)
+    try:
+        world = make_world(mode, params, seed)
+        policy = POLICIES[policy_name](random.Random(seed))
+        max_frames = BATCH_TIME_LIMIT * world.tick_rate
+        lives_lost = 0
+        while world.outcome is None and world.frame_count < max_frames:
+            world.step(policy(world))
+            for name, x, y in world.events:
+                if name == "collide":
+                    lives_lost += 1
+    finally:
+        set_constants(old)
+
+    result = {"outcome": world.outcome or "timeout",
+              "seconds": world.frame_count / world.tick_rate,
+              "lives_lost": lives_lost}
+    if hasattr(world, "waves"):
+        #endurance games are never won, how far they got is what counts
+        result["wave"] = world.waves.wave
+    return result
+
+def parse_param(text):
+    """
+    Turns NAME=1,2,3 into (NAME, [1, 2, 3]), the values get the type of
+    the constant they replace
+    """
+    name, _, values = text.partition("=")
+    if name not in TUNABLE_CONSTANTS and name not in WORLD_ARGUMENTS or not values:
+        raise argparse.ArgumentTypeError("expected NAME=V1,V2,... where NAME is one of {}: {}".format(
+            ", ".join(TUNABLE_CONSTANTS + tuple(WORLD_ARGUMENTS)), text))
+    kind = type(getattr(asteroid_world, name))
+    try:
+        return name, [kind(value) for value in values.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("{} takes {} values: {}".format(name, kind.__name__, text))
+
+def make_tasks(modes, policies, grid, games, first_seed):
+    """
+    Returns every game to play and the parameter combinations. The same
+    seeds are used for every combination so they are compared fairly
+    """
+    names = [name for name, values in grid]
+    combinations = [dict(zip(names, values))
+                    for values in itertools.product(*[values for name, values in grid])]
+    tasks = []
+    for mode, policy, params in itertools.product(modes, policies, combinations):
+        for seed in range(first_seed, first_seed + games):
+            tasks.append((mode, params, policy, seed))
+    return tasks
+
+def summarize(tasks, results):
+    """
+    Adds up the results of every game of the same mode, policy and parameters
+    """
+    groups = {}
+    for (mode, params, policy, seed), result in zip(tasks, results):
+        key = (mode, policy, tuple(sorted(params.items())))
+        groups.setdefault(key, []).append(result)
+
+    rows = []
+    for (mode, policy, params), games in groups.items():
+        wins = [game for game in games if game["outcome"] == VICTORY]
+        row = {"mode": mode, "policy": policy}
+        row.update(params)
+        row["games"] = len(games)
+        row["win_rate"] = len(wins) / len(games)
+        row["game_over_rate"] = sum(game["outcome"] == GAME_OVER for game in games) / len(games)
+        row["timeout_rate"] = sum(game["outcome"] == "timeout" for game in games) / len(games)
+        row["mean_clear_seconds"] = float(np.mean([game["seconds"] for game in wins])) if wins else None
+        row["mean_lives_lost"] = float(np.mean([game["lives_lost"] for game in games]))
+        if "wave" in games[0]:
+            row["mean_wave"] = float(np.mean([game["wave"] for game in games]))
+        rows.append(row)
+    return rows
+
+def write_results(path, rows):
+    """
+    Writes the rows as JSON if the path ends with .json, otherwise as CSV
+    """
+    if path.endswith(".json"):
+        with open(path, "w") as json_file:
+            json.dump(rows, json_file, indent=1)
+        return
+    columns = []
+    for row in rows:
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays many headless asteroids games to tune the difficulty")
+    parser.add_argument("--mode", nargs="+", choices=sorted(WORLD_MODES), default=["normal"])
+    parser.add_argument("--policy", nargs="+", choices=sorted(POLICIES), default=["aim"])
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        help="constant to sweep, as NAME=V1,V2,... (can be given more than once)")
+    parser.add_argument("--games", type=int, default=100, help="games per combination")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--out", default="batch_results.csv")
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.mode, args.policy, args.param, args.games, args.seed)
+    start = time.perf_counter()
+    #games are sent in chunks so the processes spend their time playing, not waiting
+    chunk = max(1, len(tasks) // (args.workers * 8))
+    with multiprocessing.Pool(args.workers) as pool:
+        results = pool.map(play_game, tasks, chunksize=chunk)
+    rows = summarize(tasks, results)
+    write_results(args.out, rows)
+    print("{} games on {} processes in {:.1f} s, results in {}".format(
+        len(tasks), args.workers, time.perf_counter() - start, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+File: asteroid_hitbox.py
+Hit shapes of the asteroid game's images. The shape of an image is the
+convex polygon around its opaque pixels, simplified to a few corners.
+Shapes are worked out once per image and kept in HITBOX_CACHE, keyed by
+the SHA-1 of the image file, so a changed image gets a new shape and
+the game doesn't read the pixels again every time it starts.
+
+The World first checks the circles around the shapes, which is cheap.
+Pairs whose circles inside the shapes touched are hits without looking
+further, and only the pairs in between are tested with the polygons.
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+#Folder of the game, image paths and the cache are relative to it
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+HITBOX_CACHE = "hitbox_cache.json"
+#Pixels more see-through than this are not part of the shape
+HITBOX_ALPHA_THRESHOLD = 64
+#Most corners a shape keeps, and corners cutting off less than this many
+#square pixels are dropped even below that
+HITBOX_MAX_VERTICES = 8
+HITBOX_TOLERANCE = 4.0
+
+#Shapes already made in this process, by image path
+SHAPES = {}
+
+
+class Hit_Shape:
+    """
+    Convex polygon with its corners counter-clockwise around the center
+    of the image, y going up like the screen
+    """
+    def __init__(self, points):
+        self.points = np.array(points, dtype=float)
+        #the normal of each edge points out of the polygon
+        edges = np.roll(self.points, -1, axis=0) - self.points
+        self.normals = np.column_stack([edges[:, 1], -edges[:, 0]])
+        #circle around the polygon, used for the cheap test
+        self.radius = float(np.sqrt((self.points ** 2).sum(axis=1)).max())
+        #circle inside the polygon, anything touching it touches the polygon
+        lengths = np.maximum(np.sqrt((self.normals ** 2).sum(axis=1)), 1e-12)
+        self.inner_radius = max(0.0, float(((self.normals * self.points).sum(axis=1) / lengths).min()))
+
+
+def cross(origin, a, b):
+    return (a[0] - origin[0]) * (b[1] - origin[1]) - (a[1] - origin[1]) * (b[0] - origin[0])
+
+def convex_hull(points):
+    """
+    Returns the corners of the convex hull of the points counter-clockwise,
+    with the monotone chain algorithm
+    """
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+    lower = []
+    for point in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    upper = []
+    for point in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return lower[:-1] + upper[:-1]
+
+def simplify(points, max_vertices=HITBOX_MAX_VERTICES, tolerance=HITBOX_TOLERANCE):
+    """
+    Drops the corners of a convex polygon that cut off the least area
+    until at most max_vertices are left and every corner left matters
+    """
+    points = list(points)
+    while len(points) > 3:
+        count = len(points)
+        areas = [abs(cross(points[i - 1], points[i], points[(i + 1) % count])) / 2 for i in range(count)]
+        smallest = min(range(count), key=areas.__getitem__)
+        if count <= max_vertices and areas[smallest] >= tolerance:
+            break
+        del points[smallest]
+    return points
+
+def image_outline(path, threshold=HITBOX_ALPHA_THRESHOLD):
+    """
+    Returns the simplified convex polygon around the opaque pixels of an image
+    """
+    #Pillow comes with arcade, it's only needed when a shape isn't cached yet
+    from PIL import Image
+    with Image.open(path) as image:
+        alpha = np.asarray(image.convert("RGBA"))[:, :, 3]
+    height, width = alpha.shape
+    opaque = alpha > threshold
+    rows = np.flatnonzero(opaque.any(axis=1))
+    if len(rows) == 0:
+        return [(-width / 2, -height / 2), (width / 2, -height / 2),
+                (width / 2, height / 2), (-width / 2, height / 2)]
+    #only the first and last opaque pixel of each row can be on the hull
+    left = opaque[rows].argmax(axis=1)
+    right = width - opaque[rows, ::-1].argmax(axis=1)
+    points = []
+    for row, first, last in zip(rows.tolist(), left.tolist(), right.tolist()):
+        top = height / 2 - row
+        for x in (first - width / 2, last - width / 2):
+            points.append((x, top))
+            points.append((x, top - 1))
+    return simplify(convex_hull(points))
+
+def load_cache(path):
+    """
+    Returns the outlines saved in the cache, or none if the cache was
+    made with other settings
+    """
+    try:
+        with open(path) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("settings") != [HITBOX_ALPHA_THRESHOLD, HITBOX_MAX_VERTICES, HITBOX_TOLERANCE]:
+        return {}
+    return cache.get("outlines", {})
+
+def save_cache(path, outlines):
+    temporary = path + ".tmp"
+    try:
+        with open(temporary, "w") as cache_file:
+            json.dump({"settings": [HITBOX_ALPHA_THRESHOLD, HITBOX_MAX_VERTICES, HITBOX_TOLERANCE],
+                       "outlines": outlines}, cache_file)
+        os.replace(temporary, path)
+    except OSError:
+        #the shapes still work, they're only worked out again next time
+        pass
+
+def hit_shape(image):
+    """
+    Returns the Hit_Shape of an image path, from this process, from the
+    cache file or from the image's pixels
+    """
+    shape = SHAPES.get(image)
+    if shape is not None:
+        return shape
+    path = os.path.join(GAME_DIR, image)
+    with open(path, "rb") as image_file:
+        key = hashlib.sha1(image_file.read()).hexdigest()
+    cache_path = os.path.join(GAME_DIR, HITBOX_CACHE)
+    outlines = load_cache(cache_path)
+    if key not in outlines:
+        outlines[key] = image_outline(path)
+        save_cache(cache_path, outlines)
+    shape = SHAPES[image] = Hit_Shape(outlines[key])
+    return shape
+
+
+def stack_shapes(shapes):
+    """
+    Returns the corners and edge normals of several shapes as two arrays
+    with one row per shape. Shapes with fewer corners repeat their last
+    corner and get normals of zero, which changes nothing in shapes_touch()
+    """
+    count = max(len(shape.points) for shape in shapes)
+    points = np.zeros((len(shapes), count, 2))
+    normals = np.zeros((len(shapes), count, 2))
+    for row, shape in enumerate(shapes):
+        corners = len(shape.points)
+        points[row, :corners] = shape.points
+        points[row, corners:] = shape.points[-1]
+        normals[row, :corners] = shape.normals
+    return points, normals
+
+def turning(angles):
+    """
+    Returns the matrices that turn points counter-clockwise by angles
+    degrees like arcade turns sprites, as points @ matrix
+    """
+    radians = np.radians(angles)
+    matrices = np.empty(radians.shape + (2, 2))
+    matrices[..., 0, 0] = matrices[..., 1, 1] = np.cos(radians)
+    matrices[..., 0, 1] = np.sin(radians)
+    matrices[..., 1, 0] = -matrices[..., 0, 1]
+    return matrices
+
+def turned(points, angles):
+    """
+    Returns corners or normals turned counter-clockwise by angles degrees,
+    one row of them per angle
+    """
+    return points @ turning(np.asarray(angles, dtype=float))
+
+def spread(projected):
+    """
+    Returns the lowest and highest of projected corners along each axis.
+    Going corner by corner is faster than min() and max() over the short
+    middle axis, since each step works on every pair and axis at once
+    """
+    low = np.minimum(projected[:, 0], projected[:, 1])
+    high = np.maximum(projected[:, 0], projected[:, 1])
+    for corner in range(2, projected.shape[1]):
+        np.minimum(low, projected[:, corner], out=low)
+        np.maximum(high, projected[:, corner], out=high)
+    return low, high
+
+def shapes_touch(points, normals, other_points, other_normals, end_x, end_y, move_x, move_y):
+    """
+    Separating axis test between rows of pairs of shapes. Each side is the
+    corners and normals of a Hit_Shape, or one row of them per pair from
+    stack_shapes(), already turned like its sprite with turned(). end is
+    where the first shape ended up relative to the second one and move is
+    how far it moved relative to it during the step, so the first shape
+    is checked along its whole path like swept_distance() does for circles.
+    Returns a bool array, True where the shapes touched
+    """
+    end_x, end_y, move_x, move_y = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(value, dtype=float)) for value in (end_x, end_y, move_x, move_y)))
+    rows = len(end_x)
+    count = normals.shape[-2]
+
+    #the edges of both shapes and the side of the move are the axes to try
+    axes = np.empty((rows, count + other_normals.shape[-2] + 1, 2))
+    axes[:, :count] = normals
+    axes[:, count:-1] = other_normals
+    axes[:, -1, 0] = -move_y
+    axes[:, -1, 1] = move_x
+    axes = axes.transpose(0, 2, 1)
+
+    low, high = spread(points @ axes)
+    offset = end_x[:, np.newaxis] * axes[:, 0] + end_y[:, np.newaxis] * axes[:, 1]
+    #the shape started the step move behind where it ended
+    back = -(move_x[:, np.newaxis] * axes[:, 0] + move_y[:, np.newaxis] * axes[:, 1])
+    low += offset + np.minimum(back, 0.0)
+    high += offset + np.maximum(back, 0.0)
+
+    other_low, other_high = spread(other_points @ axes)
+    return ~((high < other_low) | (other_high < low)).any(axis=1)
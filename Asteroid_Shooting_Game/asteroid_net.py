@@ -0,0 +1,794 @@
+"""
+File: asteroid_net.py
+Co-op over UDP. The server runs the only real World and every client
+steers one of its ships. Clients send the keys they hold, and the server
+sends each client a snapshot of the world every few ticks.
+
+Snapshots are kept small and the same size however many rocks there are:
+    - positions and angles are rounded to small integers
+    - a rock only moves in a straight line, so it is sent once when it
+      appears and its id once when it is destroyed. A snapshot only has
+      the rocks that appeared or were destroyed since the last snapshot
+      the client said it got, and the client works out where every rock
+      is from where and when it appeared
+    - ships and bullets are few, so all of them are in every snapshot
+A snapshot with more rock changes than fit in one packet, like the first
+one a client gets, is split into parts that each fit. The client only
+uses a snapshot once it has every part, a lost part is made up for by
+the next snapshot.
+Clients draw the world a little in the past, between two snapshots, so
+lost and late packets don't make the ships jump.
+
+Run a server, then join it from the game:
+    python asteroid_net.py serve --port 50505
+    python ALIDO_asteroidsfinal.py --join 127.0.0.1:50505
+Try it over localhost with lost and late packets and no window:
+    python asteroid_net.py test --loss 0.1 --latency 0.05 --rocks 20 200 400
+"""
+import argparse
+import heapq
+import random
+import socket
+import struct
+import time
+import zlib
+from collections import deque
+import numpy as np
+from asteroid_world import (SCREEN_WIDTH, SCREEN_HEIGHT, REFERENCE_TICK_RATE, TICK_RATE,
+                            TURN_LEFT, TURN_RIGHT, THRUST_UP, THRUST_DOWN, FIRE,
+                            BIG_ROCK_SPIN, MEDIUM_ROCK_SPIN, SMALL_ROCK_SPIN,
+                            VICTORY, GAME_OVER, COOP_PLAYERS, Inputs, Asteroid_Field,
+                            Ship, Bullet, Heart_List, Coop_World, wrapped_offset)
+from asteroid_stress import Stress_Scenario
+
+NET_PORT = 50505
+#The server sends a snapshot every this many ticks
+SNAPSHOT_INTERVAL = 3
+#Ticks of rock changes the server keeps. A client that hasn't said it got a
+#snapshot for longer than this gets every rock again
+HISTORY_TICKS = 120
+#Clients draw the world this many seconds behind the newest snapshot
+INTERPOLATION_DELAY = 0.1
+#A client that sends nothing for this long loses its ship
+CLIENT_TIMEOUT = 5.0
+#Clients keep destroyed rocks this many ticks, since they draw the past
+GONE_ROCK_TICKS = 60
+#A ship that moves farther than this between two snapshots was made again
+#after a hit, and is not slid across the screen
+SHIP_JUMP = 100
+#Snapshots bigger than this are compressed with zlib
+COMPRESS_OVER = 512
+#Most bytes of a snapshot part before compression, so a packet fits in
+#the 1500 byte MTU of most networks with room for the IP and UDP headers
+MAX_SNAPSHOT_PAYLOAD = 1200
+#Most parts of snapshots a client keeps while waiting for the rest
+PENDING_SNAPSHOTS = 8
+
+#Positions are sent in 1/8 pixels, velocities in 1/64 pixels per frame
+#and angles in 1/65536 or 1/256 of a turn
+POSITION_SCALE = 8
+VELOCITY_SCALE = 64
+ANGLE_SCALE = 65536 / 360
+BULLET_ANGLE_SCALE = 256 / 360
+
+#Packet types, the first byte of every packet
+INPUT = b"I"
+SNAPSHOT = b"S"
+COMPRESSED_SNAPSHOT = b"Z"
+
+#Actions are sent as bits, in this order
+ACTIONS = (TURN_LEFT, TURN_RIGHT, THRUST_UP, THRUST_DOWN, FIRE)
+OUTCOMES = (None, VICTORY, GAME_OVER)
+#Snapshot with every rock, not changes since a baseline
+NO_BASELINE = 0xFFFFFFFF
+
+#type, sequence number, newest snapshot frame received, held actions,
+#number of times fire was pressed
+INPUT_PACKET = struct.Struct("<cIIBH")
+#frame, baseline frame, part number, number of parts, player, hearts,
+#outcome, tick rate, number of ships, bullets, new rocks and destroyed rocks.
+#Ships and bullets are only in the first part of a snapshot
+SNAPSHOT_HEADER = struct.Struct("<IIBBBBBHHHHH")
+SHIP_RECORD = np.dtype([("player", "u1"), ("x", "<i2"), ("y", "<i2"), ("angle", "<u2")])
+BULLET_RECORD = np.dtype([("x", "<i2"), ("y", "<i2"), ("dx", "<i2"), ("dy", "<i2"), ("angle", "u1")])
+#a rock as it was on the frame it was sent from
+ROCK_RECORD = np.dtype([("id", "<u4"), ("frame", "<u4"), ("size", "u1"), ("x", "<i2"), ("y", "<i2"),
+                        ("angle", "<u2"), ("dx", "<f4"), ("dy", "<f4")])
+#a rock that was destroyed and the first frame it was gone
+DESTROYED_RECORD = np.dtype([("id", "<u4"), ("frame", "<u4")])
+#spin of each size class, clients turn the rocks themselves
+ROCK_SPINS = np.array([BIG_ROCK_SPIN, MEDIUM_ROCK_SPIN, SMALL_ROCK_SPIN], dtype=float)
+
+
+def action_bits(actions):
+    bits = 0
+    for bit, action in enumerate(ACTIONS):
+        if action in actions:
+            bits |= 1 << bit
+    return bits
+
+def bit_actions(bits):
+    return [action for bit, action in enumerate(ACTIONS) if bits & (1 << bit)]
+
+def rock_records(field, rows, frame):
+    """
+    Returns the ROCK_RECORD of the rows of an Asteroid_Field on frame
+    """
+    records = np.zeros(len(rows), ROCK_RECORD)
+    records["id"] = field.ids[rows]
+    records["frame"] = frame
+    records["size"] = field.size[rows]
+    records["x"] = np.round(field.x[rows] % SCREEN_WIDTH * POSITION_SCALE)
+    records["y"] = np.round(field.y[rows] % SCREEN_HEIGHT * POSITION_SCALE)
+    records["angle"] = np.round(field.angle[rows] % 360 * ANGLE_SCALE).astype(np.int64) % 65536
+    records["dx"] = field.dx[rows]
+    records["dy"] = field.dy[rows]
+    return records
+
+
+class Lossy_Socket:
+    """
+    UDP socket that loses some of the packets it sends and holds back the
+    others for a while, to try the game over a bad network on localhost.
+    flush() sends the held back packets whose time has come
+    """
+    def __init__(self, sock, loss=0.0, latency=0.0, jitter=0.0, seed=None, clock=time.perf_counter):
+        self.sock = sock
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.clock = clock
+        #(time to send, order, data, address)
+        self.queue = []
+        self.order = 0
+
+    def sendto(self, data, address):
+        if self.rng.random() < self.loss:
+            return len(data)
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        heapq.heappush(self.queue, (self.clock() + delay, self.order, data, address))
+        self.order += 1
+        self.flush()
+        return len(data)
+
+    def flush(self):
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            due, order, data, address = heapq.heappop(self.queue)
+            self.sock.sendto(data, address)
+
+    def recvfrom(self, size):
+        return self.sock.recvfrom(size)
+
+
+def make_socket(port=0):
+    """
+    Returns a non blocking UDP socket bound to port on localhost and every
+    other address, port 0 picks a free one
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("", port))
+    sock.setblocking(False)
+    return sock
+
+def receive_all(sock):
+    """
+    Returns every packet waiting on a non blocking socket as (data, address)
+    """
+    packets = []
+    while True:
+        try:
+            packets.append(sock.recvfrom(65536))
+        except (BlockingIOError, InterruptedError):
+            return packets
+        except ConnectionResetError:
+            #Windows reports a packet that couldn't be delivered this way
+            continue
+
+
+class Remote_Player:
+    """
+    What the server knows about one client
+    """
+    def __init__(self, address, player, now):
+        self.address = address
+        self.player = player
+        self.last_heard = now
+        self.sequence = 0
+        #newest snapshot frame the client said it got, None until it got one
+        self.ack = None
+        self.held = []
+        #fire was pressed since the last tick
+        self.pressed = False
+        self.fire_presses = None
+        self.bytes_sent = 0
+
+
+class Coop_Server:
+    """
+    Steps a Coop_World with the inputs of its clients and sends each
+    client snapshots of it
+    """
+    def __init__(self, world, sock, clock=time.perf_counter):
+        self.world = world
+        self.sock = sock
+        self.clock = clock
+        #client address -> Remote_Player
+        self.clients = {}
+        #(frame, new rock records, destroyed rock records) of the latest ticks
+        self.history = deque(maxlen=HISTORY_TICKS)
+        field = world.asteroids
+        self.known_ids = field.ids[:field.count].copy()
+        self.next_id = field.next_id
+        #seconds spent on the network part of each tick, not stepping the world
+        self.net_time = 0.0
+
+    def free_player(self):
+        taken = {client.player for client in self.clients.values()}
+        for player in range(self.world.players):
+            if player not in taken:
+                return player
+        return None
+
+    def poll(self):
+        """
+        Reads every packet the clients sent since the last poll
+        """
+        now = self.clock()
+        for data, address in receive_all(self.sock):
+            client = self.clients.get(address)
+            if client is None:
+                player = self.free_player()
+                if player is None:
+                    #the game is full
+                    continue
+                client = self.clients[address] = Remote_Player(address, player, now)
+            client.last_heard = now
+            if data[:1] == INPUT and len(data) == INPUT_PACKET.size:
+                kind, sequence, ack, held, fire_presses = INPUT_PACKET.unpack(data)
+                #late packets are older than what the client already sent
+                if sequence <= client.sequence:
+                    continue
+                client.sequence = sequence
+                client.ack = None if ack == NO_BASELINE else max(ack, client.ack or 0)
+                client.held = bit_actions(held)
+                if client.fire_presses is not None and fire_presses != client.fire_presses:
+                    client.pressed = True
+                client.fire_presses = fire_presses
+
+        for address, client in list(self.clients.items()):
+            if now - client.last_heard > CLIENT_TIMEOUT:
+                del self.clients[address]
+
+    def step(self):
+        """
+        Moves the world forward one tick and sends the snapshots that are due
+        """
+        inputs = [Inputs() for player in range(self.world.players)]
+        for client in self.clients.values():
+            pressed = [FIRE] if client.pressed else []
+            inputs[client.player] = Inputs(client.held, pressed)
+            client.pressed = False
+        self.world.step(inputs)
+
+        start = time.perf_counter()
+        self.record_changes()
+        if self.world.frame_count % SNAPSHOT_INTERVAL == 0:
+            for client in self.clients.values():
+                for packet in self.make_snapshot(client):
+                    self.sock.sendto(packet, client.address)
+                    client.bytes_sent += len(packet)
+        self.net_time = time.perf_counter() - start
+
+    def record_changes(self):
+        """
+        Writes down the rocks that appeared and were destroyed this tick.
+        Ids only grow and the field keeps its rows in order, so the new
+        rocks are the ones at the end with an id not seen before
+        """
+        field = self.world.asteroids
+        frame = self.world.frame_count
+        ids = field.ids[:field.count]
+        alive = field.alive[:field.count]
+        first_new = int(np.searchsorted(ids, self.next_id))
+        new_rows = np.flatnonzero(alive[first_new:]) + first_new
+        spawned = rock_records(field, new_rows, frame)
+        #destroyed rocks stay in the field until the next tick, but are not alive
+        still_alive = ids[:first_new][alive[:first_new]]
+        destroyed = np.zeros(0, DESTROYED_RECORD)
+        if len(still_alive) != len(self.known_ids):
+            gone = self.known_ids[~np.isin(self.known_ids, still_alive)]
+            destroyed = np.zeros(len(gone), DESTROYED_RECORD)
+            destroyed["id"] = gone
+            destroyed["frame"] = frame
+        if len(spawned) or len(destroyed):
+            self.known_ids = np.concatenate([still_alive, ids[new_rows]])
+        self.next_id = field.next_id
+        self.history.append((frame, spawned, destroyed))
+
+    def make_snapshot(self, client):
+        """
+        Returns the packets of the snapshot for a client, with only the rock
+        changes since the newest snapshot the client got. It is one packet
+        unless the changes don't fit in MAX_SNAPSHOT_PAYLOAD bytes
+        """
+        world = self.world
+        frame = world.frame_count
+        baseline = client.ack
+        if baseline is None or not self.history or baseline < self.history[0][0] - 1:
+            field = world.asteroids
+            spawned = rock_records(field, np.flatnonzero(field.alive[:field.count]), frame)
+            destroyed = np.zeros(0, DESTROYED_RECORD)
+            baseline = NO_BASELINE
+        else:
+            changes = [(new, gone) for tick, new, gone in self.history if tick > baseline]
+            spawned = np.concatenate([new for new, gone in changes] or [np.zeros(0, ROCK_RECORD)])
+            destroyed = np.concatenate([gone for new, gone in changes] or [np.zeros(0, DESTROYED_RECORD)])
+
+        ships = [ship for ship in world.ships if ship.alive]
+        ship_records = np.zeros(len(ships), SHIP_RECORD)
+        for record, ship in zip(ship_records, ships):
+            record["player"] = ship.player
+            record["x"] = round(ship.center.x % SCREEN_WIDTH * POSITION_SCALE)
+            record["y"] = round(ship.center.y % SCREEN_HEIGHT * POSITION_SCALE)
+            record["angle"] = round(ship.angle % 360 * ANGLE_SCALE) % 65536
+        bullets = [bullet for bullet in world.bullets if bullet.alive]
+        bullet_records = np.zeros(len(bullets), BULLET_RECORD)
+        for record, bullet in zip(bullet_records, bullets):
+            record["x"] = round(bullet.center.x % SCREEN_WIDTH * POSITION_SCALE)
+            record["y"] = round(bullet.center.y % SCREEN_HEIGHT * POSITION_SCALE)
+            record["dx"] = round(bullet.velocity.dx * VELOCITY_SCALE)
+            record["dy"] = round(bullet.velocity.dy * VELOCITY_SCALE)
+            record["angle"] = round(bullet.angle % 360 * BULLET_ANGLE_SCALE) % 256
+
+        #the first part has the ships and bullets, the rock changes fill
+        #up every part in order
+        parts = []
+        room = MAX_SNAPSHOT_PAYLOAD - SNAPSHOT_HEADER.size - ship_records.nbytes - bullet_records.nbytes
+        new = gone = 0
+        while True:
+            new_end = new + min(len(spawned) - new, max(0, room // ROCK_RECORD.itemsize))
+            room -= (new_end - new) * ROCK_RECORD.itemsize
+            gone_end = gone + min(len(destroyed) - gone, max(0, room // DESTROYED_RECORD.itemsize))
+            parts.append((spawned[new:new_end], destroyed[gone:gone_end]))
+            new, gone = new_end, gone_end
+            if new == len(spawned) and gone == len(destroyed):
+                break
+            room = MAX_SNAPSHOT_PAYLOAD - SNAPSHOT_HEADER.size
+        if len(parts) > 255:
+            raise ValueError("A snapshot of {} rock changes doesn't fit in 255 parts".format(len(spawned) + len(destroyed)))
+
+        hearts = sum(heart.alive for heart in world.hearts)
+        packets = []
+        for number, (new, gone) in enumerate(parts):
+            ships = ship_records if number == 0 else ship_records[:0]
+            bullets = bullet_records if number == 0 else bullet_records[:0]
+            payload = b"".join([
+                SNAPSHOT_HEADER.pack(frame, baseline, number, len(parts), client.player, hearts,
+                                     OUTCOMES.index(world.outcome), world.tick_rate,
+                                     len(ships), len(bullets), len(new), len(gone)),
+                ships.tobytes(), bullets.tobytes(), new.tobytes(), gone.tobytes()])
+            if len(payload) > COMPRESS_OVER:
+                packets.append(COMPRESSED_SNAPSHOT + zlib.compress(payload))
+            else:
+                packets.append(SNAPSHOT + payload)
+        return packets
+
+
+class Snapshot:
+    """
+    The ships and bullets of one snapshot a client got
+    """
+    def __init__(self, frame, arrival, ships, bullets):
+        self.frame = frame
+        self.arrival = arrival
+        self.ships = ships
+        self.bullets = bullets
+
+
+class Coop_Client:
+    """
+    Sends the keys of one player to a Coop_Server and puts the world back
+    together from its snapshots
+    """
+    def __init__(self, sock, server_address, clock=time.perf_counter):
+        """
+        server_address is (host, port), packets from anywhere else are ignored
+        """
+        host, port = server_address
+        self.sock = sock
+        self.server_address = (socket.gethostbyname(host), port)
+        self.clock = clock
+        self.player = None
+        self.tick_rate = TICK_RATE
+        self.hearts = 0
+        self.outcome = None
+        self.sequence = 0
+        self.fire_presses = 0
+        #every rock as ROCK_RECORD, the first frame each one is drawn on and
+        #the frame it was destroyed, and the frame they are up to date with
+        self.rocks = np.zeros(0, ROCK_RECORD)
+        self.rock_since = np.zeros(0, np.uint32)
+        self.rock_gone = np.zeros(0, np.uint32)
+        self.frame = None
+        #the newest snapshots, oldest first
+        self.snapshots = deque(maxlen=32)
+        #frame -> {part number: records} of snapshots still missing parts
+        self.pending = {}
+        self.bytes_received = 0
+
+    def send_inputs(self, held, fire_pressed=False):
+        """
+        Sends the actions being held. Presses of fire are counted so a lost
+        packet doesn't lose a shot
+        """
+        if fire_pressed:
+            self.fire_presses = (self.fire_presses + 1) % 65536
+        self.sequence += 1
+        ack = NO_BASELINE if self.frame is None else self.frame
+        self.sock.sendto(INPUT_PACKET.pack(INPUT, self.sequence, ack, action_bits(held), self.fire_presses),
+                         self.server_address)
+
+    def poll(self):
+        """
+        Reads every snapshot the server sent since the last poll
+        """
+        now = self.clock()
+        for data, address in receive_all(self.sock):
+            if address != self.server_address:
+                continue
+            self.bytes_received += len(data)
+            if data[:1] == COMPRESSED_SNAPSHOT:
+                self.read_snapshot(zlib.decompress(data[1:]), now)
+            elif data[:1] == SNAPSHOT:
+                self.read_snapshot(data[1:], now)
+
+    def read_snapshot(self, payload, now):
+        """
+        Reads one part of a snapshot, and uses the snapshot once every
+        part of it is in
+        """
+        (frame, baseline, number, part_count, player, hearts, outcome, tick_rate,
+         ship_count, bullet_count, spawn_count, destroy_count) = SNAPSHOT_HEADER.unpack_from(payload)
+        #late snapshots are older than what the client already has
+        if self.frame is not None and frame <= self.frame:
+            return
+        if baseline != NO_BASELINE and self.frame is None:
+            return
+
+        offset = SNAPSHOT_HEADER.size
+        arrays = []
+        for dtype, count in ((SHIP_RECORD, ship_count), (BULLET_RECORD, bullet_count),
+                             (ROCK_RECORD, spawn_count), (DESTROYED_RECORD, destroy_count)):
+            arrays.append(np.frombuffer(payload, dtype, count, offset))
+            offset += count * dtype.itemsize
+        parts = self.pending.setdefault(frame, {})
+        parts[number] = arrays
+        if len(parts) < part_count:
+            #only the newest few snapshots still missing parts are kept
+            while len(self.pending) > PENDING_SNAPSHOTS:
+                del self.pending[min(self.pending)]
+            return
+        del self.pending[frame]
+        for waiting in [waiting for waiting in self.pending if waiting < frame]:
+            del self.pending[waiting]
+        ships, bullets, spawned, destroyed = (
+            np.concatenate([parts[number][column] for number in range(part_count)]) for column in range(4))
+
+        self.player = player
+        self.tick_rate = tick_rate
+        self.hearts = hearts
+        self.outcome = OUTCOMES[outcome]
+
+        if baseline == NO_BASELINE:
+            #rocks from a full snapshot were already there before it
+            self.rocks = spawned.copy()
+            self.rock_since = np.zeros(len(spawned), np.uint32)
+            self.rock_gone = np.full(len(spawned), NO_BASELINE, np.uint32)
+        else:
+            #the client already has everything up to the baseline, and
+            #maybe some of these changes from a later snapshot too
+            if len(spawned):
+                spawned = spawned[~np.isin(spawned["id"], self.rocks["id"])]
+                self.rocks = np.concatenate([self.rocks, spawned])
+                self.rock_since = np.concatenate([self.rock_since, spawned["frame"]])
+                self.rock_gone = np.concatenate([self.rock_gone, np.full(len(spawned), NO_BASELINE, np.uint32)])
+            #a rock can come and go between two snapshots, it is still drawn
+            #on the frames it was there
+            if len(destroyed):
+                rows = np.flatnonzero(np.isin(self.rocks["id"], destroyed["id"]))
+                order = np.argsort(destroyed["id"])
+                gone_rows = order[np.searchsorted(destroyed["id"], self.rocks["id"][rows], sorter=order)]
+                self.rock_gone[rows] = np.minimum(self.rock_gone[rows], destroyed["frame"][gone_rows])
+            #rocks destroyed long enough ago are never drawn again
+            keep = self.rock_gone.astype(np.int64) + GONE_ROCK_TICKS > frame
+            if not keep.all():
+                self.rocks = self.rocks[keep]
+                self.rock_since = self.rock_since[keep]
+                self.rock_gone = self.rock_gone[keep]
+        self.frame = frame
+        self.snapshots.append(Snapshot(frame, now, ships, bullets))
+
+    def render_frame(self):
+        """
+        Returns the frame of the server to draw now, which can be between
+        two frames. It is INTERPOLATION_DELAY behind the newest snapshot
+        """
+        if not self.snapshots:
+            return None
+        newest = self.snapshots[-1]
+        server_frame = newest.frame + (self.clock() - newest.arrival) * self.tick_rate
+        return server_frame - INTERPOLATION_DELAY * self.tick_rate
+
+    def rocks_at(self, frame):
+        """
+        Returns the id, x, y, angle and size of every rock on frame
+        """
+        visible = (self.rock_since <= frame) & (self.rock_gone > frame)
+        rocks = self.rocks[visible]
+        scale = REFERENCE_TICK_RATE / self.tick_rate
+        frames = (frame - rocks["frame"].astype(float)) * scale
+        x = (rocks["x"] / POSITION_SCALE + rocks["dx"] * frames) % SCREEN_WIDTH
+        y = (rocks["y"] / POSITION_SCALE + rocks["dy"] * frames) % SCREEN_HEIGHT
+        angle = rocks["angle"] / ANGLE_SCALE + ROCK_SPINS[rocks["size"]] * frames
+        return rocks["id"], x, y, angle, rocks["size"]
+
+    def ships_at(self, frame):
+        """
+        Returns (player, x, y, angle) of every ship on frame, found between
+        the two snapshots around it
+        """
+        before = after = None
+        for snapshot in self.snapshots:
+            if snapshot.frame <= frame:
+                before = snapshot
+            elif after is None:
+                after = snapshot
+        if before is None:
+            before = self.snapshots[0]
+        if after is None:
+            after = before
+        blend = 0.0 if after is before else (frame - before.frame) / (after.frame - before.frame)
+        later = {int(record["player"]): record for record in after.ships}
+
+        ships = []
+        for record in before.ships:
+            x = record["x"] / POSITION_SCALE
+            y = record["y"] / POSITION_SCALE
+            angle = record["angle"] / ANGLE_SCALE
+            other = later.get(int(record["player"]))
+            if other is not None:
+                move_x = wrapped_offset(other["x"] / POSITION_SCALE - x, SCREEN_WIDTH)
+                move_y = wrapped_offset(other["y"] / POSITION_SCALE - y, SCREEN_HEIGHT)
+                if abs(move_x) + abs(move_y) < SHIP_JUMP:
+                    x = (x + move_x * blend) % SCREEN_WIDTH
+                    y = (y + move_y * blend) % SCREEN_HEIGHT
+                    angle += wrapped_offset(other["angle"] / ANGLE_SCALE - angle, 360) * blend
+            ships.append((int(record["player"]), x, y, angle))
+        return ships
+
+    def bullets_at(self, frame):
+        """
+        Returns (x, y, angle) of every bullet on frame, moved on from the
+        newest snapshot before it
+        """
+        snapshot = self.snapshots[0]
+        for other in self.snapshots:
+            if other.frame <= frame:
+                snapshot = other
+        bullets = snapshot.bullets
+        frames = (frame - snapshot.frame) * REFERENCE_TICK_RATE / self.tick_rate
+        x = (bullets["x"] / POSITION_SCALE + bullets["dx"] / VELOCITY_SCALE * frames) % SCREEN_WIDTH
+        y = (bullets["y"] / POSITION_SCALE + bullets["dy"] / VELOCITY_SCALE * frames) % SCREEN_HEIGHT
+        return list(zip(x.tolist(), y.tolist(), (bullets["angle"] / BULLET_ANGLE_SCALE).tolist()))
+
+
+class Remote_World:
+    """
+    Looks like a World to the game views, but is put together from the
+    snapshots of a Coop_Client instead of being stepped
+    """
+    mode = Coop_World.mode
+
+    def __init__(self, client):
+        self.client = client
+        self.asteroids = Asteroid_Field()
+        #flying objects are made once and reused on every frame
+        self.ships = []
+        self.bullets = []
+        self.hearts = []
+        Heart_List(self.hearts)
+        self.frame_count = 0
+        self.tick_rate = TICK_RATE
+        self.outcome = None
+        self.events = []
+
+    def get_layers(self):
+        return [("asteroids", self.asteroids),
+                ("bullets", self.bullets),
+                ("ships", self.ships),
+                ("hearts", self.hearts)]
+
+    def update(self):
+        """
+        Puts everything where it is on the client's render frame
+        """
+        client = self.client
+        frame = client.render_frame()
+        if frame is None:
+            return
+        self.frame_count = int(frame)
+        self.tick_rate = client.tick_rate
+        self.outcome = client.outcome
+
+        ids, x, y, angle, size = client.rocks_at(frame)
+        field = self.asteroids
+        field.count = 0
+        field.reserve(len(x))
+        count = field.count = len(x)
+        field.x[:count] = field.prev_x[:count] = x
+        field.y[:count] = field.prev_y[:count] = y
+        field.angle[:count] = angle
+        field.size[:count] = size
+
+        ships = client.ships_at(frame)
+        while len(self.ships) < len(ships):
+            self.ships.append(Ship())
+        del self.ships[len(ships):]
+        for ship, (player, x, y, angle) in zip(self.ships, ships):
+            ship.player = player
+            ship.center.x = ship.prev_x = x
+            ship.center.y = ship.prev_y = y
+            ship.angle = angle
+
+        bullets = client.bullets_at(frame)
+        while len(self.bullets) < len(bullets):
+            self.bullets.append(Bullet(0, 0, 0))
+        del self.bullets[len(bullets):]
+        for bullet, (x, y, angle) in zip(self.bullets, bullets):
+            bullet.center.x = bullet.prev_x = x
+            bullet.center.y = bullet.prev_y = y
+            bullet.angle = angle
+
+        for number, heart in enumerate(self.hearts):
+            heart.alpha = 255 if number < client.hearts else 0
+            heart.prev_x = heart.center.x
+            heart.prev_y = heart.center.y
+
+
+def serve(port, players, seed, tick_rate):
+    """
+    Runs a co-op server in real time until it's stopped with Ctrl+C
+    """
+    server = Coop_Server(Coop_World(seed, tick_rate, players), make_socket(port))
+    print("Co-op server for {} players on port {}, seed {}".format(players, port, server.world.seed))
+    tick = 1 / tick_rate
+    next_tick = time.perf_counter()
+    while server.world.outcome is None:
+        server.poll()
+        server.step()
+        next_tick += tick
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+    print("Game ended:", server.world.outcome)
+
+
+def run_test(rocks, clients, seconds, loss, latency, jitter, seed):
+    """
+    Plays a co-op game over localhost with a simulated bad network and no
+    window. Time is simulated so the test runs as fast as it can. Returns
+    the bytes per second each client got, the mean network time of a
+    server tick and how far the clients' rocks and ships were from the
+    server's, in pixels
+    """
+    now = [0.0]
+    clock = lambda: now[0]
+    world = Coop_World(seed, TICK_RATE, clients)
+    #extra rocks kept in the field, like in a stress test, so the load stays the same
+    scenario = Stress_Scenario(Coop_World.mode, rocks, 0, 0, seed=seed)
+    scenario.refill(world)
+    server_socket = Lossy_Socket(make_socket(), loss, latency, jitter, seed, clock)
+    server = Coop_Server(world, server_socket, clock)
+    address = ("127.0.0.1", server_socket.sock.getsockname()[1])
+    players = [Coop_Client(Lossy_Socket(make_socket(), loss, latency, jitter, seed + i + 1, clock), address, clock)
+               for i in range(clients)]
+    rng = random.Random(seed)
+
+    #where every rock and ship really was on the latest frames
+    truth = {}
+    net_times = []
+    #the first snapshot has every rock, bytes are counted once it's in
+    warm_up = TICK_RATE
+    rock_errors = []
+    ship_errors = []
+    #rocks that only the server or only a client had on a frame
+    wrong = 0
+    for tick in range(int(seconds * TICK_RATE)):
+        now[0] = tick / TICK_RATE
+        for client in players:
+            held = [action for action in (TURN_LEFT, THRUST_UP, FIRE) if rng.random() < 0.3]
+            client.send_inputs(held, rng.random() < 0.05)
+            client.sock.flush()
+        server.poll()
+        scenario.refill(world)
+        server.step()
+        server_socket.flush()
+        net_times.append(server.net_time)
+        if tick == warm_up:
+            for client in players:
+                client.bytes_received = 0
+        field = world.asteroids
+        alive = field.alive[:field.count]
+        truth[world.frame_count] = (field.ids[:field.count][alive], field.x[:field.count][alive] % SCREEN_WIDTH,
+                                    field.y[:field.count][alive] % SCREEN_HEIGHT,
+                                    {ship.player: (ship.center.x, ship.center.y) for ship in world.ships})
+        truth.pop(world.frame_count - 64, None)
+
+        for client in players:
+            client.poll()
+            frame = client.render_frame()
+            if frame is None or int(frame) not in truth:
+                continue
+            frame = int(frame)
+            ids, xs, ys, ship_places = truth[frame]
+            client_ids, x, y, angle, size = client.rocks_at(frame)
+            common, real_rows, client_rows = np.intersect1d(ids, client_ids, return_indices=True)
+            if tick > warm_up:
+                wrong += len(ids) + len(client_ids) - 2 * len(common)
+            if len(common):
+                errors = np.hypot(wrapped_offset(xs[real_rows] - x[client_rows], SCREEN_WIDTH),
+                                  wrapped_offset(ys[real_rows] - y[client_rows], SCREEN_HEIGHT))
+                rock_errors.append(errors.max())
+            for player, ship_x, ship_y, ship_angle in client.ships_at(frame):
+                if player in ship_places:
+                    real_x, real_y = ship_places[player]
+                    ship_errors.append(np.hypot(wrapped_offset(real_x - ship_x, SCREEN_WIDTH),
+                                                wrapped_offset(real_y - ship_y, SCREEN_HEIGHT)))
+
+    for client in players:
+        client.sock.sock.close()
+    server_socket.sock.close()
+    duration = max(now[0] - warm_up / TICK_RATE, 1 / TICK_RATE)
+    return {"rocks": len(world.asteroids),
+            "seconds": duration,
+            "bytes_per_second": np.mean([client.bytes_received for client in players]) / duration,
+            "net_ms": np.mean(net_times) * 1000,
+            "rock_error": max(rock_errors, default=0.0),
+            "ship_error": np.percentile(ship_errors, 95) if ship_errors else 0.0,
+            "wrong_rocks": wrong}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Co-op asteroids over UDP")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run a co-op server")
+    serve_parser.add_argument("--port", type=int, default=NET_PORT)
+    serve_parser.add_argument("--players", type=int, default=COOP_PLAYERS)
+    serve_parser.add_argument("--seed", type=int)
+    serve_parser.add_argument("--tick-rate", type=int, default=TICK_RATE)
+    test_parser = commands.add_parser("test", help="play over localhost with a simulated bad network")
+    test_parser.add_argument("--rocks", type=int, nargs="+", default=[20, 200, 400],
+                             help="large rocks kept in the field, one run for each")
+    test_parser.add_argument("--clients", type=int, default=COOP_PLAYERS)
+    test_parser.add_argument("--seconds", type=float, default=20)
+    test_parser.add_argument("--loss", type=float, default=0.1, help="share of packets lost")
+    test_parser.add_argument("--latency", type=float, default=0.05, help="seconds every packet is late")
+    test_parser.add_argument("--jitter", type=float, default=0.02, help="up to this many more seconds")
+    test_parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.port, args.players, args.seed, args.tick_rate)
+        return
+    print("{} clients, {:.0%} loss, {:.0f}+{:.0f} ms latency".format(
+        args.clients, args.loss, args.latency * 1000, args.jitter * 1000))
+    for rocks in args.rocks:
+        result = run_test(rocks, args.clients, args.seconds, args.loss, args.latency, args.jitter, args.seed)
+        print("{:4d} rocks: {:7.0f} bytes/s per client, network {:.3f} ms per tick, "
+              "rock error {:.2f} px, ship error p95 {:.2f} px, rocks wrong {}".format(
+                  result["rocks"], result["bytes_per_second"], result["net_ms"],
+                  result["rock_error"], result["ship_error"], result["wrong_rocks"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+File: asteroid_particles.py
+Sparks for exploding asteroids, destroyed ships and the ship's thruster.
+Every particle is a row of a few preallocated NumPy arrays with a hard
+cap, so a big explosion never makes thousands of Python objects. All the
+particles are moved with one set of array operations per step, and
+vertex_data() hands the views one block of memory to draw in one batch.
+
+Particles are only for show. They have their own random generator, so
+the World plays out the same with or without them. A World uses
+NO_PARTICLES unless the view gives it a Particle_System.
+"""
+import math
+import numpy as np
+
+#Most particles alive at once, new ones are dropped once it's reached
+PARTICLE_CAPACITY = 4096
+#Velocities are multiplied by this every frame so sparks slow down
+PARTICLE_DRAG = 0.96
+
+#Kinds of particles, each has its own color
+ROCK_PARTICLE = 0
+SHIP_PARTICLE = 1
+THRUST_PARTICLE = 2
+PARTICLE_COLORS = ((190, 190, 190), (255, 120, 40), (255, 210, 90))
+
+#Sparks from a rock of each size class, and how fast and long they fly
+ROCK_PARTICLES = (24, 14, 8)
+ROCK_PARTICLE_SPEED = 3.0
+ROCK_PARTICLE_LIFE = 40
+SHIP_PARTICLES = 60
+SHIP_PARTICLE_SPEED = 4.0
+SHIP_PARTICLE_LIFE = 60
+#The thruster gives this many particles per frame, out of the back of the ship
+THRUST_PARTICLES = 3
+THRUST_PARTICLE_SPEED = 4.0
+THRUST_PARTICLE_LIFE = 15
+THRUST_SPREAD = 20
+
+#Layout of one particle for the views, two floats and four color bytes
+PARTICLE_VERTEX = np.dtype([("x", np.float32), ("y", np.float32), ("color", np.uint8, 4)])
+
+
+class Null_Particles:
+    """
+    Particle system that does nothing, used when nobody draws the particles
+    """
+    def burst(self, xs, ys, amounts, speed, lifetime, kind):
+        pass
+
+    def thrust(self, ship, scale=1.0):
+        pass
+
+    def advance(self, scale=1.0):
+        pass
+
+
+#Shared particle system for worlds without a view
+NO_PARTICLES = Null_Particles()
+
+
+class Particle_System:
+    """
+    Every particle alive, the first self.count rows of the arrays are in use
+    """
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.dx = np.zeros(capacity, dtype=np.float32)
+        self.dy = np.zeros(capacity, dtype=np.float32)
+        #frames left and frames the particle started with, for fading out
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.ones(capacity, dtype=np.float32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.colors = np.array(PARTICLE_COLORS, dtype=np.uint8)
+        self.vertices = np.zeros(capacity, dtype=PARTICLE_VERTEX)
+        self.rng = np.random.default_rng(seed)
+        #particles that didn't fit under the cap
+        self.dropped = 0
+        #fraction of a thruster particle carried over to the next frame
+        self.thrust_credit = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, xs, ys, dxs, dys, lifetimes, kind):
+        """
+        Adds a batch of particles, all the arguments but kind are arrays
+        of the same length. Particles past the cap are dropped
+        """
+        amount = min(len(xs), self.capacity - self.count)
+        self.dropped += len(xs) - amount
+        if amount <= 0:
+            return
+        start = self.count
+        end = start + amount
+        self.x[start:end] = xs[:amount]
+        self.y[start:end] = ys[:amount]
+        self.dx[start:end] = dxs[:amount]
+        self.dy[start:end] = dys[:amount]
+        self.life[start:end] = lifetimes[:amount]
+        self.lifetime[start:end] = lifetimes[:amount]
+        self.kind[start:end] = kind
+        self.count = end
+
+    def burst(self, xs, ys, amounts, speed, lifetime, kind):
+        """
+        Sends amounts particles out in every direction from each xs, ys.
+        amounts can be one number or one per place
+        """
+        centers = np.repeat(np.arange(len(xs)), amounts)
+        #only as many random numbers are drawn as there is room for
+        room = self.capacity - self.count
+        self.dropped += max(0, len(centers) - room)
+        centers = centers[:room]
+        total = len(centers)
+        if total == 0:
+            return
+        directions = self.rng.uniform(0, 2 * math.pi, total)
+        speeds = self.rng.uniform(0.2, 1.0, total) * speed
+        lifetimes = self.rng.uniform(0.5, 1.0, total) * lifetime
+        self.emit(np.asarray(xs)[centers], np.asarray(ys)[centers],
+                  np.cos(directions) * speeds, np.sin(directions) * speeds, lifetimes, kind)
+
+    def thrust(self, ship, scale=1.0):
+        """
+        Puts out the thruster particles of one step behind a ship
+        """
+        self.thrust_credit += THRUST_PARTICLES * scale
+        amount = int(self.thrust_credit)
+        if amount == 0:
+            return
+        self.thrust_credit -= amount
+        #the ship points at (-sin(angle), cos(angle)), the flame goes the other way
+        directions = np.radians(ship.angle + self.rng.uniform(-THRUST_SPREAD, THRUST_SPREAD, amount))
+        speeds = self.rng.uniform(0.5, 1.0, amount) * THRUST_PARTICLE_SPEED
+        lifetimes = self.rng.uniform(0.5, 1.0, amount) * THRUST_PARTICLE_LIFE
+        self.emit(np.full(amount, ship.center.x), np.full(amount, ship.center.y),
+                  ship.velocity.dx + np.sin(directions) * speeds,
+                  ship.velocity.dy - np.cos(directions) * speeds, lifetimes, THRUST_PARTICLE)
+
+    def advance(self, scale=1.0):
+        """
+        Moves, slows down and ages every particle, and removes the dead ones
+        """
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.dx[:n] * scale
+        self.y[:n] += self.dy[:n] * scale
+        drag = PARTICLE_DRAG ** scale
+        self.dx[:n] *= drag
+        self.dy[:n] *= drag
+        self.life[:n] -= scale
+        alive = self.life[:n] > 0
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        for array in (self.x, self.y, self.dx, self.dy, self.life, self.lifetime, self.kind):
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+
+    def vertex_data(self):
+        """
+        Returns the position and color of every particle as PARTICLE_VERTEX
+        rows, fading out as they age. The rows are reused every frame
+        """
+        n = self.count
+        vertices = self.vertices[:n]
+        vertices["x"] = self.x[:n]
+        vertices["y"] = self.y[:n]
+        vertices["color"][:, :3] = self.colors[self.kind[:n]]
+        vertices["color"][:, 3] = 255 * self.life[:n] / self.lifetime[:n]
+        return vertices
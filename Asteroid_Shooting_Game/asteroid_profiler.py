@@ -0,0 +1,135 @@
+"""
+File: asteroid_profiler.py
+Times each phase of every World step, like checking keys, moving things
+and checking collisions, so slow frames can be found without attaching
+an outside profiler. A World uses NO_PROFILER unless a Frame_Profiler is
+given to it, which costs almost nothing.
+"""
+import csv
+import json
+import time
+from collections import deque
+import numpy as np
+
+#How many of the latest frames the rolling statistics are taken over
+PROFILER_WINDOW = 300
+
+
+class Null_Profiler:
+    """
+    Profiler that does nothing, used when a world is not being profiled
+    """
+    def begin_frame(self, world):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def record(self, phase, seconds):
+        pass
+
+
+#Shared profiler for worlds that are not profiled
+NO_PROFILER = Null_Profiler()
+
+
+class Frame_Profiler:
+    """
+    Keeps how long each phase of each frame took. mark(phase) gives the time
+    since the last mark to that phase, so the phases of a step are timed by
+    marking the end of each one
+    """
+    def __init__(self, window=PROFILER_WINDOW, keep_history=False):
+        """
+        window is how many frames the rolling statistics cover,
+        keep_history keeps every frame so they can be written to a file
+        """
+        self.window = window
+        self.keep_history = keep_history
+        #phase name -> latest times in seconds
+        self.samples = {}
+        self.history = []
+        self.counts = {}
+        self.current = None
+        #times from record() since the current frame began
+        self.recorded = {}
+        self.last = 0.0
+
+    def begin_frame(self, world):
+        """
+        Starts timing a new step of world, the previous step is finished
+        """
+        self.end_frame()
+        self.counts = {name: len(objects) for name, objects in world.get_layers()}
+        self.current = {"frame": world.frame_count, "mode": world.mode}
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        """
+        Ends a phase of the current frame
+        """
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def record(self, phase, seconds):
+        """
+        Adds a time measured somewhere else, like drawing the screen
+        """
+        self.add_sample(phase, seconds)
+        self.recorded[phase] = seconds
+
+    def add_sample(self, phase, seconds):
+        if phase not in self.samples:
+            self.samples[phase] = deque(maxlen=self.window)
+        self.samples[phase].append(seconds)
+
+    def end_frame(self):
+        """
+        Puts the times of the current frame into the rolling statistics
+        """
+        if self.current is None:
+            return
+        total = 0.0
+        for phase, seconds in self.current.items():
+            if phase not in ("frame", "mode"):
+                self.add_sample(phase, seconds)
+                total += seconds
+        self.add_sample("step", total)
+        if self.keep_history:
+            row = dict(self.current)
+            row["step"] = total
+            row.update(self.recorded)
+            for name, count in self.counts.items():
+                row[name + "_count"] = count
+            self.history.append(row)
+        self.current = None
+        self.recorded = {}
+
+    def stats(self):
+        """
+        Returns (phase, mean, p95, p99) in milliseconds for every phase
+        """
+        rows = []
+        for phase, samples in self.samples.items():
+            values = np.array(samples) * 1000
+            p95, p99 = np.percentile(values, (95, 99))
+            rows.append((phase, values.mean(), p95, p99))
+        return rows
+
+    def dump(self, path):
+        """
+        Writes every kept frame to path.csv and path.json
+        """
+        self.end_frame()
+        columns = []
+        for row in self.history:
+            for column in row:
+                if column not in columns:
+                    columns.append(column)
+        with open(path + ".csv", "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self.history)
+        with open(path + ".json", "w") as json_file:
+            json.dump({"columns": columns, "frames": self.history}, json_file)
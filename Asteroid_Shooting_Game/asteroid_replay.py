@@ -0,0 +1,224 @@
+"""
+File: asteroid_replay.py
+Records the keys pressed during an asteroids game so the exact same
+session can be played again later without a window.
+Since a World with the same seed and the same inputs always plays out the
+same way, a replay only needs the keys for each tick plus a few saved
+states (keyframes) so it can jump to any frame quickly.
+
+Games are recorded when the game is started with --record:
+    python ALIDO_asteroidsfinal.py --record
+Run this file to replay a saved game as fast as possible:
+    python asteroid_replay.py replays/hard-20240101-120000.json.gz --profile
+"""
+import argparse
+import gzip
+import json
+import time
+from asteroid_world import Inputs, WORLD_MODES
+
+REPLAY_VERSION = 2
+#A full state of the world is saved every this many ticks
+KEYFRAME_INTERVAL = 300
+
+
+class Replay_Recorder:
+    """
+    Keeps the keys of every tick of one game, only writing down the ticks
+    where something changed, and a keyframe every KEYFRAME_INTERVAL ticks
+    """
+    def __init__(self, world, key_actions, keyframe_interval=KEYFRAME_INTERVAL):
+        """
+        world is the World being recorded, recording starts at its current frame
+        key_actions maps each keyboard key to the action it makes the ship take
+        """
+        self.header = {"version": REPLAY_VERSION,
+                       "mode": world.mode,
+                       "seed": world.seed,
+                       "tick_rate": world.tick_rate,
+                       "keyframe_interval": keyframe_interval,
+                       #json only allows text as keys
+                       "key_actions": {str(key): action for key, action in key_actions.items()}}
+        self.keyframe_interval = keyframe_interval
+        #[frame, held keys, pressed keys, released keys]
+        self.ticks = []
+        self.keyframes = [world.save_state()]
+        self.last_held = []
+
+    def record(self, world, held_keys, pressed_keys=(), released_keys=()):
+        """
+        Writes down the keys used for the next step of the world,
+        this has to be called right before world.step()
+        """
+        frame = world.frame_count
+        if frame % self.keyframe_interval == 0 and frame > self.keyframes[-1]["frame_count"]:
+            self.keyframes.append(world.save_state())
+
+        held = sorted(held_keys)
+        if held != self.last_held or pressed_keys or released_keys:
+            self.ticks.append([frame, held, sorted(pressed_keys), sorted(released_keys)])
+            self.last_held = held
+
+    def to_dict(self, world):
+        """
+        Returns the whole replay, world is the recorded World after its last step
+        """
+        header = dict(self.header)
+        header["frames"] = world.frame_count
+        header["outcome"] = world.outcome
+        return {"header": header,
+                "ticks": self.ticks,
+                "keyframes": self.keyframes,
+                #the last state lets a player check it got the same game
+                "final": world.save_state()}
+
+    def save(self, path, world):
+        """
+        Writes the replay to a gzip compressed json file
+        """
+        with gzip.open(path, "wt", encoding="utf-8") as replay_file:
+            json.dump(self.to_dict(world), replay_file)
+        return path
+
+
+class Replay_Player:
+    """
+    Plays a recorded game again with no window, as fast as it can
+    """
+    def __init__(self, replay):
+        """
+        replay is the dictionary from Replay_Recorder.to_dict()
+        """
+        self.header = replay["header"]
+        if self.header["version"] != REPLAY_VERSION:
+            raise ValueError("Unsupported replay version {}".format(self.header["version"]))
+        self.keyframes = replay["keyframes"]
+        self.final = replay.get("final")
+        self.frames = self.header["frames"]
+        self.inputs = self.expand_inputs(replay["ticks"])
+
+    @staticmethod
+    def load(path):
+        """
+        Reads a replay file written by Replay_Recorder.save()
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as replay_file:
+            return Replay_Player(json.load(replay_file))
+
+    def expand_inputs(self, ticks):
+        """
+        Turns the ticks where something changed into one Inputs per frame.
+        Frames where nothing changed share the same Inputs.
+        """
+        key_actions = {int(key): action for key, action in self.header["key_actions"].items()}
+        inputs = []
+        current = Inputs()
+        held = []
+        changes = iter(ticks)
+        change = next(changes, None)
+        for frame in range(self.frames):
+            if change is not None and change[0] == frame:
+                held, pressed = change[1], change[2]
+                inputs.append(Inputs.from_keys(held, pressed, key_actions))
+                #the keys pressed only count for this one frame
+                current = Inputs.from_keys(held, (), key_actions)
+                change = next(changes, None)
+            else:
+                inputs.append(current)
+        return inputs
+
+    def make_world(self):
+        """
+        Makes a new World of the recorded mode with the recorded seed
+        """
+        world_class = WORLD_MODES[self.header["mode"]]
+        return world_class(self.header["seed"], self.header["tick_rate"])
+
+    def nearest_keyframe(self, frame):
+        """
+        Returns the last keyframe at or before frame
+        """
+        best = self.keyframes[0]
+        for keyframe in self.keyframes:
+            if keyframe["frame_count"] <= frame:
+                best = keyframe
+            else:
+                break
+        return best
+
+    def world_at(self, frame, step_times=None):
+        """
+        Returns the World as it was right before step number frame, starting
+        from the nearest keyframe instead of from the beginning.
+        If step_times is a list, the time each step took is added to it.
+        """
+        frame = max(0, min(frame, self.frames))
+        world = self.make_world()
+        world.load_state(self.nearest_keyframe(frame))
+        while world.frame_count < frame:
+            if step_times is None:
+                world.step(self.inputs[world.frame_count])
+            else:
+                start = time.perf_counter()
+                world.step(self.inputs[world.frame_count])
+                step_times.append((world.frame_count - 1, time.perf_counter() - start))
+        return world
+
+    def run(self, step_times=None):
+        """
+        Plays the whole game from the start and returns the World at the end.
+        A game that was loaded from a save starts at its first keyframe
+        """
+        world = self.make_world()
+        world.load_state(self.keyframes[0])
+        while world.frame_count < self.frames:
+            if step_times is None:
+                world.step(self.inputs[world.frame_count])
+            else:
+                start = time.perf_counter()
+                world.step(self.inputs[world.frame_count])
+                step_times.append((world.frame_count - 1, time.perf_counter() - start))
+        return world
+
+    def matches(self, world):
+        """
+        Returns True if world ended the same way as the recorded game
+        """
+        if self.final is None:
+            return True
+        return json.loads(json.dumps(world.save_state())) == self.final
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a recorded asteroids game without a window")
+    parser.add_argument("replay", help="replay file written by the game")
+    parser.add_argument("--seek", type=int, help="only play up to this frame, starting from the nearest keyframe")
+    parser.add_argument("--profile", action="store_true", help="time every step and show the slowest ones")
+    parser.add_argument("--top", type=int, default=10, help="how many of the slowest steps to show")
+    args = parser.parse_args()
+
+    player = Replay_Player.load(args.replay)
+    header = player.header
+    print("{} game, seed {}, {} frames, outcome {}".format(
+        header["mode"], header["seed"], header["frames"], header["outcome"]))
+
+    step_times = [] if args.profile else None
+    start = time.perf_counter()
+    if args.seek is not None:
+        world = player.world_at(args.seek, step_times)
+        print("Frame {} reached from keyframe {}".format(
+            world.frame_count, player.nearest_keyframe(args.seek)["frame_count"]))
+    else:
+        world = player.run(step_times)
+        print("Replay matches recording:", player.matches(world))
+    print("Simulated in {:.3f} s".format(time.perf_counter() - start))
+
+    if step_times:
+        step_times.sort(key=lambda step: step[1], reverse=True)
+        print("Slowest steps:")
+        for frame, seconds in step_times[:args.top]:
+            print("  frame {:6d}  {:8.3f} ms".format(frame, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+File: asteroid_snapshot.py
+Saves a running asteroids World as a few kilobytes of packed binary data
+and makes a World again from it. The numbers are written with struct and
+array instead of pickling the objects, so a snapshot is small, does not
+depend on the classes of the game and is quick to read back. Snapshots
+are used to save and load a game, to pick a game up again after a crash
+and to fork a World to try out what would happen with other inputs.
+
+    data = snapshot(world)
+    other = restore(data)   #a new World that plays out exactly like world
+
+Running this file forks games of every mode partway through and checks
+that the forks play out exactly like the games they came from.
+"""
+import argparse
+import math
+import os
+import random
+import struct
+from array import array
+import numpy as np
+from asteroid_world import (VICTORY, GAME_OVER, WORLD_MODES, TURN_LEFT, TURN_RIGHT,
+                            THRUST_UP, THRUST_DOWN, FIRE, Inputs)
+
+SNAPSHOT_MAGIC = b"ASTS"
+SNAPSHOT_VERSION = 3
+#Modes and outcomes are written as their index in these tuples
+SNAPSHOT_MODES = ("easy", "normal", "hard", "endurance", "coop")
+SNAPSHOT_OUTCOMES = (None, VICTORY, GAME_OVER)
+
+#magic, version, mode, outcome, seed, tick rate, frame count, fire cooldown
+HEADER = struct.Struct("<4sHBBqIqd")
+#random generator version, has a gauss value, gauss value
+RNG_HEADER = struct.Struct("<BBd")
+#length of the random generator's internal state
+RNG_STATE_LENGTH = 625
+#Actions the fork check holds and presses at random
+CHECK_ACTIONS = (TURN_LEFT, TURN_RIGHT, THRUST_UP, THRUST_DOWN, FIRE)
+#number of rows of a field or a list of objects, numbers per object
+COUNT = struct.Struct("<I")
+ROWS = struct.Struct("<IB")
+#endurance mode's wave number, rocks spawned, spawn credit and delay
+WAVES = struct.Struct("<IIdd")
+
+
+def pack_field(parts, field):
+    """
+    Adds the rows in use of every array of an Array_Field
+    """
+    count = field.count
+    parts.append(COUNT.pack(count))
+    for name in field.arrays():
+        parts.append(getattr(field, name)[:count].tobytes())
+
+def unpack_field(data, offset, field):
+    """
+    Reads the arrays written by pack_field(), using field for their types.
+    Returns the field's state for load_state() and the offset after it
+    """
+    count, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    state = {}
+    for name in field.arrays():
+        dtype = getattr(field, name).dtype
+        state[name] = np.frombuffer(data, dtype, count, offset)
+        offset += count * dtype.itemsize
+    return state, offset
+
+def pack_objects(parts, objects):
+    """
+    Adds the get_state() of every flying object as doubles. Positions that
+    are not known yet (None) are written as NaN
+    """
+    states = [obj.get_state() for obj in objects]
+    width = len(states[0]) if states else 0
+    values = array("d")
+    for state in states:
+        values.extend(math.nan if value is None else value for value in state)
+    parts.append(ROWS.pack(len(states), width))
+    parts.append(values.tobytes())
+
+def unpack_objects(data, offset):
+    """
+    Reads the object states written by pack_objects().
+    Returns a list of states for set_state() and the offset after them
+    """
+    count, width = ROWS.unpack_from(data, offset)
+    offset += ROWS.size
+    values = array("d")
+    values.frombytes(data[offset:offset + count * width * values.itemsize])
+    offset += count * width * values.itemsize
+    values = values.tolist()
+    states = []
+    if count == 0:
+        return states, offset
+    for start in range(0, count * width, width):
+        state = values[start:start + width]
+        #prev_x and prev_y are None before the first advance()
+        if math.isnan(state[2]):
+            state[2] = state[3] = None
+        state[7] = bool(state[7])
+        states.append(state)
+    return states, offset
+
+
+def snapshot(world):
+    """
+    Returns the whole state of world as bytes
+    """
+    version, internal, gauss = world.rng.getstate()
+    parts = [HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                         SNAPSHOT_MODES.index(world.mode), SNAPSHOT_OUTCOMES.index(world.outcome),
+                         world.seed, world.tick_rate, world.frame_count, world.fire_cooldown),
+             RNG_HEADER.pack(version, gauss is not None, gauss or 0.0),
+             array("I", internal).tobytes()]
+
+    pack_field(parts, world.asteroids)
+    parts.append(COUNT.pack(world.asteroids.next_id))
+    pack_objects(parts, world.bullets)
+    pack_objects(parts, world.ships)
+    if hasattr(world, "hearts"):
+        pack_objects(parts, world.hearts)
+    if hasattr(world, "aliens"):
+        pack_objects(parts, world.enemy_bullets)
+        pack_field(parts, world.aliens)
+    if hasattr(world, "waves"):
+        parts.append(WAVES.pack(*world.waves.save_state()))
+    if hasattr(world, "fire_cooldowns"):
+        parts.append(COUNT.pack(len(world.fire_cooldowns)))
+        parts.append(array("d", world.fire_cooldowns).tobytes())
+    return b"".join(parts)
+
+def read_header(data):
+    """
+    Returns the mode, outcome, seed, tick rate, frame count and fire
+    cooldown of a snapshot
+    """
+    magic, version, mode, outcome, *numbers = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not an asteroids snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError("Unsupported snapshot version {}".format(version))
+    return (SNAPSHOT_MODES[mode], SNAPSHOT_OUTCOMES[outcome], *numbers)
+
+def restore(data, world=None):
+    """
+    Puts a snapshot back into world, or into a new World of the snapshot's
+    mode if world is None, and returns the world
+    """
+    mode, outcome, seed, tick_rate, frame_count, fire_cooldown = read_header(data)
+    if world is None:
+        world = WORLD_MODES[mode](seed, tick_rate)
+    elif world.mode != mode:
+        raise ValueError("A {} snapshot can't be restored into a {} world".format(mode, world.mode))
+    world.seed = seed
+
+    offset = HEADER.size
+    rng_version, has_gauss, gauss = RNG_HEADER.unpack_from(data, offset)
+    offset += RNG_HEADER.size
+    internal = array("I")
+    internal.frombytes(data[offset:offset + RNG_STATE_LENGTH * internal.itemsize])
+    offset += RNG_STATE_LENGTH * internal.itemsize
+
+    state = {"rng": [rng_version, internal.tolist(), gauss if has_gauss else None],
+             "frame_count": frame_count,
+             "fire_cooldown": fire_cooldown,
+             "outcome": outcome}
+    state["asteroids"], offset = unpack_field(data, offset, world.asteroids)
+    state["asteroids"]["next_id"], = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    state["bullets"], offset = unpack_objects(data, offset)
+    state["ships"], offset = unpack_objects(data, offset)
+    if hasattr(world, "hearts"):
+        state["hearts"], offset = unpack_objects(data, offset)
+    if hasattr(world, "aliens"):
+        state["enemy_bullets"], offset = unpack_objects(data, offset)
+        state["aliens"], offset = unpack_field(data, offset, world.aliens)
+    if hasattr(world, "waves"):
+        state["waves"] = list(WAVES.unpack_from(data, offset))
+        offset += WAVES.size
+    if hasattr(world, "fire_cooldowns"):
+        players, = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        cooldowns = array("d")
+        cooldowns.frombytes(data[offset:offset + players * cooldowns.itemsize])
+        offset += players * cooldowns.itemsize
+        state["fire_cooldowns"] = cooldowns.tolist()
+    world.load_state(state)
+    return world
+
+def fork(world):
+    """
+    Returns a new World in the same state as world, that can be stepped
+    without changing world
+    """
+    return restore(snapshot(world))
+
+def save_snapshot(path, world):
+    """
+    Writes a snapshot of world to path. The file is written next to path
+    first and then renamed, so a crash never leaves half a snapshot
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as snapshot_file:
+        snapshot_file.write(snapshot(world))
+    os.replace(temporary, path)
+    return path
+
+def load_snapshot(path, world=None):
+    """
+    Reads a snapshot file written by save_snapshot()
+    """
+    with open(path, "rb") as snapshot_file:
+        return restore(snapshot_file.read(), world)
+
+def random_inputs(rng):
+    """
+    Returns Inputs with a random few actions held and pressed
+    """
+    held = [action for action in CHECK_ACTIONS if rng.random() < 0.4]
+    pressed = [action for action in held if rng.random() < 0.2]
+    return Inputs(held, pressed)
+
+def check_forks(mode, seed, frames, steps):
+    """
+    Plays a game of mode with random inputs for up to frames ticks and
+    forks it on every tick. Every fork is stepped with the same inputs as
+    the game for steps ticks and then compared with it. Returns the
+    frames of the forks that played out differently
+    """
+    world = WORLD_MODES[mode](seed)
+    rng = random.Random(seed)
+    #(frame the fork was made at, fork) still being stepped, oldest first
+    forks = []
+    differed = []
+    while world.frame_count < frames and world.outcome is None:
+        forks.append((world.frame_count, fork(world)))
+        inputs = random_inputs(rng)
+        world.step(inputs)
+        for made, other in forks:
+            other.step(inputs)
+        if world.frame_count - forks[0][0] >= steps:
+            made, other = forks.pop(0)
+            if snapshot(other) != snapshot(world):
+                differed.append(made)
+    #forks of a game that ended early are compared where it ended
+    data = snapshot(world)
+    differed.extend(made for made, other in forks if snapshot(other) != data)
+    return differed
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that forked asteroids games play out like the originals")
+    parser.add_argument("--seeds", type=int, default=5, help="games played of every mode")
+    parser.add_argument("--frames", type=int, default=600, help="ticks each game is played for")
+    parser.add_argument("--steps", type=int, default=10, help="ticks each fork is stepped before it's compared")
+    args = parser.parse_args()
+    failed = 0
+    for mode in WORLD_MODES:
+        for seed in range(args.seeds):
+            differed = check_forks(mode, seed, args.frames, args.steps)
+            if differed:
+                failed += 1
+                print("{} seed {}: forks made at frames {} played out differently".format(mode, seed, differed))
+    print("{} of {} games had forks that played out differently".format(failed, len(WORLD_MODES) * args.seeds))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
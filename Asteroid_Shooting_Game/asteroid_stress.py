@@ -0,0 +1,186 @@
+"""
+File: asteroid_stress.py
+Worst case loads for the asteroids game, used to find out how much
+hardware the game needs. A Stress_Scenario fills a World with many more
+asteroids, bullets, enemy asteroids and aliens than a real game has, and
+keeps them topped up so the load stays the same on every frame.
+
+Run it without a window:
+    python asteroid_stress.py --mode hard --rocks 200 100 50 --bullets 300 --aliens 8
+or with a window, which also times drawing:
+    python ALIDO_asteroidsfinal.py --stress --mode hard --rocks 200 100 50
+"""
+import argparse
+import math
+import time
+import numpy as np
+from asteroid_world import (SCREEN_WIDTH, SCREEN_HEIGHT, BIG_ROCK_SPEED,
+                            LARGE_ROCK, MEDIUM_ROCK, SMALL_ROCK, Inputs, WORLD_MODES)
+
+#How fast the extra rocks move for each size, in pixels per frame
+STRESS_ROCK_SPEEDS = {LARGE_ROCK: BIG_ROCK_SPEED, MEDIUM_ROCK: 2, SMALL_ROCK: 5}
+STRESS_FRAMES = 1000
+STRESS_SEED = 1
+#Percentiles printed for every timing
+STRESS_PERCENTILES = (50, 90, 95, 99, 100)
+
+
+class Stress_Scenario:
+    """
+    How many of each thing a stress run has. Rocks, bullets and enemy
+    asteroids that get destroyed are replaced on the next frame
+    """
+    def __init__(self, mode="easy", large=0, medium=0, small=0, bullets=0,
+                 enemy_bullets=0, aliens=1, seed=STRESS_SEED):
+        self.mode = mode
+        self.rocks = {LARGE_ROCK: large, MEDIUM_ROCK: medium, SMALL_ROCK: small}
+        self.bullets = bullets
+        self.enemy_bullets = enemy_bullets
+        self.aliens = aliens
+        self.seed = seed
+
+    def describe(self):
+        return "{} mode, rocks {}/{}/{}, bullets {}, enemy asteroids {}, aliens {}".format(
+            self.mode, self.rocks[LARGE_ROCK], self.rocks[MEDIUM_ROCK], self.rocks[SMALL_ROCK],
+            self.bullets, self.enemy_bullets, self.aliens)
+
+    def build(self):
+        """
+        Returns a new World of the scenario's mode filled with its objects
+        """
+        world = WORLD_MODES[self.mode](self.seed)
+        has_aliens = hasattr(world, "aliens")
+        if not has_aliens and (self.enemy_bullets or self.aliens > 1):
+            raise ValueError("Aliens and enemy asteroids are only in hard mode")
+
+        if has_aliens:
+            #the world already has one alien, the rest sit in a row along the top
+            extra = self.aliens - len(world.aliens)
+            for i in range(extra):
+                world.add_alien(SCREEN_WIDTH * (i + 1) / (extra + 1), SCREEN_HEIGHT - 40)
+
+        self.refill(world)
+        return world
+
+    def trim(self, world):
+        """
+        Removes the rocks of each size past what the scenario asks for,
+        like the pieces of split rocks, so the load stays the one
+        describe() reports
+        """
+        field = world.asteroids
+        n = field.count
+        for size, wanted in self.rocks.items():
+            rows = np.flatnonzero(field.alive[:n] & (field.size[:n] == size))
+            #the newest rows go first, those are the pieces from splits
+            field.alive[rows[wanted:]] = False
+        field.remove_dead()
+
+    def refill(self, world):
+        """
+        Adds new rocks and fires new bullets and enemy asteroids from random
+        places until there are as many as the scenario asks for, and no more
+        rocks than it asks for
+        """
+        self.trim(world)
+        rng = world.rng
+        field = world.asteroids
+        for size, wanted in self.rocks.items():
+            amount = wanted - np.count_nonzero(field.size[:field.count] == size)
+            if amount <= 0:
+                continue
+            directions = np.array([rng.uniform(0, 2 * math.pi) for i in range(amount)])
+            speed = STRESS_ROCK_SPEEDS[size]
+            field.add_many(np.full(amount, size),
+                           np.array([rng.uniform(0, SCREEN_WIDTH) for i in range(amount)]),
+                           np.array([rng.uniform(0, SCREEN_HEIGHT) for i in range(amount)]),
+                           np.cos(directions) * speed, np.sin(directions) * speed)
+
+        for i in range(self.bullets - len(world.bullets)):
+            bullet = world.bullet_pool.acquire()
+            bullet.reset(rng.uniform(0, 360), rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+            world.bullets.append(bullet)
+            bullet.fire()
+
+        if self.enemy_bullets:
+            for i in range(self.enemy_bullets - len(world.enemy_bullets)):
+                enemy = world.enemy_bullet_pool.acquire()
+                enemy.reset(rng.uniform(0, 360), rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+                world.enemy_bullets.append(enemy)
+                enemy.fire()
+
+    def step(self, world):
+        """
+        Tops up the world and moves it forward one tick with no keys pressed
+        """
+        self.refill(world)
+        world.step(Inputs())
+
+
+def percentiles(samples):
+    """
+    Returns the STRESS_PERCENTILES of samples, in milliseconds
+    """
+    return np.percentile(np.array(samples) * 1000, STRESS_PERCENTILES)
+
+
+def report(name, samples):
+    """
+    Prints the percentiles of a list of times in seconds
+    """
+    values = percentiles(samples)
+    parts = ["p{} {:7.3f}".format(p, value) for p, value in zip(STRESS_PERCENTILES, values)]
+    print("{:8s} ms  {}".format(name, "  ".join(parts)))
+
+
+def run_headless(scenario, frames=STRESS_FRAMES):
+    """
+    Runs a scenario with no window and returns the time of every update
+    """
+    world = scenario.build()
+    update_times = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        scenario.step(world)
+        update_times.append(time.perf_counter() - start)
+    return world, update_times
+
+
+def add_stress_arguments(parser):
+    """
+    Adds the options that describe a stress scenario to an argparse parser
+    """
+    parser.add_argument("--mode", choices=sorted(WORLD_MODES), default="easy")
+    parser.add_argument("--rocks", type=int, nargs=3, default=[0, 0, 0],
+                        metavar=("LARGE", "MEDIUM", "SMALL"), help="asteroids of each size kept in the field")
+    parser.add_argument("--bullets", type=int, default=0, help="bullets kept flying")
+    parser.add_argument("--enemy-bullets", type=int, default=0, help="enemy asteroids kept flying (hard mode)")
+    parser.add_argument("--aliens", type=int, default=1, help="number of aliens (hard mode)")
+    parser.add_argument("--frames", type=int, default=STRESS_FRAMES)
+    parser.add_argument("--seed", type=int, default=STRESS_SEED)
+
+
+def scenario_from_args(args):
+    large, medium, small = args.rocks
+    return Stress_Scenario(args.mode, large, medium, small, args.bullets,
+                           args.enemy_bullets, args.aliens, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the asteroids game under a heavy load without a window")
+    add_stress_arguments(parser)
+    args = parser.parse_args()
+    scenario = scenario_from_args(args)
+    try:
+        world, update_times = run_headless(scenario, args.frames)
+    except ValueError as error:
+        parser.error(str(error))
+    print(scenario.describe())
+    #pieces split off on the last frame are not part of the load
+    scenario.trim(world)
+    print("{} frames, {} asteroids left".format(args.frames, len(world.asteroids)))
+    report("update", update_times)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1786 @@
+"""
+File: asteroid_world.py
+This module holds the rules of the asteroids game without any window,
+view or drawing code. The game views in ALIDO_asteroidsfinal.py wrap a
+World and only turn key presses into Inputs and the World into pictures
+and sounds, so the game can also be stepped without a display.
+"""
+from abc import ABC
+import math
+import random
+import numpy as np
+from asteroid_profiler import NO_PROFILER
+from asteroid_hitbox import hit_shape, stack_shapes, shapes_touch, turned
+from asteroid_particles import (NO_PARTICLES, ROCK_PARTICLE, ROCK_PARTICLES, ROCK_PARTICLE_SPEED,
+                                ROCK_PARTICLE_LIFE, SHIP_PARTICLE, SHIP_PARTICLES,
+                                SHIP_PARTICLE_SPEED, SHIP_PARTICLE_LIFE)
+
+# These are Global constants to use throughout the game
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+#Speeds, spins and lifetimes below are per frame of the original game,
+#which ran at 60 frames per second. The World is stepped TICK_RATE times
+#per second and scales every step so the game plays the same at any tick rate
+REFERENCE_TICK_RATE = 60
+TICK_RATE = 60
+
+BULLET_SPEED = 10
+BULLET_LIFE = 60
+
+#Holding the spacebar fires a bullet after this many frames
+MACHINE_GUN_DELAY = 5
+
+#Bullets made up front for the ship and the enemy alien. A ship firing
+#every frame has BULLET_LIFE bullets out at a time
+BULLET_POOL_SIZE = 64
+ENEMY_BULLET_POOL_SIZE = 16
+
+SHIP_TURN_AMOUNT = 3
+SHIP_THRUST_AMOUNT = 0.25
+
+INITIAL_ROCK_COUNT = 5
+
+BIG_ROCK_SPIN = 1
+BIG_ROCK_SPEED = 1.5
+
+MEDIUM_ROCK_SPIN = -2
+
+SMALL_ROCK_SPIN = 5
+
+#Size classes of the asteroids in an Asteroid_Field
+LARGE_ROCK = 0
+MEDIUM_ROCK = 1
+SMALL_ROCK = 2
+
+#Size in pixels of the cells used to look up nearby objects for collisions
+SPATIAL_HASH_CELL_SIZE = 64
+
+#The enemy alien fires after this many frames
+ALIEN_FIRE_INTERVAL = 60
+#(x, y, frames between shots, frames before the first shot) of each alien in hard mode
+ALIEN_LAYOUT = ((SCREEN_WIDTH/8, SCREEN_HEIGHT-80, ALIEN_FIRE_INTERVAL, 0),)
+
+#Endurance mode starts a new, bigger wave of rocks every time the field is
+#cleared. Wave 1 is the usual INITIAL_ROCK_COUNT large rocks and every wave
+#after it has WAVE_ROCK_GROWTH more rocks, more of them smaller and faster
+WAVE_ROCK_GROWTH = 3
+#Each wave has this much more medium and small rocks and speed than the last
+WAVE_SMALL_ROCK_STEP = 0.08
+WAVE_SPEED_STEP = 0.1
+WAVE_MAX_SPEEDUP = 2.5
+#Speed of new medium and small rocks before the speedup, in pixels per
+#frame, large ones use BIG_ROCK_SPEED
+WAVE_MEDIUM_ROCK_SPEED = 2.0
+WAVE_SMALL_ROCK_SPEED = 3.0
+#Frames between clearing a wave and the next one starting
+WAVE_DELAY = 120
+#Rocks of a wave come in over several frames. Each frame can spend this
+#much on spawning, a rock costs itself plus the pieces it can break into
+WAVE_SPAWN_BUDGET = 8
+WAVE_SPAWN_COSTS = (4, 3, 1)
+#No more rocks come in while the field holds this many
+WAVE_MAX_ROCKS = 400
+
+#Ships in co-op mode, one for each player
+COOP_PLAYERS = 2
+
+#Actions the player can take, the views map keyboard keys to these
+TURN_LEFT = "left"
+TURN_RIGHT = "right"
+THRUST_UP = "up"
+THRUST_DOWN = "down"
+FIRE = "fire"
+
+#How a finished game ended
+VICTORY = "victory"
+GAME_OVER = "game over"
+
+def wrapped_offset(offset, size):
+    """
+    Returns the shortest offset between two positions on a screen of the
+    given size, going around the edges if that is shorter.
+    Works on single numbers and on NumPy arrays
+    """
+    return (offset + size / 2) % size - size / 2
+
+def swept_distance(end_x, end_y, move_x, move_y):
+    """
+    Continuous collision test between two circles that both moved during
+    the last step. end is where the first circle ended up relative to the
+    second one and move is how far it moved relative to the second one.
+    Returns the square of the closest their centers came during the step.
+    Comparing it with the square of the distance they touch at means fast
+    objects can't pass through each other between two steps.
+    Works on single numbers and on NumPy arrays
+    """
+    start_x = end_x - move_x
+    start_y = end_y - move_y
+    length = move_x * move_x + move_y * move_y
+    #how far along the move the closest point to the second circle is, from 0 to 1
+    along = -(start_x * move_x + start_y * move_y) / np.maximum(length, 1e-12)
+    along = np.clip(along, 0.0, 1.0)
+    closest_x = start_x + move_x * along
+    closest_y = start_y + move_y * along
+    return closest_x * closest_x + closest_y * closest_y
+
+class Point:
+    """
+    Class responsible for x and y coordinates for positions of objects
+    """
+    def __init__(self):
+        self.x = random.uniform(0, SCREEN_WIDTH)
+        self.y = random.uniform(0, SCREEN_HEIGHT)
+
+class Velocity:
+    """
+    Class responsible for velocity of moving objects
+    """
+    def __init__(self):
+        self.dx = 0.0
+        self.dy = 0.0
+
+class FlyingObjects(ABC):
+    """
+    This is the parent class for these flying objects:
+    Ship
+    Bullets
+    Asteroid
+    """
+    def __init__(self, img, solid=True):
+        self.center = Point()
+        self.velocity = Velocity()
+        #Entity_List the object is in, told when the object dies
+        self.entity_list = None
+        self.entity_slot = None
+        self.entity_index = None
+        self._alive = True
+        #position before the last advance(), used to draw between two steps
+        self.prev_x = None
+        self.prev_y = None
+        #how far the object moved during the last step, for swept collisions
+        self.moved_x = 0.0
+        self.moved_y = 0.0
+        #outline of the image the object collides with, and the circle around it
+        self.shape = hit_shape(img) if solid else None
+        self.radius = self.shape.radius if solid else None
+        self.alpha = 255
+        #path of the image, the views look up the texture with it
+        self.image = img
+        self.direction = 1
+        self.angle = 0.0
+        self.speed = 0.0
+
+    def advance(self, scale=1.0):
+        """
+        Function responsible to move objects forward and move.
+        scale is how many frames of the original game one step lasts
+        """
+        self.prev_x = self.center.x
+        self.prev_y = self.center.y
+        #when objects are advancing, self.wrap() is called to
+        #check if the advancing objects are off the screen's boundaries
+        #to wrap correctly
+        self.wrap()
+        self.moved_x = self.velocity.dx * scale
+        self.moved_y = self.velocity.dy * scale
+        self.center.x += self.moved_x
+        self.center.y += self.moved_y
+
+    @property
+    def alive(self):
+        return self._alive
+
+    @alive.setter
+    def alive(self, value):
+        #the list the object is in keeps track of what died this frame
+        #so it doesn't have to look through every object to find them
+        if self._alive and not value and self.entity_list is not None:
+            self.entity_list.dead.append(self)
+        self._alive = value
+
+    def is_alive(self):
+        """
+        Returns condition of flying object (whether if it's alive or not).
+        """
+        return self.alive
+
+    def wrap(self):
+        """
+        If an object goes off the right edge of the screen,
+        it should appear on the left edge.
+        """
+        if self.center.x > SCREEN_WIDTH:
+            self.center.x -= SCREEN_WIDTH
+        elif self.center.x < 0:
+            self.center.x += SCREEN_WIDTH
+        elif self.center.y > SCREEN_HEIGHT:
+            self.center.y -= SCREEN_HEIGHT
+        elif self.center.y < 0:
+            self.center.y += SCREEN_HEIGHT
+
+    def get_state(self):
+        """
+        Returns everything that changes while the object flies, as a list.
+        The last move is kept too, objects that are checked for collisions
+        before they advance are swept along it
+        """
+        return [self.center.x, self.center.y, self.prev_x, self.prev_y,
+                self.velocity.dx, self.velocity.dy, self.angle, self.alive,
+                self.moved_x, self.moved_y]
+
+    def set_state(self, state):
+        """
+        Puts the object back in a state from get_state()
+        """
+        (self.center.x, self.center.y, self.prev_x, self.prev_y,
+         self.velocity.dx, self.velocity.dy, self.angle, self.alive,
+         self.moved_x, self.moved_y) = state[:10]
+
+    def reach(self):
+        """
+        How far from its center the object could have touched something
+        during the last step, its radius plus how far it moved
+        """
+        return self.radius + abs(self.moved_x) + abs(self.moved_y)
+
+    def is_touching(self, other):
+        """
+        Returns True if the outlines of both objects touched at any point
+        of the last step, not only where they ended up.
+        The distance is measured around the screen's edges too, since
+        objects that go off one edge come back on the other one
+        """
+        end_x = wrapped_offset(self.center.x - other.center.x, SCREEN_WIDTH)
+        end_y = wrapped_offset(self.center.y - other.center.y, SCREEN_HEIGHT)
+        move_x = self.moved_x - other.moved_x
+        move_y = self.moved_y - other.moved_y
+        if move_x == 0 and move_y == 0:
+            distance = end_x * end_x + end_y * end_y
+        else:
+            #same as swept_distance() without NumPy, since this runs for single pairs
+            start_x = end_x - move_x
+            start_y = end_y - move_y
+            along = -(start_x * move_x + start_y * move_y) / (move_x * move_x + move_y * move_y)
+            along = min(1.0, max(0.0, along))
+            closest_x = start_x + move_x * along
+            closest_y = start_y + move_y * along
+            distance = closest_x * closest_x + closest_y * closest_y
+        too_close = self.radius + other.radius
+        if distance >= too_close * too_close:
+            return False
+        #circles inside both outlines touching means the outlines did too
+        inside = self.shape.inner_radius + other.shape.inner_radius
+        if distance < inside * inside:
+            return True
+        #the circles only tell that the objects came close, the outlines tell if they touched
+        return bool(shapes_touch(turned(self.shape.points, self.angle), turned(self.shape.normals, self.angle),
+                                 turned(other.shape.points, other.angle), turned(other.shape.normals, other.angle),
+                                 end_x, end_y, move_x, move_y)[0])
+
+class Entity_List:
+    """
+    Class for a list of flying objects that can be looped over and added
+    to while objects in it die. Dead objects stay in the list until
+    compact() is called once per frame, which swaps each dead object with
+    the last one so removing costs the same no matter how long the list is.
+    Every object also gets a handle that keeps pointing at it while other
+    objects come and go, and stops working once the object is removed
+    """
+    def __init__(self, keep_order=False):
+        self.items = []
+        #objects that died since the last compact()
+        self.dead = []
+        #handle slot -> index in self.items, and how many times the slot was reused
+        self.slots = []
+        self.generations = []
+        self.free_slots = []
+        #lists that are drawn in order, like the hearts, are compacted
+        #without changing the order of what's left
+        self.keep_order = keep_order
+        #objects added and removed since the telemetry last looked
+        self.added = 0
+        self.removed = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        #objects appended while looping are looped over too, and nothing is
+        #removed until compact(), so the loop never skips anything
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def append(self, flying_object):
+        """
+        Adds an object to the list and returns its handle
+        """
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.slots)
+            self.slots.append(None)
+            self.generations.append(0)
+        self.slots[slot] = len(self.items)
+        flying_object.entity_list = self
+        flying_object.entity_slot = slot
+        flying_object.entity_index = len(self.items)
+        self.items.append(flying_object)
+        self.added += 1
+        if not flying_object.alive:
+            self.dead.append(flying_object)
+        return (slot, self.generations[slot])
+
+    def handle(self, flying_object):
+        """
+        Returns the handle of an object in the list
+        """
+        return (flying_object.entity_slot, self.generations[flying_object.entity_slot])
+
+    def get(self, handle):
+        """
+        Returns the object for a handle, or None if it was removed
+        """
+        slot, generation = handle
+        if slot >= len(self.slots) or self.generations[slot] != generation:
+            return None
+        return self.items[self.slots[slot]]
+
+    def compact(self):
+        """
+        Removes every object that died since the last call and returns them
+        """
+        removed = []
+        for flying_object in self.dead:
+            #objects can be brought back to life or be removed already
+            if flying_object.alive or flying_object.entity_list is not self:
+                continue
+            removed.append(flying_object)
+            if not self.keep_order:
+                index = flying_object.entity_index
+                last = self.items.pop()
+                if last is not flying_object:
+                    self.items[index] = last
+                    last.entity_index = index
+                    self.slots[last.entity_slot] = index
+            self.release(flying_object)
+        self.dead = []
+
+        if self.keep_order and removed:
+            self.items = [flying_object for flying_object in self.items if flying_object.entity_list is self]
+            for index, flying_object in enumerate(self.items):
+                flying_object.entity_index = index
+                self.slots[flying_object.entity_slot] = index
+        self.removed += len(removed)
+        return removed
+
+    def clear(self):
+        """
+        Removes every object from the list and returns them
+        """
+        removed = self.items
+        for flying_object in removed:
+            self.release(flying_object)
+        self.items = []
+        self.dead = []
+        self.removed += len(removed)
+        return removed
+
+    def release(self, flying_object):
+        """
+        Frees the handle slot of a removed object so its old handles stop working
+        """
+        slot = flying_object.entity_slot
+        self.slots[slot] = None
+        self.generations[slot] += 1
+        self.free_slots.append(slot)
+        flying_object.entity_list = None
+        flying_object.entity_slot = None
+        flying_object.entity_index = None
+
+class Object_Pool:
+    """
+    Class that keeps flying objects after they die so they can be reused
+    instead of making new ones. make is called to fill the pool up front
+    and only again if every object in the pool is in use
+    """
+    def __init__(self, make, size):
+        self.make = make
+        self.free = [make() for i in range(size)]
+        #how many objects the pool has made in total
+        self.made = size
+
+    def acquire(self):
+        """
+        Returns an object that is not in use
+        """
+        if self.free:
+            return self.free.pop()
+        self.made += 1
+        return self.make()
+
+    def release(self, flying_objects):
+        """
+        Gives removed objects back to the pool
+        """
+        self.free.extend(flying_objects)
+
+class Spatial_Hash:
+    """
+    Class that splits the screen into a grid of cells so collisions are only
+    checked between objects in neighbouring cells instead of every pair.
+    The grid wraps around the screen's edges the same way flying objects do
+    """
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE):
+        self.columns = max(1, int(SCREEN_WIDTH // cell_size))
+        self.rows = max(1, int(SCREEN_HEIGHT // cell_size))
+        self.cell_width = SCREEN_WIDTH / self.columns
+        self.cell_height = SCREEN_HEIGHT / self.rows
+        self.cells = {}
+        #pairs tested by query() since the telemetry last looked
+        self.tests = 0
+
+    def cell_range(self, x, y, radius):
+        """
+        Returns the wrapped cells covered by a square of the radius around x and y
+        """
+        first_column = math.floor((x - radius) / self.cell_width)
+        last_column = math.floor((x + radius) / self.cell_width)
+        first_row = math.floor((y - radius) / self.cell_height)
+        last_row = math.floor((y + radius) / self.cell_height)
+        #an object wider than the screen only needs to cover every cell once
+        last_column = min(last_column, first_column + self.columns - 1)
+        last_row = min(last_row, first_row + self.rows - 1)
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                yield (column % self.columns, row % self.rows)
+
+    def rebuild(self, flying_objects):
+        """
+        Empties the grid and puts every alive object back in the cells it covers
+        """
+        self.cells = {}
+        for flying_object in flying_objects:
+            if flying_object.alive:
+                self.insert(flying_object)
+
+    def insert(self, flying_object):
+        """
+        Adds an object to every cell it covers
+        """
+        cells = self.cells
+        #objects cover the cells they could have touched anything in during the step
+        for cell in self.cell_range(flying_object.center.x, flying_object.center.y, flying_object.reach()):
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = [flying_object]
+            else:
+                bucket.append(flying_object)
+
+    def query(self, flying_object):
+        """
+        Returns the objects in the grid that are touching the given object
+        """
+        found = []
+        seen = set()
+        cells = self.cells
+        for cell in self.cell_range(flying_object.center.x, flying_object.center.y, flying_object.reach()):
+            for other in cells.get(cell, ()):
+                key = id(other)
+                if key not in seen:
+                    seen.add(key)
+                    if other.alive:
+                        self.tests += 1
+                        if flying_object.is_touching(other):
+                            found.append(other)
+        return found
+
+class Array_Field:
+    """
+    Base class for things kept as rows of NumPy arrays instead of one
+    object per thing. The first self.count rows are in use and arrays()
+    names every per-row array. The views draw a field by its image, size,
+    angle and previous and current positions
+    """
+    #rows added and removed since the telemetry last looked
+    added = 0
+    removed = 0
+
+    def __len__(self):
+        return self.count
+
+    def arrays(self):
+        """
+        Returns the names of every per-row array
+        """
+        return []
+
+    def reserve(self, extra):
+        """
+        Makes sure there is room for extra more rows, doubling the arrays if needed
+        """
+        needed = self.count + extra
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self.arrays():
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def save_state(self):
+        """
+        Returns the rows in use as plain lists, one per array
+        """
+        state = {}
+        for name in self.arrays():
+            state[name] = getattr(self, name)[:self.count].tolist()
+        return state
+
+    def load_state(self, state):
+        """
+        Replaces every row with the ones from save_state()
+        """
+        count = len(state["x"])
+        self.count = 0
+        self.reserve(count)
+        for name in self.arrays():
+            getattr(self, name)[:count] = state[name]
+        self.count = count
+
+class Asteroid_Field(Array_Field):
+    """
+    Class that holds every asteroid of the game in NumPy arrays instead of
+    one object per rock, so all the rocks are moved, wrapped and spun with
+    a few array operations per frame. Each asteroid is a row in the arrays,
+    the first self.count rows are in use
+    """
+    #image of each size class, indexed by LARGE_ROCK, MEDIUM_ROCK and SMALL_ROCK
+    images = ("asteroid_file/meteorGrey_big1.png",
+              "asteroid_file/meteorGrey_med1.png",
+              "asteroid_file/meteorGrey_small1.png")
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        #positions before the last advance(), used to draw between two steps
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        #every rock gets a number of its own that is never used again, so
+        #a rock can be told apart from the others over the network
+        self.ids = np.zeros(capacity, dtype=np.uint32)
+        self.next_id = 0
+        #outline, radius around it and spin of each size class
+        self.size_shapes = [hit_shape(image) for image in self.images]
+        self.size_points, self.size_normals = stack_shapes(self.size_shapes)
+        self.size_radius = np.array([shape.radius for shape in self.size_shapes])
+        self.size_inner = np.array([shape.inner_radius for shape in self.size_shapes])
+        self.size_spin = np.array([BIG_ROCK_SPIN, MEDIUM_ROCK_SPIN, SMALL_ROCK_SPIN], dtype=float)
+        #grid used to find the rocks near a bullet or a ship
+        self.grid = Spatial_Hash()
+        self.grid_order = np.zeros(0, dtype=np.intp)
+        self.grid_starts = np.zeros(self.grid.columns * self.grid.rows + 1, dtype=np.intp)
+        #outline of every rock in the grid turned like its sprite
+        self.turned_points = np.zeros((0,) + self.size_points.shape[1:])
+        self.turned_normals = np.zeros((0,) + self.size_normals.shape[1:])
+        #scale of the last advance() and the farthest any rock moved in it
+        self.scale = 1.0
+        self.max_move = 0.0
+        #pairs tested with circles and with outlines since the telemetry last looked
+        self.circle_tests = 0
+        self.outline_tests = 0
+
+    def arrays(self):
+        """
+        Returns every per-rock array, used when the arrays grow or get compacted
+        """
+        return ["x", "y", "prev_x", "prev_y", "dx", "dy", "angle", "size", "alive", "ids"]
+
+    def save_state(self):
+        state = super().save_state()
+        state["next_id"] = self.next_id
+        return state
+
+    def load_state(self, state):
+        if "ids" not in state:
+            #states saved before rocks had ids
+            state = dict(state, ids=range(len(state["x"])), next_id=len(state["x"]))
+        super().load_state(state)
+        self.next_id = state["next_id"]
+
+    def add(self, size, x, y, dx, dy):
+        """
+        Adds a single rock of the size class and returns its row
+        """
+        self.add_many(np.array([size]), np.array([x]), np.array([y]), np.array([dx]), np.array([dy]))
+        return self.count - 1
+
+    def add_many(self, sizes, xs, ys, dxs, dys):
+        """
+        Adds a batch of rocks at once, all the arguments are arrays of the same length
+        """
+        amount = len(sizes)
+        self.reserve(amount)
+        start = self.count
+        end = start + amount
+        self.size[start:end] = sizes
+        self.x[start:end] = xs
+        self.y[start:end] = ys
+        self.prev_x[start:end] = xs
+        self.prev_y[start:end] = ys
+        self.dx[start:end] = dxs
+        self.dy[start:end] = dys
+        self.angle[start:end] = 0.0
+        self.alive[start:end] = True
+        self.ids[start:end] = np.arange(self.next_id, self.next_id + amount)
+        self.next_id += amount
+        self.added += amount
+        self.count = end
+
+    def add_large(self, amount, rng=random):
+        """
+        Adds large rocks at random places picked with rng. They all move at
+        1.5 pixels per frame in the same direction as a large asteroid always has
+        """
+        direction = math.radians(1)
+        xs = [rng.uniform(0, SCREEN_WIDTH) for i in range(amount)]
+        ys = [rng.uniform(0, SCREEN_HEIGHT) for i in range(amount)]
+        self.add_many(np.full(amount, LARGE_ROCK), np.array(xs), np.array(ys),
+                      np.full(amount, math.cos(direction) * BIG_ROCK_SPEED),
+                      np.full(amount, math.sin(direction) * BIG_ROCK_SPEED))
+
+    def radius(self):
+        """
+        Returns the radius of every rock in use
+        """
+        return self.size_radius[self.size[:self.count]]
+
+    def advance(self, scale=1.0):
+        """
+        Spins, wraps and moves every rock by one step,
+        scale is how many frames of the original game one step lasts
+        """
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        self.angle[:n] += self.size_spin[self.size[:n]] * scale
+        #a rock that goes off one edge of the screen appears on the other one
+        x[x > SCREEN_WIDTH] -= SCREEN_WIDTH
+        x[x < 0] += SCREEN_WIDTH
+        y[y > SCREEN_HEIGHT] -= SCREEN_HEIGHT
+        y[y < 0] += SCREEN_HEIGHT
+        x += self.dx[:n] * scale
+        y += self.dy[:n] * scale
+        self.scale = scale
+        self.max_move = float((np.abs(self.dx[:n]) + np.abs(self.dy[:n])).max() * scale) if n else 0.0
+
+    def split(self, rows):
+        """
+        Breaks all the hit rocks at once. A large asteroid becomes two medium
+        asteroids and one small one, a medium asteroid becomes two small ones
+        and a small asteroid is just destroyed
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        if len(rows) == 0:
+            return
+        self.alive[rows] = False
+        size = self.size[rows]
+        large = rows[size == LARGE_ROCK]
+        medium = rows[size == MEDIUM_ROCK]
+
+        #The first medium asteroid has the same velocity as the original
+        #large one plus 2 pixel/frame in the up direction, the second one
+        #plus 2 pixel/frame in the down direction. The small asteroid has
+        #the original velocity plus 5 pixels/frame to the right.
+        #The small asteroids from a medium rock get 1.5 pixels/frame up and
+        #right for the first one and 1.5 down and left for the second one.
+        parents = np.concatenate([large, large, large, medium, medium])
+        sizes = np.concatenate([np.full(len(large), MEDIUM_ROCK), np.full(len(large), MEDIUM_ROCK),
+                                np.full(len(large), SMALL_ROCK), np.full(2 * len(medium), SMALL_ROCK)])
+        extra_dx = np.concatenate([np.zeros(2 * len(large)), np.full(len(large), 5.0),
+                                   np.full(len(medium), 1.5), np.full(len(medium), -1.5)])
+        extra_dy = np.concatenate([np.full(len(large), 2.0), np.full(len(large), -2.0),
+                                   np.zeros(len(large)), np.full(len(medium), 1.5), np.full(len(medium), -1.5)])
+        #pieces of large rocks only get the extra speed on one axis,
+        #the other one starts at rest like a brand new rock would
+        dx = self.dx[parents] + extra_dx
+        dy = self.dy[parents] + extra_dy
+        pieces = 2 * len(large)
+        dx[:pieces] = extra_dx[:pieces]
+        dy[pieces:3 * len(large)] = 0.0
+        self.add_many(sizes, self.x[parents], self.y[parents], dx, dy)
+
+    def remove_dead(self):
+        """
+        Removes the destroyed rocks, keeping the others in order
+        """
+        n = self.count
+        alive = self.alive[:n]
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        for name in self.arrays():
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+        self.alive[self.count:n] = False
+        self.removed += n - self.count
+
+    def rebuild_grid(self):
+        """
+        Sorts the rows by the grid cell their center is in, so the rocks of
+        any cell can be found with a slice of self.grid_order, and turns the
+        outline of every rock once for all the objects checked against it
+        """
+        grid = self.grid
+        n = self.count
+        columns = np.floor(self.x[:n] / grid.cell_width).astype(np.intp) % grid.columns
+        rows = np.floor(self.y[:n] / grid.cell_height).astype(np.intp) % grid.rows
+        cells = columns * grid.rows + rows
+        self.grid_order = np.argsort(cells, kind="stable")
+        self.grid_starts = np.searchsorted(cells[self.grid_order], np.arange(grid.columns * grid.rows + 1))
+        sizes = self.size[:n]
+        self.turned_points = turned(self.size_points[sizes], self.angle[:n])
+        self.turned_normals = turned(self.size_normals[sizes], self.angle[:n])
+
+    def touching_circles(self, flying_objects):
+        """
+        Returns which object and which alive rock every pair is, for the
+        pairs where the object came into the rock's circle at any point of
+        the last step, sorted by object and then row. Also returns where the
+        object ended up and how far it moved relative to the rock, and the
+        square of the closest they came.
+        Both the object and the rocks moved, so their paths are checked and
+        not only where they ended up. The distance is measured around the
+        screen's edges too
+        """
+        grid = self.grid
+        x = np.array([flying_object.center.x for flying_object in flying_objects], dtype=float)
+        y = np.array([flying_object.center.y for flying_object in flying_objects], dtype=float)
+        moved_x = np.array([flying_object.moved_x for flying_object in flying_objects], dtype=float)
+        moved_y = np.array([flying_object.moved_y for flying_object in flying_objects], dtype=float)
+        radius = np.array([flying_object.radius for flying_object in flying_objects], dtype=float)
+        #rocks are filed by their center, so look as far as the biggest
+        #and fastest rock could have reached, like Spatial_Hash.cell_range()
+        reach = radius + np.abs(moved_x) + np.abs(moved_y) + self.size_radius.max() + self.max_move
+        first_column = np.floor((x - reach) / grid.cell_width).astype(np.intp)
+        first_row = np.floor((y - reach) / grid.cell_height).astype(np.intp)
+        column_count = np.minimum(np.floor((x + reach) / grid.cell_width).astype(np.intp) - first_column + 1,
+                                  grid.columns)
+        row_count = np.minimum(np.floor((y + reach) / grid.cell_height).astype(np.intp) - first_row + 1,
+                               grid.rows)
+
+        #one entry per object and cell it covers, each cell only once
+        cell_count = column_count * row_count
+        cell_owner = np.repeat(np.arange(len(flying_objects)), cell_count)
+        step = np.arange(len(cell_owner)) - np.repeat(np.cumsum(cell_count) - cell_count, cell_count)
+        column = (first_column[cell_owner] + step // row_count[cell_owner]) % grid.columns
+        row = (first_row[cell_owner] + step % row_count[cell_owner]) % grid.rows
+        cells = column * grid.rows + row
+        starts = self.grid_starts[cells]
+        rock_count = self.grid_starts[cells + 1] - starts
+
+        #one entry per object and rock in the cells it covers
+        owners = np.repeat(cell_owner, rock_count)
+        step = np.arange(len(owners)) - np.repeat(np.cumsum(rock_count) - rock_count, rock_count)
+        rows = self.grid_order[np.repeat(starts, rock_count) + step]
+        alive = self.alive[rows]
+        owners = owners[alive]
+        rows = rows[alive]
+        self.circle_tests += len(rows)
+
+        too_close = radius[owners] + self.size_radius[self.size[rows]]
+        end_x = wrapped_offset(x[owners] - self.x[rows], SCREEN_WIDTH)
+        end_y = wrapped_offset(y[owners] - self.y[rows], SCREEN_HEIGHT)
+        move_x = moved_x[owners] - self.dx[rows] * self.scale
+        move_y = moved_y[owners] - self.dy[rows] * self.scale
+        distance = swept_distance(end_x, end_y, move_x, move_y)
+        touching = np.flatnonzero(distance < too_close * too_close)
+        touching = touching[np.lexsort((rows[touching], owners[touching]))]
+        return (owners[touching], rows[touching], end_x[touching], end_y[touching],
+                move_x[touching], move_y[touching], distance[touching])
+
+    def query(self, flying_object):
+        """
+        Returns the rows of the alive rocks the outline of the flying object
+        touched at any point of the last step, in row order
+        """
+        return self.query_many([flying_object])[0]
+
+    def query_many(self, flying_objects):
+        """
+        Returns the rows from query() of every flying object. Rocks whose
+        circle an object came into are hits if the circles inside both
+        outlines touched too, and only the ones in between have their
+        outline checked, every object's in one batch
+        """
+        results = [[] for flying_object in flying_objects]
+        if not flying_objects or self.count == 0:
+            return results
+        owners, rows, end_x, end_y, move_x, move_y, distance = self.touching_circles(flying_objects)
+        if len(rows) == 0:
+            return results
+
+        #objects of the same kind share one outline
+        shapes = {}
+        for flying_object in flying_objects:
+            shapes.setdefault(flying_object.shape, len(shapes))
+        inner = np.array([shape.inner_radius for shape in shapes])
+        kinds = np.array([shapes[flying_object.shape] for flying_object in flying_objects])[owners]
+        inside = inner[kinds] + self.size_inner[self.size[rows]]
+        hit = distance < inside * inside
+
+        check = np.flatnonzero(~hit)
+        if len(check):
+            self.outline_tests += len(check)
+            #every object's outline is turned once, not once per rock
+            points, normals = stack_shapes(list(shapes))
+            object_kinds = np.array([shapes[flying_object.shape] for flying_object in flying_objects])
+            angles = np.array([flying_object.angle for flying_object in flying_objects], dtype=float)
+            points = turned(points[object_kinds], angles)
+            normals = turned(normals[object_kinds], angles)
+            owner = owners[check]
+            other = rows[check]
+            hit[check] = shapes_touch(points[owner], normals[owner],
+                                      self.turned_points[other], self.turned_normals[other],
+                                      end_x[check], end_y[check], move_x[check], move_y[check])
+        for owner, row in zip(owners[hit].tolist(), rows[hit].tolist()):
+            results[owner].append(row)
+        return results
+
+class Ship(FlyingObjects):
+    """
+    Class for the ship which user can control with keyboard
+    """
+    def __init__(self):
+        super().__init__("asteroid_file/playerShip1_green.png")
+        #Ship needs an angle or orientation
+        self.angle = 1
+        self.center.x = SCREEN_WIDTH/2
+        self.center.y = SCREEN_HEIGHT/2
+        #which player steers the ship, there is more than one in co-op
+        self.player = 0
+
+    def get_state(self):
+        """
+        Ships also keep which player they belong to
+        """
+        return super().get_state() + [self.player]
+
+    def set_state(self, state):
+        super().set_state(state)
+        #states saved before co-op was added have no player
+        if len(state) > 10:
+            self.player = int(state[10])
+
+    def turn_left(self, scale=1.0):
+        """
+        The left arrow rotates the ship 3 degrees to the left.
+        """
+        self.angle += SHIP_TURN_AMOUNT * scale
+
+    def turn_right(self, scale=1.0):
+        """
+        The right arrow rotates the ship 3 degrees to the right.
+        """
+        self.angle -= SHIP_TURN_AMOUNT * scale
+
+    def up_thrust(self, scale=1.0):
+        """
+        The up arrow will increase the velocity in the direction the ship is pointed by 0.25 pixels/frame.
+        """
+        self.velocity.dx -= math.sin(math.radians(self.angle)) * SHIP_THRUST_AMOUNT * scale
+        self.velocity.dy += math.cos(math.radians(self.angle)) * SHIP_THRUST_AMOUNT * scale
+
+    def down_thrust(self, scale=1.0):
+        """
+        The down arrow will decrease the velocity in the direction the ship is pointed by 0.25 pixels/frame.
+        """
+        self.velocity.dx += math.sin(math.radians(self.angle)) * SHIP_THRUST_AMOUNT * scale
+        self.velocity.dy -= math.cos(math.radians(self.angle)) * SHIP_THRUST_AMOUNT * scale
+
+
+class Heart(FlyingObjects):
+    """
+    Class for the ship's lives
+    """
+    def __init__(self):
+        super().__init__("asteroid_file/heart.png", solid=False)
+
+    def split(self, hearts):
+        self.alive = False
+
+class Heart_List:
+    """
+    This class will create 3 lives for the player's ship
+    """
+    def __init__(self, hearts):
+        heart1 = Heart()
+        heart1.center.x = SCREEN_WIDTH/1.3
+        heart1.center.y = SCREEN_HEIGHT-30
+        heart2 = Heart()
+        heart2.center.x = SCREEN_WIDTH/1.2
+        heart2.center.y = SCREEN_HEIGHT-30
+        heart3 = Heart()
+        heart3.center.x = SCREEN_WIDTH/1.1
+        heart3.center.y = SCREEN_HEIGHT-30
+        hearts.append(heart1)
+        hearts.append(heart2)
+        hearts.append(heart3)
+
+class Bullet(FlyingObjects):
+    """
+    Class for bullets that comes out of ship when user presses space bar
+    """
+        #Bullet class will take ship's angle and coordinates to determine where to shoot
+    def __init__(self, ship_angle, ship_x, ship_y):
+        super().__init__("asteroid_file/laserBlue01.png")
+        self.reset(ship_angle, ship_x, ship_y)
+
+    def reset(self, ship_angle, ship_x, ship_y):
+        """
+        Gets the bullet ready to be fired again, used by the bullet pool
+        """
+        self.alive = True
+        #Bullets only live for 60 frames, after which they should "die"
+        #and be removed from the game.
+        self.lives = BULLET_LIFE
+        #Bullets should start with the same velocity of the ship (speed and direction)
+        #plus 10 pixels per frame in the direction the ship is pointed.
+        self.speed = BULLET_SPEED
+        #rotates bullet image by 90 degrees counter clockwise
+        self.angle = ship_angle-90
+        self.center.x = ship_x
+        self.center.y = ship_y
+        self.velocity.dx = 0.0
+        self.velocity.dy = 0.0
+        self.prev_x = None
+        self.prev_y = None
+        self.moved_x = 0.0
+        self.moved_y = 0.0
+
+    def advance(self, scale=1.0):
+        """
+        Overrides advance() from parent
+        """
+        super().advance(scale)
+        #self.lives decrements as it moves
+        self.lives -= scale
+        #if there are no more self.lives(equal or greater to 0), bullet is no longer alive
+        if self.lives <= 0:
+            self.alive = False
+
+    def get_state(self):
+        """
+        Bullets also keep how many frames they have left
+        """
+        return super().get_state() + [self.lives]
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.lives = state[10]
+
+    def fire(self):
+        """
+        Bullets are should start with the same velocity of the ship (speed and direction)
+        plus 10 pixels per frame in the direction the ship is pointed.
+        """
+        #+90 is added to angle to make sure bullet's direction is positioned correctly from ship's direction
+        self.velocity.dx -= math.sin(math.radians(self.angle+90)) * BULLET_SPEED
+        self.velocity.dy += math.cos(math.radians(self.angle+90)) * BULLET_SPEED
+
+class Alien_Fleet(Array_Field):
+    """
+    Class for the enemy alien ships that shoot asteroids at the player.
+    Aliens sit still, and each one has its own fire schedule: it fires
+    every interval frames, starting after its delay. Every alien is aimed
+    at every ship with one NumPy computation per step
+    """
+    images = ("asteroid_file/ufo.png",)
+
+    def __init__(self, capacity=8):
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        #aliens don't move, but the views draw every field between two positions
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int8)
+        #frames between shots and frames since the last shot
+        self.interval = np.zeros(capacity)
+        self.timer = np.zeros(capacity)
+
+    def arrays(self):
+        return ["x", "y", "prev_x", "prev_y", "angle", "size", "interval", "timer"]
+
+    def add(self, x, y, interval=ALIEN_FIRE_INTERVAL, delay=0.0):
+        """
+        Adds an alien at x, y and returns its row
+        """
+        self.reserve(1)
+        row = self.count
+        self.x[row] = self.prev_x[row] = x
+        self.y[row] = self.prev_y[row] = y
+        self.angle[row] = 0.0
+        self.size[row] = 0
+        self.interval[row] = interval
+        self.timer[row] = -delay
+        self.count += 1
+        self.added += 1
+        return row
+
+    def advance(self, scale=1.0):
+        """
+        Moves every alien's schedule forward one step and returns
+        the rows of the aliens that fire this step
+        """
+        n = self.count
+        timer = self.timer[:n]
+        interval = self.interval[:n]
+        timer += scale
+        firing = np.flatnonzero(timer >= interval)
+        timer[firing] -= interval[firing]
+        return firing
+
+    def aim(self, ship_x, ship_y):
+        """
+        Returns the angle in degrees from every alien to every ship, one
+        row per alien and one column per ship, and turns each alien to face
+        the last ship like the single alien always did
+        """
+        n = self.count
+        angles = np.degrees(np.arctan2(ship_y[np.newaxis, :] - self.y[:n, np.newaxis],
+                                       ship_x[np.newaxis, :] - self.x[:n, np.newaxis]))
+        if angles.shape[1]:
+            self.angle[:n] = angles[:, -1] - 270
+        return angles
+
+class Enemy_Bullets(FlyingObjects):
+    """
+    Class for enemy's projectiles or asteroids
+    """
+    def __init__(self, alien_angle, alien_x, alien_y):
+        super().__init__("asteroid_file/asteroid.png")
+        self.reset(alien_angle, alien_x, alien_y)
+
+    def reset(self, alien_angle, alien_x, alien_y):
+        """
+        Gets the enemy asteroid ready to be fired again, used by the enemy bullet pool
+        """
+        self.alive = True
+        self.speed = BULLET_SPEED
+        self.angle = alien_angle
+        self.center.x = alien_x
+        self.center.y = alien_y
+        self.velocity.dx = 0.0
+        self.velocity.dy = 0.0
+        self.prev_x = None
+        self.prev_y = None
+        self.moved_x = 0.0
+        self.moved_y = 0.0
+
+    def advance(self, scale=1.0):
+        """
+        Overrides advance() from parent class. Enemy asteroids will
+        only be "dead" or removed from the list once it is out of
+        the screen's boundaries
+        """
+        super().advance(scale)
+        if self.center.x > SCREEN_WIDTH:
+            self.alive = False
+        elif self.center.y > SCREEN_HEIGHT:
+            self.alive = False
+        elif self.center.x < 0:
+            self.alive = False
+        elif self.center.y < 0:
+            self.alive = False
+
+    def fire(self):
+        self.velocity.dx -= math.sin(math.radians(self.angle+270)) * BULLET_SPEED
+        self.velocity.dy += math.cos(math.radians(self.angle+270)) * BULLET_SPEED
+
+class Inputs:
+    """
+    Class for what the player is doing during one frame.
+    held is the set of actions being held down and pressed
+    is the set of actions that were pressed since the last frame
+    """
+    def __init__(self, held=(), pressed=()):
+        self.held = frozenset(held)
+        self.pressed = frozenset(pressed)
+
+    @classmethod
+    def from_keys(cls, held_keys, pressed_keys, key_actions):
+        """
+        Makes the Inputs for keyboard keys, key_actions maps each key to
+        its action and keys without an action are left out
+        """
+        held = [key_actions[key] for key in held_keys if key in key_actions]
+        pressed = [key_actions[key] for key in pressed_keys if key in key_actions]
+        return cls(held, pressed)
+
+class Wave_Scheduler:
+    """
+    Makes the waves of endurance mode and streams their rocks into an
+    Asteroid_Field. Every wave is made from the seed and its number only,
+    so a wave is the same in every game with the same seed, and the
+    scheduler's state is just a few numbers. Rocks come in from the edges
+    of the screen a few per frame, so a big wave never makes a slow frame
+    """
+    def __init__(self, seed, budget=WAVE_SPAWN_BUDGET, max_rocks=WAVE_MAX_ROCKS):
+        self.seed = seed
+        self.budget = budget
+        self.max_rocks = max_rocks
+        #wave 1 is the field the world starts with
+        self.wave = 1
+        #how many rocks of the wave are in the field and what spawning has left to spend
+        self.spawned = 0
+        self.credit = 0.0
+        #frames left before the rocks of the wave start to come in
+        self.delay = 0.0
+        self.plan = self.make_wave(self.wave)
+
+    def make_wave(self, number):
+        """
+        Returns the sizes, positions and velocities of every rock of a wave
+        and the total cost of spawning each rock and the ones before it
+        """
+        if number <= 1:
+            amount = 0
+        else:
+            amount = INITIAL_ROCK_COUNT + WAVE_ROCK_GROWTH * (number - 1)
+        rng = np.random.default_rng([self.seed, number])
+        #later waves have more of the smaller, quicker rocks
+        smaller = min(0.5, WAVE_SMALL_ROCK_STEP * (number - 1))
+        sizes = rng.choice(3, amount, p=[1 - smaller, smaller * 2 / 3, smaller / 3]).astype(np.int8)
+        #rocks start on the left or bottom edge, which is also the right or top one
+        xs = rng.uniform(0, SCREEN_WIDTH, amount)
+        ys = rng.uniform(0, SCREEN_HEIGHT, amount)
+        on_side = rng.random(amount) < 0.5
+        xs[on_side] = 0.0
+        ys[~on_side] = 0.0
+        directions = rng.uniform(0, 2 * math.pi, amount)
+        #read here and not kept from import, so asteroid_batch.py can change them
+        speeds = np.array([BIG_ROCK_SPEED, WAVE_MEDIUM_ROCK_SPEED, WAVE_SMALL_ROCK_SPEED])[sizes]
+        speeds = speeds * min(WAVE_MAX_SPEEDUP, 1 + WAVE_SPEED_STEP * (number - 1))
+        costs = np.cumsum(np.array(WAVE_SPAWN_COSTS)[sizes])
+        return sizes, xs, ys, np.cos(directions) * speeds, np.sin(directions) * speeds, costs
+
+    def pending(self):
+        """
+        Returns how many rocks of the wave have not come in yet
+        """
+        return len(self.plan[0]) - self.spawned
+
+    def start_wave(self, number):
+        self.wave = number
+        self.plan = self.make_wave(number)
+        self.spawned = 0
+        self.credit = 0.0
+        self.delay = WAVE_DELAY
+
+    def update(self, field, scale=1.0):
+        """
+        Adds as many of the wave's rocks as this step's budget pays for,
+        and starts the next wave once the field is cleared.
+        Returns True if a new wave started
+        """
+        if self.pending() == 0:
+            if field.count > 0:
+                return False
+            self.start_wave(self.wave + 1)
+            return True
+        if self.delay > 0:
+            self.delay -= scale
+            return False
+
+        sizes, xs, ys, dxs, dys, costs = self.plan
+        start = self.spawned
+        spent = costs[start - 1] if start else 0
+        #unspent budget carries over, but only enough for the dearest rock
+        self.credit = min(self.credit + self.budget * scale, self.budget + max(WAVE_SPAWN_COSTS))
+        end = int(np.searchsorted(costs, spent + self.credit, side="right"))
+        end = min(end, start + max(0, self.max_rocks - field.count))
+        if end > start:
+            field.add_many(sizes[start:end], xs[start:end], ys[start:end], dxs[start:end], dys[start:end])
+            self.credit -= costs[end - 1] - spent
+            self.spawned = end
+        return False
+
+    def save_state(self):
+        return [self.wave, self.spawned, self.credit, self.delay]
+
+    def load_state(self, state):
+        wave, self.spawned, self.credit, self.delay = state
+        if wave != self.wave:
+            self.wave = wave
+            self.plan = self.make_wave(wave)
+
+#Inputs of a player who isn't pressing anything
+NO_INPUTS = Inputs()
+
+class World:
+    """
+    This class holds the rules of the easy game mode: the ship, its
+    bullets and the asteroids. step() moves the game forward one tick.
+    Things the views need to know about, like sounds to play, are put in
+    self.events, and self.outcome is set once the game is won or lost.
+    All randomness comes from self.rng, so two worlds with the same seed
+    and the same inputs play out exactly the same
+    """
+    #name of the game mode, used to make the same kind of world again
+    mode = "easy"
+
+    def __init__(self, seed=None, tick_rate=TICK_RATE):
+        #a seed is always picked so the game can be played again from it
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tick_rate = tick_rate
+        #how many frames of the original game one step lasts
+        self.scale = REFERENCE_TICK_RATE / tick_rate
+
+        #every asteroid lives in one Asteroid_Field
+        self.asteroids = Asteroid_Field()
+        self.bullets = Entity_List()
+        self.ships = Entity_List()
+        #dead bullets go back in the pool to be fired again
+        self.bullet_pool = Object_Pool(lambda: Bullet(0, 0, 0), BULLET_POOL_SIZE)
+        #frames left before holding the spacebar fires again
+        self.fire_cooldown = 0
+        #number of steps taken so far
+        self.frame_count = 0
+        #list of (event name, x, y) that happened during the last step
+        self.events = []
+        #None while the game is still going, then VICTORY or GAME_OVER
+        self.outcome = None
+        #times the phases of every step, see asteroid_profiler.py
+        self.profiler = NO_PROFILER
+        #sparks for the views to draw, see asteroid_particles.py
+        self.particles = NO_PARTICLES
+
+        #5 Large Asteroids to be added to the asteroid field
+        self.asteroids.add_large(INITIAL_ROCK_COUNT, self.rng)
+
+        self.ships.append(self.make_ship(0))
+
+    def make_ship(self, player):
+        """
+        Returns a new ship for player at its starting place
+        """
+        ship = Ship()
+        ship.player = player
+        return ship
+
+    def get_layers(self):
+        """
+        Returns the lists of flying objects to draw, from bottom to top
+        """
+        return [("asteroids", self.asteroids),
+                ("bullets", self.bullets),
+                ("ships", self.ships)]
+
+    def save_state(self):
+        """
+        Returns the whole state of the world as plain lists and numbers, so
+        it can be saved and later put back with load_state()
+        """
+        version, internal, gauss = self.rng.getstate()
+        return {"rng": [version, list(internal), gauss],
+                "frame_count": self.frame_count,
+                "fire_cooldown": self.fire_cooldown,
+                "outcome": self.outcome,
+                "asteroids": self.asteroids.save_state(),
+                "bullets": [bullet.get_state() for bullet in self.bullets],
+                "ships": [ship.get_state() for ship in self.ships]}
+
+    def load_state(self, state):
+        """
+        Puts the world back in a state from save_state()
+        """
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+        self.frame_count = state["frame_count"]
+        self.fire_cooldown = state["fire_cooldown"]
+        self.outcome = state["outcome"]
+        self.events = []
+        self.asteroids.load_state(state["asteroids"])
+
+        self.bullet_pool.release(self.bullets.clear())
+        for bullet_state in state["bullets"]:
+            bullet = self.bullet_pool.acquire()
+            bullet.set_state(bullet_state)
+            self.bullets.append(bullet)
+
+        self.ships.clear()
+        for ship_state in state["ships"]:
+            ship = Ship()
+            ship.set_state(ship_state)
+            self.ships.append(ship)
+
+    def step(self, inputs):
+        """
+        Moves the game forward by one tick using the player's inputs
+        """
+        self.events = []
+        scale = self.scale
+        profiler = self.profiler
+        profiler.begin_frame(self)
+
+        self.handle_inputs(inputs)
+        profiler.mark("check_keys")
+
+        # TODO: Tell everything to advance or move forward one step in time
+        self.asteroids.advance(scale)
+
+        for bullet in self.bullets:
+            bullet.advance(scale)
+
+        for ship in self.ships:
+            ship.advance(scale)
+
+        self.particles.advance(scale)
+        profiler.mark("advance")
+
+        #calls remove_deadObjects() as objects advance
+        self.remove_deadObjects()
+        profiler.mark("remove_deadObjects")
+
+        # TODO: Check for collisions
+        self.check_collisions()
+        profiler.mark("check_collisions")
+
+        self.frame_count += 1
+
+    def report_telemetry(self, telemetry):
+        """
+        Gives telemetry from game_telemetry.py the objects alive in every
+        layer, and the objects added and removed and the pairs tested for
+        collisions since the last report
+        """
+        for name, objects in self.get_layers():
+            telemetry.gauge("entities", len(objects), name)
+            telemetry.count("spawns", objects.added, name)
+            telemetry.count("removals", objects.removed, name)
+            objects.added = objects.removed = 0
+        asteroids = self.asteroids
+        telemetry.count("collision_pairs", asteroids.circle_tests, "circle")
+        telemetry.count("collision_pairs", asteroids.outline_tests, "outline")
+        asteroids.circle_tests = asteroids.outline_tests = 0
+
+    def handle_inputs(self, inputs):
+        """
+        Fires and steers every ship with the player's inputs
+        """
+        #pressing the spacebar always fires, holding it down fires
+        #again every MACHINE_GUN_DELAY frames
+        if FIRE in inputs.pressed or (FIRE in inputs.held and self.fire_cooldown <= 0):
+            self.fire(self.ships)
+            self.fire_cooldown = MACHINE_GUN_DELAY
+        self.fire_cooldown -= self.scale
+        self.check_keys(inputs.held, self.ships)
+
+    def check_keys(self, held, ships):
+        """
+        This function checks for actions that are being held down.
+        """
+        scale = self.scale
+        for ship in ships:
+
+            if TURN_LEFT in held:
+                ship.turn_left(scale)
+
+            if TURN_RIGHT in held:
+                ship.turn_right(scale)
+
+            if THRUST_UP in held:
+                ship.up_thrust(scale)
+                self.particles.thrust(ship, scale)
+
+            if THRUST_DOWN in held:
+                ship.down_thrust(scale)
+
+    def fire(self, ships):
+        """
+        Every alive ship of ships fires a bullet
+        """
+        for ship in ships:
+            if ship.alive:
+                #Passes ship's angle, x coordinate, and the y coordinate
+                #to the bullet as parameters
+                bullet = self.bullet_pool.acquire()
+                bullet.reset(ship.angle, ship.center.x, ship.center.y)
+                self.bullets.append(bullet)
+                bullet.fire()
+                self.events.append(("shoot", ship.center.x, ship.center.y))
+
+    def remove_deadObjects(self):
+        """
+        Removes dead objects from screen
+        """
+        #only the objects that died since the last frame are looked at
+        self.bullet_pool.release(self.bullets.compact())
+        self.asteroids.remove_dead()
+        self.ships.compact()
+
+    def check_asteroids(self):
+        """
+        This will check how many asteroids are left in the screen to know if the game is won
+        """
+        if len(self.asteroids) <= 0:
+            self.outcome = VICTORY
+
+    def check_collisions(self):
+        """
+        Checks when flying objects collide
+        """
+        self.check_bullet_hits()
+
+       #same logic but with asteroids and the ship
+        asteroids = self.asteroids
+        for ship in self.ships:
+            for row in asteroids.query(ship):
+                #once ship gets hit by asteroid, it disappears from screen
+                #along with the asteroid that caused the impact
+                if asteroids.alive[row] and ship.alive and self.ship_hit(ship):
+                    asteroids.alive[row] = False
+
+        #Move to victory screen once all asteroids are destroyed
+        self.check_asteroids()
+
+    def ship_hit(self, ship):
+        """
+        Destroys a ship that got hit and makes a new one.
+        Returns True if the ship was destroyed
+        """
+        #a sound is also played for every collision
+        self.events.append(("collide", ship.center.x, ship.center.y))
+        self.particles.burst([ship.center.x], [ship.center.y], SHIP_PARTICLES,
+                             SHIP_PARTICLE_SPEED, SHIP_PARTICLE_LIFE, SHIP_PARTICLE)
+        ship.alive = False
+        #A new ship is made after every collision
+        self.ships.append(self.make_ship(ship.player))
+        return True
+
+    def check_bullet_hits(self):
+        """
+        Splits the asteroids hit by bullets. Only the asteroids in the cells
+        around each bullet are checked
+        """
+        #asteroids are put in the grid once per frame, new pieces from
+        #splits are checked on the next frame
+        asteroids = self.asteroids
+        asteroids.rebuild_grid()
+        hit = []
+        bullets = [bullet for bullet in self.bullets if bullet.alive]
+        for bullet, rows in zip(bullets, asteroids.query_many(bullets)):
+            for row in rows:
+                #bullet and asteroid both need to be alive for collision detection
+                if asteroids.alive[row]:
+                    bullet.alive = False
+                    asteroids.alive[row] = False
+                    hit.append(row)
+                    break
+        #every rock hit this frame is split in one batch
+        if hit:
+            self.particles.burst(asteroids.x[hit], asteroids.y[hit],
+                                 np.array(ROCK_PARTICLES)[asteroids.size[hit]],
+                                 ROCK_PARTICLE_SPEED, ROCK_PARTICLE_LIFE, ROCK_PARTICLE)
+        asteroids.split(hit)
+
+class Normal_World(World):
+    """
+    Normal mode will inherit from World and override certain methods
+    to include a "lives" system for the ship
+    """
+    mode = "normal"
+
+    def __init__(self, seed=None, tick_rate=TICK_RATE):
+        """
+        self.hearts represents the list of lives for the player's ship
+        """
+        super().__init__(seed, tick_rate)
+        self.hearts = Entity_List(keep_order=True)
+        Heart_List(self.hearts)
+
+    def get_layers(self):
+        """
+        Draws the hearts for the ship
+        """
+        return super().get_layers() + [("hearts", self.hearts)]
+
+    def save_state(self):
+        state = super().save_state()
+        state["hearts"] = [heart.get_state() for heart in self.hearts]
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.hearts.clear()
+        for heart_state in state["hearts"]:
+            heart = Heart()
+            heart.set_state(heart_state)
+            self.hearts.append(heart)
+
+    def remove_deadObjects(self):
+        super().remove_deadObjects()
+        self.hearts.compact()
+
+    def alive_heart(self):
+        """
+        Returns the first heart that has not been lost yet, or None
+        """
+        for heart in self.hearts:
+            if heart.alive:
+                return heart
+        return None
+
+    def ship_hit(self, ship):
+        """
+        Overriden so every hit also costs one of the ship's hearts.
+        A ship can't be destroyed once all hearts are lost
+        """
+        heart = self.alive_heart()
+        if heart is None:
+            return False
+        heart.split(self.hearts)
+        return super().ship_hit(ship)
+
+    def check_collisions(self):
+        """
+        Overriden to include ship's lives
+        """
+        #A ship only has 3 lives/hearts, and it will show a "game over" screen
+        #once all hearts are lost from collisions
+        super().check_collisions()
+
+        #the lost heart is only taken out of the list on the next step,
+        #so the game ends on this step when no heart is left alive
+        if self.alive_heart() is None:
+            self.outcome = GAME_OVER
+
+class Hard_World(Normal_World):
+    """
+    This class is the hard mode for the game which includes
+    an enemy alien ship shooting asteroids at the player
+    """
+    mode = "hard"
+
+    def __init__(self, seed=None, tick_rate=TICK_RATE, alien_layout=ALIEN_LAYOUT):
+        """
+        Overrides Normal's __init__ method to include the enemies and the
+        enemy bullet list. alien_layout has the (x, y, interval, delay)
+        of every alien
+        """
+        super().__init__(seed, tick_rate)
+        self.enemy_bullets = Entity_List()
+        self.enemy_bullet_pool = Object_Pool(lambda: Enemy_Bullets(0, 0, 0), ENEMY_BULLET_POOL_SIZE)
+        self.aliens = Alien_Fleet()
+        #starting positions and fire schedules of the enemy aliens
+        for x, y, interval, delay in alien_layout:
+            self.add_alien(x, y, interval, delay)
+        #grid used to find the enemy's asteroids near bullets and ships
+        self.enemy_hash = Spatial_Hash()
+
+    def add_alien(self, x, y, interval=ALIEN_FIRE_INTERVAL, delay=0.0):
+        """
+        Adds an enemy alien that sits at x, y and fires at the ship every
+        interval frames, starting after delay frames. Returns its row
+        """
+        return self.aliens.add(x, y, interval, delay)
+
+    def get_layers(self):
+        """
+        Draws the enemy aliens and their asteroids
+        """
+        return super().get_layers() + [("aliens", self.aliens),
+                                       ("enemy_bullets", self.enemy_bullets)]
+
+    def save_state(self):
+        state = super().save_state()
+        state["enemy_bullets"] = [enemy.get_state() for enemy in self.enemy_bullets]
+        state["aliens"] = self.aliens.save_state()
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.enemy_bullet_pool.release(self.enemy_bullets.clear())
+        for enemy_state in state["enemy_bullets"]:
+            enemy = self.enemy_bullet_pool.acquire()
+            enemy.set_state(enemy_state)
+            self.enemy_bullets.append(enemy)
+        self.aliens.load_state(state["aliens"])
+
+    def fire_enemy_bullets(self, rows, angles):
+        """
+        Fires one enemy asteroid from each alien row at each angle in the
+        matching row of angles. The velocities are worked out all at once
+        """
+        count = angles.shape[1]
+        xs = np.repeat(self.aliens.x[rows], count).tolist()
+        ys = np.repeat(self.aliens.y[rows], count).tolist()
+        angles = angles.ravel()
+        radians = np.radians(angles + 270)
+        dxs = (-np.sin(radians) * BULLET_SPEED).tolist()
+        dys = (np.cos(radians) * BULLET_SPEED).tolist()
+        for angle, x, y, dx, dy in zip(angles.tolist(), xs, ys, dxs, dys):
+            enemy_bullet = self.enemy_bullet_pool.acquire()
+            enemy_bullet.reset(angle, x, y)
+            enemy_bullet.velocity.dx = dx
+            enemy_bullet.velocity.dy = dy
+            self.enemy_bullets.append(enemy_bullet)
+
+    def remove_deadObjects(self):
+        super().remove_deadObjects()
+        self.enemy_bullet_pool.release(self.enemy_bullets.compact())
+
+    def check_collisions(self):
+        """
+        This overrides original check_collisions() method to include logic with the
+        enemy alien's asteroids colliding with the ship
+        """
+        super().check_collisions()
+        self.enemy_hash.rebuild(self.enemy_bullets)
+        for bullet in self.bullets:
+            if not bullet.alive:
+                continue
+            for enemy in self.enemy_hash.query(bullet):
+                if bullet.alive and enemy.alive:
+                    bullet.alive = False
+                    enemy.alive = False
+
+        for ship in self.ships:
+            for enemy in self.enemy_hash.query(ship):
+                if enemy.alive and ship.alive and self.ship_hit(ship):
+                    enemy.alive = False
+
+        if self.alive_heart() is None:
+            self.outcome = GAME_OVER
+
+    def report_telemetry(self, telemetry):
+        super().report_telemetry(telemetry)
+        #the enemy's asteroids are tested with is_touching(), circle first
+        telemetry.count("collision_pairs", self.enemy_hash.tests, "circle")
+        self.enemy_hash.tests = 0
+
+    def step(self, inputs):
+        """
+        step() is overriden to move the enemy asteroids and to let
+        every alien aim and fire at the ships on its own schedule
+        """
+        super().step(inputs)
+
+        for enemy in self.enemy_bullets:
+            enemy.advance(self.scale)
+        self.profiler.mark("advance_enemies")
+
+        #every alien fires at every ship on its own schedule
+        firing = self.aliens.advance(self.scale)
+        ship_x = np.array([ship.center.x for ship in self.ships])
+        ship_y = np.array([ship.center.y for ship in self.ships])
+        angles = self.aliens.aim(ship_x, ship_y)
+        if len(firing) and len(ship_x):
+            self.fire_enemy_bullets(firing, angles[firing])
+        self.profiler.mark("alien_aim_fire")
+
+class Endurance_World(Normal_World):
+    """
+    Endurance mode has the lives of normal mode, but clearing the field
+    starts a new, bigger wave instead of winning. The game only ends once
+    every heart is lost
+    """
+    mode = "endurance"
+
+    def __init__(self, seed=None, tick_rate=TICK_RATE, spawn_budget=WAVE_SPAWN_BUDGET,
+                 max_rocks=WAVE_MAX_ROCKS):
+        super().__init__(seed, tick_rate)
+        self.waves = Wave_Scheduler(self.seed, spawn_budget, max_rocks)
+
+    def save_state(self):
+        state = super().save_state()
+        state["waves"] = self.waves.save_state()
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.waves.load_state(state["waves"])
+
+    def check_asteroids(self):
+        """
+        Overriden to bring in the rocks of the current wave, and to start
+        the next wave when the field is cleared instead of winning
+        """
+        if self.waves.update(self.asteroids, self.scale):
+            self.events.append(("wave", SCREEN_WIDTH/2, SCREEN_HEIGHT/2))
+
+class Coop_World(Normal_World):
+    """
+    Co-op mode has one ship for each player, sharing the hearts of normal
+    mode. step() takes a list with the Inputs of each player, and a single
+    Inputs only steers the first player's ship
+    """
+    mode = "coop"
+
+    def __init__(self, seed=None, tick_rate=TICK_RATE, players=COOP_PLAYERS):
+        #make_ship() needs to know how many players there are
+        self.players = players
+        super().__init__(seed, tick_rate)
+        self.fire_cooldowns = [0] * players
+        for player in range(1, players):
+            self.ships.append(self.make_ship(player))
+
+    def make_ship(self, player):
+        """
+        The ships start side by side
+        """
+        ship = super().make_ship(player)
+        ship.center.x = SCREEN_WIDTH * (player + 1) / (self.players + 1)
+        return ship
+
+    def save_state(self):
+        state = super().save_state()
+        state["fire_cooldowns"] = list(self.fire_cooldowns)
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.fire_cooldowns = list(state["fire_cooldowns"])
+        self.players = len(self.fire_cooldowns)
+
+    def handle_inputs(self, inputs):
+        """
+        Every player fires and steers only their own ships
+        """
+        if isinstance(inputs, Inputs):
+            inputs = [inputs]
+        for player in range(self.players):
+            player_inputs = inputs[player] if player < len(inputs) else NO_INPUTS
+            ships = [ship for ship in self.ships if ship.player == player]
+            cooldown = self.fire_cooldowns[player]
+            if FIRE in player_inputs.pressed or (FIRE in player_inputs.held and cooldown <= 0):
+                self.fire(ships)
+                cooldown = MACHINE_GUN_DELAY
+            self.fire_cooldowns[player] = cooldown - self.scale
+            self.check_keys(player_inputs.held, ships)
+
+#Every game mode by name
+WORLD_MODES = {World.mode: World,
+               Normal_World.mode: Normal_World,
+               Hard_World.mode: Hard_World,
+               Endurance_World.mode: Endurance_World,
+               Coop_World.mode: Coop_World}
@@ -5,13 +5,31 @@ Designed to be completed by others
 This program implements a simplistic version of the
 classic Pong arcade game.
 """
+import argparse
+import os
+import sys
 import arcade
 import random
 
+#game_capture.py and game_telemetry.py are shared by all the games and sit in the folder above
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from game_capture import Frame_Capture
+from game_telemetry import NO_TELEMETRY, add_telemetry_arguments, telemetry_from_args
+
 # These are Global constants to use throughout the game
 SCREEN_WIDTH = 400
 SCREEN_HEIGHT = 300
 
+#Speeds below are per frame of the original game, which ran at 60 frames
+#per second. The game is updated TICK_RATE times per second no matter how
+#fast the screen is drawn, and every update is scaled to match
+REFERENCE_TICK_RATE = 60
+TICK_RATE = 60
+#Longest time in seconds a single update can catch up on
+MAX_FRAME_TIME = 0.25
+#Counts objects, collision tests and frame times, see game_telemetry.py
+TELEMETRY = NO_TELEMETRY
+
 
 #VARIABLES FOR BALL CLASS
 BALL_RADIUS = 10
@@ -32,53 +50,64 @@ class Point():
     """
     This class is in charge of setting the x and y coordinates for both the ball and the paddle
     """
-    def __init__(self):
+    def __init__(self, rng=random):
         """
         Function to declare main member variables.
         X and Y coordinates are set in random locations right along the left edge of screen
+        rng is where the random numbers come from
         """
         #random.uniform(1, 10) = random float values for x coordinate to make sure ball spawns on left edge of screen with random values
         #random.unform(1, 330) = 1-330 was chosen to make sure the ball can spawn randomly either below or on top of left edge of the screen
-        self.x = random.uniform(1, 10)
-        self.y = random.uniform(1, 330)
+        self.x = rng.uniform(1, 10)
+        self.y = rng.uniform(1, 330)
         
 class Velocity():
     """
     This class is in charge of the velocity for the moving ball
     """
-    def __init__(self):
+    def __init__(self, rng=random):
         """
         Function for Velocity class and dx and dy member variables with a random range of 1-5
         """
         #random.uniform(1, 5) = random float values from 1-5 which will determine the velocity 
-        self.dx = random.uniform(1, 5)
-        self.dy = random.uniform(1, 5)
+        self.dx = rng.uniform(1, 5)
+        self.dy = rng.uniform(1, 5)
         
 class Ball():
     """
     This class is in charge of the pong ball and its attributes.
     """
-    def __init__(self):
+    def __init__(self, rng=random):
         """
         Function to assign center of ball with Point() class' attributes and the velocity from Velocity() class
         """
-        self.center = Point()
-        self.velocity = Velocity()
+        self.rng = rng
+        self.center = Point(rng)
+        self.velocity = Velocity(rng)
+        #position before the last advance, used to draw between two updates
+        self.prev_x = self.center.x
+        self.prev_y = self.center.y
         
-    def draw(self):
+    def draw(self, blend=1.0):
         """
         Function to draw a circle using the previously made x and y coordinates, global variable radius, and color
+        blend is how far along between the previous and the current update the ball is drawn
         """
-        arcade.draw_circle_filled(self.center.x, self.center.y, BALL_RADIUS, BALL_COLOR)
+        x = self.prev_x + (self.center.x - self.prev_x) * blend
+        y = self.prev_y + (self.center.y - self.prev_y) * blend
+        arcade.draw_circle_filled(x, y, BALL_RADIUS, BALL_COLOR)
         return
               
-    def advance(self):
+    def advance(self, scale=1.0):
         """
         This function is responsible for the ball's movement using the velocity.
+        scale is how many frames of the original game one update lasts
         """
+        self.prev_x = self.center.x
+        self.prev_y = self.center.y
         #x and y coordinates move and advance by adding the randomly generated velocity 
-        self.center.x += self.velocity.dx
-        self.center.y += self.velocity.dy
+        self.center.x += self.velocity.dx * scale
+        self.center.y += self.velocity.dy * scale
         return
     
     def bounce_horizontal(self):
@@ -100,7 +129,7 @@ class Ball():
         Once the ball is lost from right edge of screen, this function is called to reset ball's position back to
         the start.
         """
-        self.__init__()
+        self.__init__(self.rng)
         return
     
 class Paddle():
@@ -126,7 +155,7 @@ class Paddle():
         arcade.draw_rectangle_filled(self.center.x, self.center.y, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_COLOR)
         pass
     
-    def move_up(self):
+    def move_up(self, scale=1.0):
         """
         Responsible for making sure paddle moves by 5 pixels up when user presses up button from keyboard
         Stops right exactly on the top edge of the screen
@@ -134,9 +163,9 @@ class Paddle():
         #if user moves paddle right on top of screen, they won't be able to move it more upwards by using this if statement
         #SCREEN_HEIGHT - 20 = Exact number of pixels where paddle can stop exactly on top edge but still has its body fully shown
         if self.center.y < SCREEN_HEIGHT - 20:
-            self.center.y += MOVE_AMOUNT
+            self.center.y += MOVE_AMOUNT * scale
     
-    def move_down(self):
+    def move_down(self, scale=1.0):
         """
         Responsible for making sure paddle moves by 5 pixels down when user presses down button from keyboard
         Stops right exactly on the lower edge of the screen
@@ -144,7 +173,7 @@ class Paddle():
         #if user moves paddle right below on the screen, they won't be able to move it more downwards by using this if statement
         #SCREEN_HEIGHT - 280 = Exact number of pixels where paddle can stop exactly on bottom edge but still has its body fully shown
         if self.center.y > SCREEN_HEIGHT - 280:
-            self.center.y -= MOVE_AMOUNT
+            self.center.y -= MOVE_AMOUNT * scale
 
 class Pong(arcade.Window):
     """
@@ -160,15 +189,29 @@ class Pong(arcade.Window):
     but should not have to if you don't want to.
     """
 
-    def __init__(self, width, height):
+    def __init__(self, width, height, seed=None):
         """
         Sets up the initial conditions of the game
         :param width: Screen width
         :param height: Screen height
+        :param seed: seed of the game's random numbers, the same seed
+                     always gives the same balls
         """
         super().__init__(width, height)
 
-        self.ball = Ball()
+        #a seed is always picked and printed so the game can be played again from it
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        print("pong seed {}, play it again with --seed {}".format(seed, seed))
+        self.rng = random.Random(seed)
+        #how many frames of the original game one update lasts
+        self.scale = REFERENCE_TICK_RATE / TICK_RATE
+        #time not yet simulated, and how far the screen is between two updates
+        self.time_accumulator = 0.0
+        self.blend = 1.0
+
+        self.ball = Ball(self.rng)
         self.paddle = Paddle()
         self.score = 0
 
@@ -189,7 +232,7 @@ class Pong(arcade.Window):
         arcade.start_render()
 
         # draw each object
-        self.ball.draw()
+        self.ball.draw(self.blend)
         self.paddle.draw()
 
         self.draw_score()
@@ -206,11 +249,27 @@ class Pong(arcade.Window):
     def update(self, delta_time):
         """
         Update each object in the game.
+        The game is stepped at a fixed tick rate no matter how often
+        this is called, as many times as delta_time has room for.
         :param delta_time: tells us how much time has actually elapsed
         """
+        tick = 1 / TICK_RATE
+        self.time_accumulator += min(delta_time, MAX_FRAME_TIME)
+        while self.time_accumulator >= tick:
+            self.time_accumulator -= tick
+            self.step()
+        #the screen is drawn between the last two steps
+        self.blend = self.time_accumulator / tick
+        TELEMETRY.gauge("entities", 1, "balls")
+        TELEMETRY.gauge("entities", 1, "paddles")
+        TELEMETRY.end_frame(delta_time)
 
+    def step(self):
+        """
+        Moves the game forward by one tick
+        """
         # Move the ball forward one element in time
-        self.ball.advance()
+        self.ball.advance(self.scale)
 
         # Check to see if keys are being held, and then
         # take appropriate action
@@ -229,6 +288,7 @@ class Pong(arcade.Window):
         """
         too_close_x = (PADDLE_WIDTH / 2) + BALL_RADIUS
         too_close_y = (PADDLE_HEIGHT / 2) + BALL_RADIUS
+        TELEMETRY.count("collision_pairs", 1, "box")
 
         if (abs(self.ball.center.x - self.paddle.center.x) < too_close_x and
                     abs(self.ball.center.y - self.paddle.center.y) < too_close_y and
@@ -246,6 +306,9 @@ class Pong(arcade.Window):
             # We missed!
             self.score -= SCORE_MISS
             self.ball.restart()
+            #the missed ball is taken away and a new one is served
+            TELEMETRY.count("removals", 1, "balls")
+            TELEMETRY.count("spawns", 1, "balls")
 
     def check_bounce(self):
         """
@@ -267,10 +330,10 @@ class Pong(arcade.Window):
         arrow key, and if so, takes appropriate action.
         """
         if self.holding_left:
-            self.paddle.move_down()
+            self.paddle.move_down(self.scale)
 
         if self.holding_right:
-            self.paddle.move_up()
+            self.paddle.move_up(self.scale)
 
     def on_key_press(self, key, key_modifiers):
         """
@@ -299,5 +362,17 @@ class Pong(arcade.Window):
             self.holding_right = False
 
 # Creates the game and starts it going
-window = Pong(SCREEN_WIDTH, SCREEN_HEIGHT)
-arcade.run()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pong game")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record the game to a video file (needs ffmpeg) or a folder of PNG images")
+    parser.add_argument("--seed", type=int, help="seed of the game's random numbers, printed when the game starts")
+    add_telemetry_arguments(parser)
+    args = parser.parse_args()
+    TELEMETRY = telemetry_from_args("pong", args)
+    window = Pong(SCREEN_WIDTH, SCREEN_HEIGHT, args.seed)
+    capture = Frame_Capture(window, args.capture) if args.capture else None
+    arcade.run()
+    if capture is not None:
+        capture.close()
+    TELEMETRY.close()
@@ -4,16 +4,39 @@ Original Author: Br. Burton
 Designed to be completed by others
 This program implements an awesome version of skeet.
 """
+import argparse
+import os
+import sys
 import arcade
 import math
 import random
 
 from abc import ABC, abstractmethod
 
+#game_capture.py and game_telemetry.py are shared by all the games and sit in the folder above
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from game_capture import Frame_Capture
+from game_telemetry import NO_TELEMETRY, add_telemetry_arguments, telemetry_from_args
+
 # These are Global constants to use throughout the game
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 500
 
+#Speeds below are per frame of the original game, which ran at 60 frames
+#per second. The game is updated TICK_RATE times per second no matter how
+#fast the screen is drawn, and every update is scaled to match
+REFERENCE_TICK_RATE = 60
+TICK_RATE = 60
+#Longest time in seconds a single update can catch up on
+MAX_FRAME_TIME = 0.25
+#Counts objects, collision tests and frame times, see game_telemetry.py
+TELEMETRY = NO_TELEMETRY
+#Seed of every game from --seed, each game picks its own if it's None
+SEED = None
+
+#On average a new target is launched once every this many frames
+TARGET_CHANCE = 50
+
 RIFLE_WIDTH = 100
 RIFLE_HEIGHT = 20
 RIFLE_COLOR = arcade.color.DARK_RED
@@ -35,48 +58,66 @@ class Point():
     Class for creating x and y coordinates
     Point class (likely just an x and y).
     """
-    def __init__(self):
+    def __init__(self, rng=random):
         """
         The initial position of the target is anywhere along the top half of the left side the screen.
+        rng is where the random numbers come from
         """
         self.x = 0
-        self.y = random.uniform(SCREEN_HEIGHT/2, SCREEN_HEIGHT)
+        self.y = rng.uniform(SCREEN_HEIGHT/2, SCREEN_HEIGHT)
     
 class Velocity():
     """
     Class responsible for the velocity of moving objects
     Velocity class (likely just a dx and dy).
     """
-    def __init__(self):
+    def __init__(self, rng=random):
         """
         The vertical component of the velocity should be between -2 and +5 pixels/frame.
         The horizontal component of the velocity should be between 1 and 5 pixels/frame.
         """
-        self.dx = random.uniform(1, 5)
-        self.dy = random.uniform(-2, 5)
+        self.dx = rng.uniform(1, 5)
+        self.dy = rng.uniform(-2, 5)
     
 class FlyingObject():
     """
     Base class for the flying objects
     """
-    def __init__(self):
+    def __init__(self, rng=random):
         #self.center = Point
-        self.center = Point()
+        self.center = Point(rng)
         #self.velocity = Velocity
-        self.velocity = Velocity()
+        self.velocity = Velocity(rng)
+        #position before the last advance, used to draw between two updates
+        self.prev_x = None
+        self.prev_y = None
         #self.alive is responsible for to determine if flying object (either bullet or target) is still alive or not
         #self.alive = Boolean
         self.alive = True
         #self.radius = float
         self.radius = 0.0 
     
-    def advance(self):
+    def advance(self, scale=1.0):
         """
         Responsible for objects' movement
+        scale is how many frames of the original game one update lasts
         """
-        self.center.x += self.velocity.dx
-        self.center.y += self.velocity.dy
+        self.prev_x = self.center.x
+        self.prev_y = self.center.y
+        self.center.x += self.velocity.dx * scale
+        self.center.y += self.velocity.dy * scale
         return
+
+    def draw_center(self, blend):
+        """
+        Returns where to draw the object, blend of the way between
+        its position before and after the last advance
+        """
+        if self.prev_x is None:
+            return self.center.x, self.center.y
+        x = self.prev_x + (self.center.x - self.prev_x) * blend
+        y = self.prev_y + (self.center.y - self.prev_y) * blend
+        return x, y
     
     def is_off_screen(self, screen_width, screen_height):
         """
@@ -93,8 +134,8 @@ class Target(FlyingObject, ABC):
     
     advance() and is_off_screen() are already inherited from FlyingObject base class.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, rng=random):
+        super().__init__(rng)
         #super().__init__() called to overwrite float value 0.0 from base class
         self.radius = float(TARGET_RADIUS)
         
@@ -102,7 +143,7 @@ class Target(FlyingObject, ABC):
     Functions draw() and hit() are both abstract methods that all the target subclasses need to override
     """
     @abstractmethod
-    def draw(self):
+    def draw(self, blend=1.0):
         pass
     
     @abstractmethod
@@ -115,11 +156,12 @@ class Standard(Target):
     
     Standard target as first type of target created which is destroyed with one hit.        
     """    
-    def draw(self):
+    def draw(self, blend=1.0):
         """
         Rendered as a circle with a 20px diameter.
         """
-        arcade.draw_circle_filled(self.center.x, self.center.y, self.radius, TARGET_COLOR)
+        x, y = self.draw_center(blend)
+        arcade.draw_circle_filled(x, y, self.radius, TARGET_COLOR)
         return
     
     def hit(self):
@@ -135,11 +177,12 @@ class Safe(Target):
     Safe target as second type of target which should not be hit.
     """
     
-    def draw(self):
+    def draw(self, blend=1.0):
         """
         Rendered as a square.
         """
-        arcade.draw_rectangle_filled(self.center.x, self.center.y, TARGET_SAFE_SIDE, TARGET_SAFE_SIDE, TARGET_SAFE_COLOR)
+        x, y = self.draw_center(blend)
+        arcade.draw_rectangle_filled(x, y, TARGET_SAFE_SIDE, TARGET_SAFE_SIDE, TARGET_SAFE_COLOR)
         
     def hit(self):
         """
@@ -154,27 +197,28 @@ class Strong(Target):
     Strong target as third type of target created which is destroyed with three hits.           
     """
     
-    def __init__(self):
+    def __init__(self, rng=random):
         """
         The strong target should move more slowly than the others as defined below.
         The vertical component of the velocity should be between 1 and 3 pixels/frame.
         The horizontal component of the velocity should be between -2 and 3 pixels/frame.
         """
-        super().__init__()
-        self.velocity.dx = random.uniform(-2, 3)
-        self.velocity.dy = random.uniform(1, 3)
+        super().__init__(rng)
+        self.velocity.dx = rng.uniform(-2, 3)
+        self.velocity.dy = rng.uniform(1, 3)
         """
         self.lives represents number of hits required for target to disappear
         """
         self.lives = 3
         
-    def draw(self):
+    def draw(self, blend=1.0):
         """
         Rendered as a circle with a number inside of it.
         """
-        arcade.draw_circle_outline(self.center.x, self.center.y, self.radius, TARGET_COLOR)
-        text_x = self.center.x - (self.radius / 2)
-        text_y = self.center.y - (self.radius / 2)
+        x, y = self.draw_center(blend)
+        arcade.draw_circle_outline(x, y, self.radius, TARGET_COLOR)
+        text_x = x - (self.radius / 2)
+        text_y = y - (self.radius / 2)
         arcade.draw_text(repr(self.lives), text_x, text_y, TARGET_COLOR, font_size=20)
     
     def hit(self):
@@ -217,11 +261,12 @@ class Bullet(FlyingObject):
         self.center.y = 0
         self.radius = float(BULLET_RADIUS)
         
-    def draw(self):
+    def draw(self, blend=1.0):
         """
         Rendered as a filled-in circle.
         """
-        arcade.draw_circle_filled(self.center.x, self.center.y, self.radius, BULLET_COLOR)
+        x, y = self.draw_center(blend)
+        arcade.draw_circle_filled(x, y, self.radius, BULLET_COLOR)
         return
         
     def fire(self, angle:float):
@@ -246,7 +291,48 @@ class Rifle:
         arcade.draw_rectangle_filled(self.center.x, self.center.y, RIFLE_WIDTH, RIFLE_HEIGHT, RIFLE_COLOR, self.angle)
         return
     
-class Start_Screen(arcade.View):
+class Menu_Screen(arcade.View):
+    """
+    Base class for screens that don't change while they are shown.
+    Their text and shapes are made by make_texts() and make_shapes() the
+    first time the screen is drawn, then drawn again from the cache until
+    refresh() is called
+    """
+    def __init__(self):
+        super().__init__()
+        self.texts = None
+        self.shapes = None
+
+    def make_texts(self):
+        """
+        Returns the arcade.Text objects of the screen
+        """
+        return []
+
+    def make_shapes(self):
+        """
+        Returns an arcade.ShapeElementList with the shapes of the screen
+        """
+        return arcade.ShapeElementList()
+
+    def refresh(self):
+        """
+        Makes the screen again on the next draw, for when something changed
+        """
+        self.texts = None
+        self.shapes = None
+
+    def on_draw(self):
+        # clear the screen to begin drawing
+        arcade.start_render()
+        if self.texts is None:
+            self.texts = self.make_texts()
+            self.shapes = self.make_shapes()
+        self.shapes.draw()
+        for text in self.texts:
+            text.draw()
+
+class Start_Screen(Menu_Screen):
     """
     Starting screen which will explain instructions and each target's point/s
     """  
@@ -256,48 +342,55 @@ class Start_Screen(arcade.View):
         """
         arcade.set_background_color(arcade.color.WHITE)
         
-    def on_draw(self):
+    def make_texts(self):
         """
-        Function that handles drawing things needed for starting screen
+        Function that makes the text needed for starting screen
         """
-        # clear the screen to begin drawing
-        arcade.start_render()
-        
-        # displays title of game on top of screen
-        arcade.draw_text("Skeet Shooting Game", SCREEN_WIDTH/2, SCREEN_HEIGHT-80,
-                         arcade.color.BLUE, font_size=30, anchor_x="center")
-    
-        #Text for instructions
-        arcade.draw_text("Instructions: Shoot targets using your mouse/trackpad.", SCREEN_WIDTH/2, SCREEN_HEIGHT-110,
-                         arcade.color.AO, font_size=15, anchor_x="center")
-        
-        #Text for target and points
+        text_x = SCREEN_WIDTH/3.1 - (TARGET_RADIUS / 2)
+        text_y = SCREEN_HEIGHT-250 - (TARGET_RADIUS / 2)
+        return [
+            # displays title of game on top of screen
+            arcade.Text("Skeet Shooting Game", SCREEN_WIDTH/2, SCREEN_HEIGHT-80,
+                        arcade.color.BLUE, font_size=30, anchor_x="center"),
+            #Text for instructions
+            arcade.Text("Instructions: Shoot targets using your mouse/trackpad.", SCREEN_WIDTH/2, SCREEN_HEIGHT-110,
+                        arcade.color.AO, font_size=15, anchor_x="center"),
+            #Text for target and points
+            arcade.Text("= 1 point", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-165,
+                        arcade.color.BLACK, font_size=20),
+            arcade.Text("= -10 points", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-215,
+                        arcade.color.BLACK, font_size=20),
+            #lives written inside the strong target
+            arcade.Text(repr(3), text_x, text_y, TARGET_COLOR, font_size=20),
+            arcade.Text("= 1 point (first 2 hits)", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-265,
+                        arcade.color.BLACK, font_size=20),
+            arcade.Text("   5 points (third hit)", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-315,
+                        arcade.color.BLACK, font_size=20),
+            arcade.Text("Click mouse to start.", SCREEN_WIDTH/2, SCREEN_HEIGHT-400,
+                        arcade.color.GRAY, font_size=20, anchor_x="center"),
+        ]
+
+    def make_shapes(self):
+        """
+        The legend of the three kinds of targets
+        """
+        shapes = arcade.ShapeElementList()
         #Standard target
-        arcade.draw_circle_filled(SCREEN_WIDTH/3.1, SCREEN_HEIGHT-150, TARGET_RADIUS, TARGET_COLOR)
-        arcade.draw_text("= 1 point", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-165,
-                         arcade.color.BLACK, font_size=20)
+        shapes.append(arcade.create_ellipse_filled(SCREEN_WIDTH/3.1, SCREEN_HEIGHT-150,
+                                                   TARGET_RADIUS * 2, TARGET_RADIUS * 2, TARGET_COLOR))
         #Safe target
-        arcade.draw_rectangle_filled(SCREEN_WIDTH/3.1, SCREEN_HEIGHT-200, TARGET_SAFE_SIDE, TARGET_SAFE_SIDE, TARGET_SAFE_COLOR)
-        arcade.draw_text("= -10 points", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-215,
-                         arcade.color.BLACK, font_size=20)
+        shapes.append(arcade.create_rectangle_filled(SCREEN_WIDTH/3.1, SCREEN_HEIGHT-200,
+                                                     TARGET_SAFE_SIDE, TARGET_SAFE_SIDE, TARGET_SAFE_COLOR))
         #Strong target
-        arcade.draw_circle_outline(SCREEN_WIDTH/3.1, SCREEN_HEIGHT-250, TARGET_RADIUS, TARGET_COLOR)
-        text_x = SCREEN_WIDTH/3.1 - (TARGET_RADIUS / 2)
-        text_y = SCREEN_HEIGHT-250 - (TARGET_RADIUS / 2)
-        arcade.draw_text(repr(3), text_x, text_y, TARGET_COLOR, font_size=20)
-        arcade.draw_text("= 1 point (first 2 hits)", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-265,
-                         arcade.color.BLACK, font_size=20)
-        arcade.draw_text("   5 points (third hit)", SCREEN_WIDTH/2.61, SCREEN_HEIGHT-315,
-                         arcade.color.BLACK, font_size=20)
-        
-        arcade.draw_text("Click mouse to start.", SCREEN_WIDTH/2, SCREEN_HEIGHT-400,
-                         arcade.color.GRAY, font_size=20, anchor_x="center")
+        shapes.append(arcade.create_ellipse_outline(SCREEN_WIDTH/3.1, SCREEN_HEIGHT-250,
+                                                    TARGET_RADIUS * 2, TARGET_RADIUS * 2, TARGET_COLOR))
+        return shapes
         
     def on_mouse_press(self, _x, _y, _button, _modifiers):
         """
         When player clicks mouse/trackpad, this is called and game will start.
         """
-        game = Game()
+        game = Game(SEED)
         self.window.show_view(game)
 
 class Game(arcade.View):
@@ -315,10 +408,31 @@ class Game(arcade.View):
     you shouldn't have to. There are a few sections that you
     must add code to.
     """
-    def __init__(self):
+    def __init__(self, seed=None):
+        """
+        seed is the seed of the game's random numbers, the same seed
+        always launches the same targets
+        """
         super().__init__()
+        #a seed is always picked and printed so the game can be played again from it
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        print("skeet seed {}, play it again with --seed {}".format(seed, seed))
+        self.rng = random.Random(seed)
+        #how many frames of the original game one update lasts
+        self.scale = REFERENCE_TICK_RATE / TICK_RATE
+        #time not yet simulated, and how far the screen is between two updates
+        self.time_accumulator = 0.0
+        self.blend = 1.0
+
         self.rifle = Rifle()
         self.score = 0
+        #the text objects are made once, the score text only changes with the score
+        self.pause_label = arcade.Text("Press Esc. to pause game", SCREEN_WIDTH/3, SCREEN_HEIGHT - 25,
+                                       arcade.color.NAVY_BLUE, font_size=15)
+        self.score_label = arcade.Text("Score: 0", 10, SCREEN_HEIGHT - 20,
+                                       arcade.color.NAVY_BLUE, font_size=12)
 
         self.bullets = []
 
@@ -344,11 +458,11 @@ class Game(arcade.View):
         self.rifle.draw()
 
         for bullet in self.bullets:
-            bullet.draw()
+            bullet.draw(self.blend)
 
         # TODO: iterate through your targets and draw them...
         for target in self.targets:
-            target.draw()
+            target.draw(self.blend)
 
         self.draw_score()
         #calls pause_text() function to display instructions in pausing the game
@@ -358,39 +472,54 @@ class Game(arcade.View):
         """
         Displays how to pause game
         """
-        pause_text = "Press Esc. to pause game"
-        start_x = SCREEN_WIDTH/3
-        start_y = SCREEN_HEIGHT - 25
-        arcade.draw_text(pause_text, start_x=start_x, start_y=start_y, font_size=15, color=arcade.color.NAVY_BLUE)
+        self.pause_label.draw()
                 
     def draw_score(self):
         """
         Puts the current score on the screen
         """
         score_text = "Score: {}".format(self.score)
-        start_x = 10
-        start_y = SCREEN_HEIGHT - 20
-        arcade.draw_text(score_text, start_x=start_x, start_y=start_y, font_size=12, color=arcade.color.NAVY_BLUE)
+        #setting the text lays it out again, so it's only done when the score changed
+        if self.score_label.text != score_text:
+            self.score_label.text = score_text
+        self.score_label.draw()
 
 
     def update(self, delta_time):
         """
         Update each object in the game.
+        The game is stepped at a fixed tick rate no matter how often
+        this is called, as many times as delta_time has room for.
         :param delta_time: tells us how much time has actually elapsed
         """
+        tick = 1 / TICK_RATE
+        self.time_accumulator += min(delta_time, MAX_FRAME_TIME)
+        while self.time_accumulator >= tick:
+            self.time_accumulator -= tick
+            self.step()
+        #the screen is drawn between the last two steps
+        self.blend = self.time_accumulator / tick
+        TELEMETRY.gauge("entities", len(self.bullets), "bullets")
+        TELEMETRY.gauge("entities", len(self.targets), "targets")
+        TELEMETRY.end_frame(delta_time)
+
+    def step(self):
+        """
+        Moves the game forward by one tick
+        """
         self.check_collisions()
         self.check_off_screen()
 
         # decide if we should start a target
-        if random.randint(1, 50) == 1:
+        if self.rng.random() < self.scale / TARGET_CHANCE:
             self.create_target()
 
         for bullet in self.bullets:
-            bullet.advance()
+            bullet.advance(self.scale)
 
         # TODO: Iterate through your targets and tell them to advance
         for target in self.targets:
-            target.advance()
+            target.advance(self.scale)
 
     def create_target(self):
         """
@@ -400,9 +529,9 @@ class Game(arcade.View):
 
         # TODO: Decide what type of target to create and append it to the list
         #creates standard target and appends to list
-        standard = Standard()
-        strong = Strong()
-        safe = Safe()
+        standard = Standard(self.rng)
+        strong = Strong(self.rng)
+        safe = Safe(self.rng)
         
         
         #creates a tuple of the 3 different types of targets
@@ -410,9 +539,10 @@ class Game(arcade.View):
         target_tuple = (standard, strong, safe)
         
         #randomly selects which type of target to spawn
-        random_target = random.choice(target_tuple)
+        random_target = self.rng.choice(target_tuple)
         
         self.targets.append(random_target)
+        TELEMETRY.count("spawns", 1, "targets")
         
         
     def check_collisions(self):
@@ -424,6 +554,8 @@ class Game(arcade.View):
 
         # NOTE: This assumes you named your targets list "targets"
 
+        #every bullet is checked against every target
+        TELEMETRY.count("collision_pairs", len(self.bullets) * len(self.targets), "box")
         for bullet in self.bullets:
             for target in self.targets:
 
@@ -452,10 +584,12 @@ class Game(arcade.View):
         for bullet in self.bullets:
             if not bullet.alive:
                 self.bullets.remove(bullet)
+                TELEMETRY.count("removals", 1, "bullets")
 
         for target in self.targets:
             if not target.alive:
                 self.targets.remove(target)
+                TELEMETRY.count("removals", 1, "targets")
 
     def check_off_screen(self):
         """
@@ -466,10 +600,12 @@ class Game(arcade.View):
         for bullet in self.bullets:
             if bullet.is_off_screen(SCREEN_WIDTH, SCREEN_HEIGHT):
                 self.bullets.remove(bullet)
+                TELEMETRY.count("removals", 1, "bullets")
 
         for target in self.targets:
             if target.is_off_screen(SCREEN_WIDTH, SCREEN_HEIGHT):
                 self.targets.remove(target)
+                TELEMETRY.count("removals", 1, "targets")
                 
     def on_mouse_motion(self, x: float, y: float, dx: float, dy: float):
         # set the rifle angle in degrees
@@ -483,6 +619,7 @@ class Game(arcade.View):
         bullet.fire(angle)
 
         self.bullets.append(bullet)
+        TELEMETRY.count("spawns", 1, "bullets")
         
     def _get_angle_degrees(self, x, y):
         """
@@ -510,7 +647,7 @@ class Game(arcade.View):
             #shows pause screen
             self.window.show_view(pause)
             
-class Pause(arcade.View):
+class Pause(Menu_Screen):
     """
     This class is responsible for creating a pause feature in the game.
     """
@@ -526,41 +663,25 @@ class Pause(arcade.View):
         """
         arcade.set_background_color(arcade.color.ALICE_BLUE)
 
-    def on_draw(self):
-        """
-        Called to draw things needed for pause screen
-        """
-        # clear the screen to begin drawing
-        arcade.start_render()
-
-        #Text Paused appears on top of screen
-        arcade.draw_text("Paused", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
-                         arcade.color.BLACK, font_size=50, anchor_x="center")
-
-        # Show instructions for resuming
-        #anchor_x = "center" centers text automatically 
-        arcade.draw_text("Press Esc. to return",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2,
-                         arcade.color.BLACK,
-                         font_size=15,
-                         anchor_x="center")
-        
-        # Show instructions for restarting
-        arcade.draw_text("Press Spacebar to restart game",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2-30,
-                         arcade.color.BLACK,
-                         font_size=15,
-                         anchor_x="center")
-        
-        # Show instructions for going back to start screen
-        arcade.draw_text("Press Tab to go back to starting screen",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2-60,
-                         arcade.color.BLACK,
-                         font_size=15,
-                         anchor_x="center")
+    def make_texts(self):
+        """
+        Called to make the text needed for pause screen
+        """
+        return [
+            #Text Paused appears on top of screen
+            arcade.Text("Paused", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
+                        arcade.color.BLACK, font_size=50, anchor_x="center"),
+            # Show instructions for resuming
+            #anchor_x = "center" centers text automatically
+            arcade.Text("Press Esc. to return", SCREEN_WIDTH/2, SCREEN_HEIGHT/2,
+                        arcade.color.BLACK, font_size=15, anchor_x="center"),
+            # Show instructions for restarting
+            arcade.Text("Press Spacebar to restart game", SCREEN_WIDTH/2, SCREEN_HEIGHT/2-30,
+                        arcade.color.BLACK, font_size=15, anchor_x="center"),
+            # Show instructions for going back to start screen
+            arcade.Text("Press Tab to go back to starting screen", SCREEN_WIDTH/2, SCREEN_HEIGHT/2-60,
+                        arcade.color.BLACK, font_size=15, anchor_x="center"),
+        ]
 
     def on_key_press(self, key, _modifiers):
         """
@@ -571,16 +692,30 @@ class Pause(arcade.View):
         if key == arcade.key.ESCAPE:   # resume game
             self.window.show_view(self.game_view)
         elif key == arcade.key.SPACE:  # reset game
-            game = Game()
+            game = Game(SEED)
             self.window.show_view(game)
         elif key == arcade.key.TAB: #go back to starting screen
             start = Start_Screen()
             self.window.show_view(start)
             
 # Creates the game and starts it going
-window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT)
-#Starting screen is shown first
-game = Start_Screen()
-window.show_view(game)
-arcade.run()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Skeet game")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record the game to a video file (needs ffmpeg) or a folder of PNG images")
+    parser.add_argument("--seed", type=int, help="seed of the game's random numbers, printed when a game starts")
+    add_telemetry_arguments(parser)
+    args = parser.parse_args()
+    TELEMETRY = telemetry_from_args("skeet", args)
+    SEED = args.seed
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT)
+    capture = Frame_Capture(window, args.capture) if args.capture else None
+    #Starting screen is shown first
+    game = Start_Screen()
+    window.show_view(game)
+    arcade.run()
+    if capture is not None:
+        capture.close()
+    TELEMETRY.close()
+
 
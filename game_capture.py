@@ -0,0 +1,175 @@
+"""
+File: game_capture.py
+Records a game window while it is played, for bug reports and videos of
+the games. It is shared by the asteroids, pong and skeet games.
+
+After every on_draw the framebuffer is read into one of a ring of
+buffers made when the capture starts, and a writer thread encodes the
+frames, to a video through ffmpeg or to a folder of PNG images. The game
+never waits for the writer. When every buffer is still waiting to be
+written, the frame is dropped and counted instead.
+
+    capture = Frame_Capture(window, "session.mp4")   #needs ffmpeg
+    capture = Frame_Capture(window, "frames")        #numbered PNG images
+    arcade.run()
+    capture.close()
+"""
+import ctypes
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from pyglet import gl
+
+#Frames that can wait for the writer before new ones are dropped
+CAPTURE_BUFFERS = 8
+#Frames captured per second, frames drawn in between are skipped
+CAPTURE_FPS = 30
+#Paths ending with these are encoded as video, anything else is a folder of images
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".mov", ".avi")
+
+
+class Image_Encoder:
+    """
+    Writes every frame as a PNG image in a folder. Dropped frames leave
+    a gap in the numbers
+    """
+    def __init__(self, folder, width, height):
+        #Pillow comes with arcade, it's only needed for images
+        from PIL import Image
+        self.image = Image
+        self.folder = folder
+        self.size = (width, height)
+        os.makedirs(folder, exist_ok=True)
+
+    def write(self, pixels, number):
+        #Pillow only decodes bytes, the copy is made on the writer thread.
+        #OpenGL rows start at the bottom, the -1 stride flips them
+        image = self.image.frombytes("RGB", self.size, bytes(pixels), "raw", "RGB", 0, -1)
+        image.save(os.path.join(self.folder, "frame_{:06d}.png".format(number)), compress_level=1)
+
+    def close(self):
+        pass
+
+
+class Video_Encoder:
+    """
+    Pipes the frames into an ffmpeg process that encodes the video.
+    Dropped frames are left out, so the video plays them a little faster
+    """
+    def __init__(self, path, width, height, fps):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg is needed to capture a video, capture to a folder of images instead")
+        self.process = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", "{}x{}".format(width, height),
+             "-r", str(fps), "-i", "-",
+             "-vf", "vflip", "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE)
+
+    def write(self, pixels, number):
+        self.process.stdin.write(pixels)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class Frame_Capture:
+    """
+    Captures the frames of a window until close() is called
+    """
+    def __init__(self, window, path, fps=CAPTURE_FPS, buffers=CAPTURE_BUFFERS):
+        self.window = window
+        self.path = path
+        self.width, self.height = window.get_framebuffer_size()
+        size = self.width * self.height * 3
+        if path.lower().endswith(VIDEO_EXTENSIONS):
+            self.encoder = Video_Encoder(path, self.width, self.height, fps)
+        else:
+            self.encoder = Image_Encoder(path, self.width, self.height)
+
+        #glReadPixels writes straight into the buffers through the pointers,
+        #the writer only gets read-only views of them
+        buffers = [bytearray(size) for _ in range(buffers)]
+        self.pointers = [(ctypes.c_ubyte * size).from_buffer(buffer) for buffer in buffers]
+        self.frames = [memoryview(buffer).toreadonly() for buffer in buffers]
+        #indexes of the buffers, free ones wait in free and read ones in filled
+        self.free = queue.SimpleQueue()
+        for index in range(len(buffers)):
+            self.free.put(index)
+        self.filled = queue.SimpleQueue()
+
+        self.interval = 1 / fps
+        self.next_time = time.perf_counter()
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.error = None
+
+        self.writer = threading.Thread(target=self.write_frames, daemon=True)
+        self.writer.start()
+        #the window's own on_draw runs after the view's, so the frame is done by then
+        draw = window.on_draw
+        def on_draw():
+            draw()
+            self.grab()
+        window.on_draw = on_draw
+
+    def grab(self):
+        """
+        Reads the frame just drawn into a free buffer for the writer
+        """
+        now = time.perf_counter()
+        if now < self.next_time:
+            return
+        #after a long hitch the capture starts counting again from now
+        self.next_time = max(self.next_time + self.interval, now)
+        try:
+            index = self.free.get_nowait()
+        except queue.Empty:
+            if self.dropped == 0:
+                print("Capture is falling behind, frames are being dropped")
+            self.dropped += 1
+            return
+        gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+        gl.glReadPixels(0, 0, self.width, self.height, gl.GL_RGB, gl.GL_UNSIGNED_BYTE,
+                        self.pointers[index])
+        self.filled.put((index, self.captured + self.dropped))
+        self.captured += 1
+
+    def write_frames(self):
+        """
+        Runs on the writer thread, encoding the frames in the order they
+        were read. After an error the frames are thrown away so the game
+        still never waits
+        """
+        while True:
+            frame = self.filled.get()
+            if frame is None:
+                return
+            index, number = frame
+            if self.error is None:
+                try:
+                    self.encoder.write(self.frames[index], number)
+                    self.written += 1
+                except Exception as error:
+                    self.error = error
+            self.free.put(index)
+
+    def close(self):
+        """
+        Stops capturing, waits for the frames already read to be written
+        and reports how many were dropped
+        """
+        del self.window.on_draw
+        self.filled.put(None)
+        self.writer.join()
+        self.encoder.close()
+        print("Captured {} frames to {}, {} dropped".format(self.written, self.path,
+                                                            self.captured + self.dropped - self.written))
+        if self.error is not None:
+            print("Capture stopped early:", self.error)
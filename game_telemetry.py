@@ -0,0 +1,208 @@
+"""
+File: game_telemetry.py
+Counters and gauges from games while they are played, used to plan how
+many objects the games can handle. It is shared by the asteroids, pong
+and skeet games.
+
+The games count the objects they add and remove, the pairs of objects
+they test for collisions and how many objects are alive in each list,
+and end_frame() keeps the time of every frame. Every interval seconds
+the numbers are written as OpenMetrics text, to a file or to a page on
+localhost that Prometheus can scrape.
+
+    TELEMETRY = Telemetry("pong", path="pong.prom", port=9100)
+    TELEMETRY.count("spawns", 1, "balls")
+    TELEMETRY.gauge("entities", 1, "balls")
+    TELEMETRY.end_frame(delta_time)
+    TELEMETRY.close()
+
+Games use NO_TELEMETRY unless telemetry is turned on, which does nothing,
+so the games can count things without checking if anyone is listening.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+#Seconds between two writes of the numbers
+TELEMETRY_INTERVAL = 5.0
+#Every metric's name starts with this
+METRIC_PREFIX = "game_"
+#Upper bounds in seconds of the frame time histogram's buckets
+FRAME_TIME_BUCKETS = (0.004, 0.008, 0.012, 0.017, 0.025, 0.033, 0.05, 0.1, 0.25)
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+#name: (type, help text, name of its label or None)
+METRICS = {
+    "entities": ("gauge", "Objects alive in each list", "list"),
+    "spawns": ("counter", "Objects added to each list", "list"),
+    "removals": ("counter", "Objects removed from each list", "list"),
+    "collision_pairs": ("counter", "Pairs of objects tested for a collision", "test"),
+    "frames": ("counter", "Frames played", None),
+    "frame_seconds": ("histogram", "Time between two frames", None),
+    "allocated_blocks": ("gauge", "Memory blocks allocated by Python", None),
+}
+
+
+class Null_Telemetry:
+    """
+    Telemetry that does nothing, used unless telemetry is turned on
+    """
+    enabled = False
+
+    def count(self, name, amount=1, label=None):
+        pass
+
+    def gauge(self, name, value, label=None):
+        pass
+
+    def end_frame(self, seconds):
+        pass
+
+    def close(self):
+        pass
+
+
+#Shared telemetry for games that aren't reporting anything
+NO_TELEMETRY = Null_Telemetry()
+
+
+class Telemetry:
+    """
+    Keeps the numbers of one game and writes them every interval seconds,
+    to path if it is given and to http://127.0.0.1:port/metrics if port is
+    """
+    enabled = True
+
+    def __init__(self, game, path=None, port=None, interval=TELEMETRY_INTERVAL):
+        self.game = game
+        self.path = path
+        self.interval = interval
+        #metric name -> {label value: number}
+        self.values = {name: {} for name in METRICS}
+        #frames in each bucket of FRAME_TIME_BUCKETS, and in none of them
+        self.frame_buckets = [0] * (len(FRAME_TIME_BUCKETS) + 1)
+        self.frame_time = 0.0
+        self.next_flush = time.perf_counter() + interval
+        #the last text written, also what the server sends
+        self.text = self.render().encode()
+
+        self.server = None
+        if port is not None:
+            telemetry = self
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    #read once, the game thread swaps in new text while this runs
+                    text = telemetry.text
+                    self.send_response(200)
+                    self.send_header("Content-Type", CONTENT_TYPE)
+                    self.send_header("Content-Length", str(len(text)))
+                    self.end_headers()
+                    self.wfile.write(text)
+
+                def log_message(self, format, *args):
+                    pass
+            #only this computer can scrape the game
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def count(self, name, amount=1, label=None):
+        """
+        Adds amount to a counter
+        """
+        values = self.values[name]
+        values[label] = values.get(label, 0) + amount
+
+    def gauge(self, name, value, label=None):
+        """
+        Sets a gauge to value
+        """
+        self.values[name][label] = value
+
+    def end_frame(self, seconds):
+        """
+        Keeps the time of a frame that just ended, and writes the numbers
+        if it's been interval seconds since they were last written
+        """
+        self.count("frames")
+        self.frame_buckets[bisect.bisect_left(FRAME_TIME_BUCKETS, seconds)] += 1
+        self.frame_time += seconds
+        if time.perf_counter() >= self.next_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the numbers now
+        """
+        self.next_flush = time.perf_counter() + self.interval
+        #looking at Python's memory takes a while, so it's only done here
+        self.gauge("allocated_blocks", sys.getallocatedblocks())
+        self.text = self.render().encode()
+        if self.path is not None:
+            #written next to path first and then renamed, so a scraper
+            #reading the file never sees half of it
+            temporary = self.path + ".tmp"
+            with open(temporary, "wb") as metrics_file:
+                metrics_file.write(self.text)
+            os.replace(temporary, self.path)
+
+    def render(self):
+        """
+        Returns every metric as OpenMetrics text
+        """
+        lines = []
+        game = 'game="{}"'.format(self.game)
+        for name, (kind, help_text, label_name) in METRICS.items():
+            family = METRIC_PREFIX + name
+            lines.append("# TYPE {} {}".format(family, kind))
+            lines.append("# HELP {} {}".format(family, help_text))
+            if kind == "histogram":
+                total = 0
+                for bound, amount in zip(FRAME_TIME_BUCKETS + ("+Inf",), self.frame_buckets):
+                    total += amount
+                    lines.append('{}_bucket{{{},le="{}"}} {}'.format(family, game, bound, total))
+                lines.append("{}_count{{{}}} {}".format(family, game, total))
+                lines.append("{}_sum{{{}}} {}".format(family, game, self.frame_time))
+                continue
+            suffix = "_total" if kind == "counter" else ""
+            values = self.values[name]
+            for label in sorted(values, key=str):
+                labels = game
+                if label_name is not None:
+                    labels += ',{}="{}"'.format(label_name, label)
+                lines.append("{}{}{{{}}} {}".format(family, suffix, labels, values[label]))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """
+        Writes the numbers one last time and stops the server
+        """
+        self.flush()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def add_telemetry_arguments(parser):
+    """
+    Adds the command line options that turn telemetry on
+    """
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="write entity counts, collision tests and frame times to PATH as OpenMetrics text")
+    parser.add_argument("--telemetry-port", metavar="PORT", type=int,
+                        help="serve the same numbers on http://127.0.0.1:PORT/metrics")
+
+def telemetry_from_args(game, args):
+    """
+    Returns the Telemetry asked for on the command line, or NO_TELEMETRY
+    """
+    if args.telemetry is None and args.telemetry_port is None:
+        return NO_TELEMETRY
+    return Telemetry(game, args.telemetry, args.telemetry_port)